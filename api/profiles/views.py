@@ -2,6 +2,7 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from django.shortcuts import get_object_or_404
+from search.index import ranked
 from users.models import User
 from .serializers import UserProfileSerializer, UserProfileUpdateSerializer
 
@@ -66,27 +67,21 @@ def user_profile_list(request):
     """
     List all public user profiles.
     Optional query parameters:
-    - search: Search by username or display name
+    - search: Full-text search over name, tagline and bio (ranked)
     - limit: Limit the number of results (default: 20, max: 100)
     """
     queryset = User.objects.filter(is_public=True)
     
-    # Search functionality
-    search = request.query_params.get('search', None)
-    if search:
-        queryset = queryset.filter(
-            username__icontains=search
-        ) | queryset.filter(
-            first_name__icontains=search
-        ) | queryset.filter(
-            last_name__icontains=search
-        )
-    
     # Limit results
     limit = int(request.query_params.get('limit', 20))
     limit = min(limit, 100)  # Max 100 results
     
-    queryset = queryset[:limit]
+    # Search functionality: full-text index (search/), best match first
+    search = request.query_params.get('search', None)
+    if search:
+        queryset = ranked(queryset, 'profile', search, limit=limit)
+    else:
+        queryset = queryset[:limit]
     
     serializer = UserProfileSerializer(
         queryset,
@@ -8,31 +8,47 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_config.settings')
 # Add the current directory to the Python path if needed
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# Startup phase timing and the FAST_STARTUP mode (stdlib only, so it can
+# load before Django)
+import startup
+
 # Initialize Django
 import django
-django.setup()
+with startup.phase('django'):
+    django.setup()
 
 # Now that Django is properly configured, we can import the rest
-from fasthtml.common import *
-from starlette.responses import RedirectResponse
-from starlette.staticfiles import StaticFiles
-import time
+with startup.phase('imports'):
+    from fasthtml.common import *
+    from starlette.responses import RedirectResponse
+    from starlette.staticfiles import StaticFiles
 
-# Import Django models and functionality
-from django.contrib.auth import get_user_model
-from django.core.management import call_command
-from django.db import connection
-from auth_bridge import AuthBridge
+    # Import Django models and functionality
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connection
+    from auth_bridge import AuthBridge
 
 User = get_user_model()
 
 # Check database migrations on startup
 def check_migrations():
-    """Verify that all database migrations have been applied"""
+    """
+    Verify that all database migrations have been applied.
+
+    With FAST_STARTUP, a migration graph that's already been verified (or is
+    fully recorded in django_migrations) skips the full `migrate --check`,
+    which loads every migration module; see startup.migrations_applied().
+    """
     try:
+        if startup.fast_startup() and startup.migrations_applied():
+            print("✓ Database migrations are up to date")
+            return
         connection.ensure_connection()
         # This will raise an exception if migrations are not up to date
         call_command('migrate', '--check', verbosity=0)
+        if startup.fast_startup():
+            startup.remember_migrations()
         print("✓ Database migrations are up to date")
     except Exception as e:
         print(f"⚠️  Database migrations need to run: {e}")
@@ -41,7 +57,8 @@ def check_migrations():
 
 # Only check migrations in production or when explicitly enabled
 if not os.getenv('SKIP_MIGRATION_CHECK'):
-    check_migrations()
+    with startup.phase('migrations'):
+        check_migrations()
 
 # Status code 303 is a redirect that can change POST to GET
 login_redir = RedirectResponse('/login', status_code=303)
@@ -51,7 +68,9 @@ def auth_before(req, sess):
     # Synchronize FastHTML and Django sessions
     AuthBridge.sync_sessions(req, sess)
     
-    # Get current user from unified auth system
+    # Get current user from unified auth system. The resolved user is pinned
+    # on req.scope['django_user'], so handlers calling get_current_user() again
+    # don't re-query it.
     user = AuthBridge.get_current_user(req, sess)
     
     # Set auth in request scope
@@ -65,46 +84,89 @@ def auth_before(req, sess):
     return login_redir
 
 # Import Django API for mounting
-from api_mount import django_app
-
-# Initialize FastHTML app with WebSocket support
-app, rt = fast_app(
-    exts='ws',  # Enable WebSocket support
-    debug=True,  # Enable debug mode during development
-    pico=True,  # Use Pico CSS for styling
-    surreal=True,  # Enable Surreal.js for enhanced interactivity
-    htmx=True,  # Enable HTMX for dynamic updates
-    static_path=Path('static'),  # Set static files directory
-    before=Beforeware(
-        auth_before,
-        skip=[r'/favicon\.ico', r'/static/.*', r'.*\.css', r'.*\.js', r'.*\.png', '/login', '/signup', '/', '/features', '/community', '/blog', '/about', r'/accounts/confirm-email.*', r'/profile/[^/]+$']
-    ),
-    hdrs=(
-        # Add timestamp query parameter to bust cache
-        Link(rel='stylesheet', href=f'/css/style.css?v={int(time.time())}'),  # Our custom styles with cache busting
-        Link(rel='stylesheet', href='https://fonts.googleapis.com/css2?family=JetBrains+Mono:wght@400;700&display=swap'),  # Monospace font
-        # Prism.js for syntax highlighting
-        Link(rel='stylesheet', href='https://cdnjs.cloudflare.com/ajax/libs/prism/1.24.1/themes/prism-tomorrow.min.css'),
-        Script(src='https://cdnjs.cloudflare.com/ajax/libs/prism/1.24.1/prism.min.js'),
-        Script(src='https://cdnjs.cloudflare.com/ajax/libs/prism/1.24.1/components/prism-markup.min.js'),
-        Script(src='https://cdnjs.cloudflare.com/ajax/libs/prism/1.24.1/components/prism-css.min.js'),
-        Script(src='https://cdnjs.cloudflare.com/ajax/libs/prism/1.24.1/components/prism-javascript.min.js'),
-        Script(src='/js/header.js'),  # Custom navigation JavaScript
+with startup.phase('api'):
+    from api_mount import django_app
+
+# Content-hashed, precompressed CSS/JS (utils/assets.py): build whatever is
+# missing and load the manifest asset_url() resolves against
+from utils.assets import AssetFiles, asset_url, prepare as prepare_assets
+with startup.phase('assets'):
+    prepare_assets()
+_assets = AssetFiles()
+
+with startup.phase('app'):
+    # Initialize FastHTML app with WebSocket support
+    app, rt = fast_app(
+        exts='ws',  # Enable WebSocket support
+        debug=True,  # Enable debug mode during development
+        pico=True,  # Use Pico CSS for styling
+        surreal=True,  # Enable Surreal.js for enhanced interactivity
+        htmx=True,  # Enable HTMX for dynamic updates
+        static_path=Path('static'),  # Set static files directory
+        before=Beforeware(
+            auth_before,
+            skip=[r'/favicon\.ico', r'/static/.*', r'.*\.css', r'.*\.js', r'.*\.png', '/login', '/signup', '/', '/features', '/community', '/blog', '/blog/more', '/blog/search', r'/blog/feed\.\w+', r'/blog/(tag|author)/[^/]+/feed\.\w+', '/about', r'/accounts/confirm-email.*', r'/profile/[^/]+$']
+        ),
+        hdrs=(
+            # Hashed URLs change with the file's content, so browsers can cache them forever
+            Link(rel='stylesheet', href=asset_url('css/style.css')),  # Our custom styles
+            Link(rel='stylesheet', href='https://fonts.googleapis.com/css2?family=JetBrains+Mono:wght@400;700&display=swap'),  # Monospace font
+            # Prism.js for syntax highlighting
+            Link(rel='stylesheet', href='https://cdnjs.cloudflare.com/ajax/libs/prism/1.24.1/themes/prism-tomorrow.min.css'),
+            Script(src='https://cdnjs.cloudflare.com/ajax/libs/prism/1.24.1/prism.min.js'),
+            Script(src='https://cdnjs.cloudflare.com/ajax/libs/prism/1.24.1/components/prism-markup.min.js'),
+            Script(src='https://cdnjs.cloudflare.com/ajax/libs/prism/1.24.1/components/prism-css.min.js'),
+            Script(src='https://cdnjs.cloudflare.com/ajax/libs/prism/1.24.1/components/prism-javascript.min.js'),
+            Script(src=asset_url('js/header.js')),  # Custom navigation JavaScript
+            Link(rel='stylesheet', href=asset_url('css/site-header.css')),  # SiteHeader styles
+            Script(src=asset_url('js/site-header.js')),  # SiteHeader mobile menu
+        )
     )
-)
 
-# Set up toast notifications
-setup_toasts(app)
+    # Set up toast notifications
+    setup_toasts(app)
 
 # ASGI dispatcher: /api/* and /admin/* go to Django with the full path
 # preserved so django_config/urls.py and Django's URL reversing both work.
 # (Starlette's Mount strips its prefix, which breaks the urlconf.)
 _fastapp = app
 
+# Public pages are served from a rendered-page cache (page_cache.py), which
+# reads the FastHTML session cookie to tell anonymous and logged-in visitors apart.
+from starlette.middleware.sessions import SessionMiddleware
+from page_cache import PageCache, session_reader
+
+_session_config = next(m.kwargs for m in _fastapp.user_middleware if m.cls is SessionMiddleware)
+_pages = PageCache(_fastapp, session_reader(**_session_config))
+
+# fast_app always adds a catch-all route for static files (any path ending
+# in a static extension, .xml and .json included) ahead of every handler,
+# where it would shadow routes like /blog/feed.xml, including ones that
+# FAST_STARTUP registers later. It goes once, here; the dispatcher serves
+# the files under static/ (listed once at startup, so a dynamic request is
+# a set lookup, not a stat) and sends every other path to the app.
+_STATIC_ROUTE = '/{fname:path}.{ext:static}'
+_fastapp.router.routes = [route for route in _fastapp.routes if getattr(route, 'path', None) != _STATIC_ROUTE]
+_STATIC_DIR = Path(__file__).resolve().parent / 'static'
+_static = StaticFiles(directory=_STATIC_DIR, check_dir=False)
+_static_paths = frozenset(
+    '/' + file.relative_to(_STATIC_DIR).as_posix()
+    for file in _STATIC_DIR.rglob('*') if file.is_file()
+)
+
+
 async def app(scope, receive, send):
     if scope['type'] in ('http', 'websocket'):
         path = scope.get('path', '')
         if path.startswith('/api/') or path.startswith('/admin/'):
             await django_app(scope, receive, send)
             return
-    await _fastapp(scope, receive, send)
+        if path.startswith('/assets/') and scope['type'] == 'http':
+            await _assets(scope, receive, send)
+            return
+        if path in _static_paths and scope['type'] == 'http':
+            await _static(scope, receive, send)
+            return
+        # With FAST_STARTUP, the module serving this path is imported on first hit.
+        startup.route_loader.load_for(path)
+    await _pages(scope, receive, send)
@@ -6,11 +6,14 @@ FastHTML sessions with Django's authentication system, solving the
 dual-session management problem.
 """
 
+import hashlib
+from importlib import import_module
 from typing import Optional
 from asgiref.sync import sync_to_async
 from django.conf import settings as django_settings
+from django.core.cache import cache
 from django.contrib.auth import get_user_model, authenticate, login as django_login, logout as django_logout
-from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.backends.base import SessionBase
 from django.middleware.csrf import get_token
 from fasthtml.common import *
 from starlette.requests import Request
@@ -18,6 +21,50 @@ from starlette.responses import Response
 
 User = get_user_model()
 
+# Request-scope slot holding the resolved User. `auth_before` resolves the
+# user once; route handlers calling get_current_user() again reuse it.
+# Not scope['user']: that belongs to Starlette's AuthenticationMiddleware
+# and holds a BaseUser, not a Django User.
+SCOPE_USER_KEY = 'django_user'
+
+# Cross-request identity cache, keyed by the Django session cookie. Kept
+# short so a stale entry can only outlive a change by a few seconds even
+# if an invalidation is missed (e.g. a queryset .update() on User).
+USER_CACHE_TTL = getattr(django_settings, 'AUTH_BRIDGE_USER_CACHE_TTL', 60)
+_USER_CACHE_PREFIX = 'authbridge:user:'
+_USER_SESSIONS_PREFIX = 'authbridge:user-sessions:'
+_MAX_TRACKED_SESSIONS = 20
+
+
+def _session_store_class() -> type:
+    """SessionStore for the configured SESSION_ENGINE.
+
+    Resolved per call (it's a cached module lookup) so tests overriding
+    SESSION_ENGINE via override_settings take effect.
+    """
+    return import_module(django_settings.SESSION_ENGINE).SessionStore
+
+
+def _request_scope(request: Request) -> Optional[dict]:
+    """Return the ASGI scope dict, or None for scope-less (mock) requests."""
+    scope = getattr(request, 'scope', None)
+    return scope if isinstance(scope, dict) else None
+
+
+def _session_cache_key(request: Request) -> Optional[str]:
+    """Cache key for the request's Django session, or None if it has none."""
+    cookies = getattr(request, 'cookies', None)
+    if not isinstance(cookies, dict):
+        return None
+    cookie_name = getattr(django_settings, 'SESSION_COOKIE_NAME', 'sessionid')
+    session_key = cookies.get(cookie_name)
+    if not session_key:
+        return None
+    # Hashed: signed_cookies session keys are the whole signed payload and
+    # would overflow backend key-length limits.
+    digest = hashlib.blake2b(session_key.encode(), digest_size=16).hexdigest()
+    return f"{_USER_CACHE_PREFIX}{digest}"
+
 
 class AuthBridge:
     """
@@ -28,9 +75,18 @@ class AuthBridge:
     """
     
     @staticmethod
-    def get_django_session(request: Request) -> SessionStore:
+    def get_django_session(request: Request) -> SessionBase:
         """
-        Get or create a Django session from the FastHTML request.
+        Get the Django session for the FastHTML request.
+
+        The store class follows settings.SESSION_ENGINE (db, cached_db,
+        cache, signed_cookies), so the bridge and Django's own
+        SessionMiddleware always agree on where session data lives.
+
+        The session is created lazily: nothing is written until something
+        calls save() (login_user, sync_sessions). Anonymous visitors
+        therefore cost no session INSERT, and an unknown or expired cookie
+        just yields an empty session that gets a fresh key on first save.
 
         The session is cached on the request object so a single request
         always sees the same SessionStore (same session_key). Without this
@@ -48,15 +104,12 @@ class AuthBridge:
         # any attribute, so a plain truthy check would loop back into a
         # bogus cache. Only honour real SessionStore instances.
         cached = getattr(request, '_dd_django_session', None)
-        if isinstance(cached, SessionStore):
+        if isinstance(cached, SessionBase):
             return cached
 
         cookie_name = getattr(django_settings, 'SESSION_COOKIE_NAME', 'sessionid')
         session_key = request.cookies.get(cookie_name)
-        session = SessionStore(session_key=session_key)
-
-        if not session.exists(session.session_key):
-            session.create()
+        session = _session_store_class()(session_key=session_key)
 
         try:
             setattr(request, '_dd_django_session', session)
@@ -90,6 +143,10 @@ class AuthBridge:
         django_session['_auth_user_backend'] = 'django.contrib.auth.backends.ModelBackend'
         django_session['_auth_user_hash'] = user.get_session_auth_hash()
         django_session.save()
+
+        # A previous identity may be cached against the old session cookie.
+        AuthBridge.forget_request_user(request)
+        AuthBridge._remember_for_request(request, user)
     
     @staticmethod
     def logout_user(request: Request, fasthtml_session: dict) -> None:
@@ -103,6 +160,9 @@ class AuthBridge:
         # Clear FastHTML session
         fasthtml_session.pop('auth', None)
         fasthtml_session.pop('user', None)
+
+        # Clear the cached identity before the session key goes away
+        AuthBridge.forget_request_user(request)
         
         # Clear Django session
         django_session = AuthBridge.get_django_session(request)
@@ -124,14 +184,72 @@ class AuthBridge:
         
         if not auth_username:
             return None
-        
-        try:
-            user = User.objects.get(username=auth_username)
-            return user
-        except User.DoesNotExist:
-            # User was deleted, clear session
-            AuthBridge.logout_user(request, fasthtml_session)
-            return None
+
+        # 1. Already resolved earlier in this request (auth_before).
+        scope = _request_scope(request)
+        if scope is not None:
+            user = scope.get(SCOPE_USER_KEY)
+            if isinstance(user, User) and user.username == auth_username:
+                return user
+
+        # 2. Resolved by a recent request on the same Django session.
+        cache_key = _session_cache_key(request)
+        user = cache.get(cache_key) if cache_key else None
+        if not (isinstance(user, User) and user.username == auth_username):
+            try:
+                user = User.objects.get(username=auth_username)
+            except User.DoesNotExist:
+                # User was deleted, clear session
+                AuthBridge.logout_user(request, fasthtml_session)
+                return None
+            if cache_key:
+                AuthBridge._cache_user(cache_key, user)
+
+        if scope is not None:
+            scope[SCOPE_USER_KEY] = user
+        return user
+
+    @staticmethod
+    def _cache_user(cache_key: str, user: User) -> None:
+        """Store `user` under `cache_key` and index the key by user id.
+
+        The per-user index is what lets a profile save drop every cached
+        session entry for that user without knowing their session keys.
+        """
+        cache.set(cache_key, user, USER_CACHE_TTL)
+        index_key = f"{_USER_SESSIONS_PREFIX}{user.pk}"
+        keys = cache.get(index_key) or []
+        if cache_key not in keys:
+            keys = (keys + [cache_key])[-_MAX_TRACKED_SESSIONS:]
+            cache.set(index_key, keys, USER_CACHE_TTL)
+
+    @staticmethod
+    def _remember_for_request(request: Request, user: User) -> None:
+        """Pin an already-fetched user on the request so get_current_user skips the DB."""
+        scope = _request_scope(request)
+        if scope is not None:
+            scope[SCOPE_USER_KEY] = user
+
+    @staticmethod
+    def forget_request_user(request: Request) -> None:
+        """Drop the cached identity for this request's session (both layers)."""
+        scope = _request_scope(request)
+        if scope is not None:
+            scope.pop(SCOPE_USER_KEY, None)
+        cache_key = _session_cache_key(request)
+        if cache_key:
+            cache.delete(cache_key)
+
+    @staticmethod
+    def invalidate_user(user_id) -> None:
+        """Drop every cross-request cache entry that holds `user_id`.
+
+        Wired to User post_save/post_delete in users/signals.py so profile
+        edits are visible on the very next request.
+        """
+        index_key = f"{_USER_SESSIONS_PREFIX}{user_id}"
+        keys = cache.get(index_key) or []
+        cache.delete_many(keys + [index_key])
     
     @staticmethod
     def sync_sessions(request: Request, fasthtml_session: dict) -> None:
@@ -162,6 +280,7 @@ class AuthBridge:
                     'ai_percentage': user.ai_percentage,
                     'id': user.id
                 }
+                AuthBridge._remember_for_request(request, user)
             except User.DoesNotExist:
                 # User doesn't exist, clear Django session
                 django_session.flush()
@@ -174,6 +293,7 @@ class AuthBridge:
                 django_session['_auth_user_backend'] = 'django.contrib.auth.backends.ModelBackend'
                 django_session['_auth_user_hash'] = user.get_session_auth_hash()
                 django_session.save()
+                AuthBridge._remember_for_request(request, user)
             except User.DoesNotExist:
                 # User doesn't exist, clear FastHTML session
                 fasthtml_session.pop('auth', None)
@@ -0,0 +1,74 @@
+"""
+Shared bootstrap for the scripts in benchmarks/.
+
+Every benchmark runs against a throwaway test database (created and
+migrated here, destroyed on exit), so the numbers never depend on — or
+pollute — the developer's db.sqlite3. Run from the repo root with the
+same environment as the test suite, e.g.:
+
+    SECRET_KEY=dev SKIP_MIGRATION_CHECK=1 python -m benchmarks.bench_sessions
+"""
+import contextlib
+import os
+import sys
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_config.settings')
+os.environ.setdefault('SKIP_MIGRATION_CHECK', '1')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import django
+django.setup()
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+@contextlib.contextmanager
+def test_database():
+    """Create + migrate a scratch test DB for the duration of the block."""
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def count_queries(fn, *args, **kwargs):
+    """Run fn once and return (result, number of SQL statements it issued)."""
+    # An execute wrapper rather than CaptureQueriesContext: the latter reads
+    # a 9000-entry ring buffer and undercounts the big legacy loops.
+    count = 0
+
+    def counter(execute, sql, params, many, context):
+        nonlocal count
+        count += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(counter):
+        result = fn(*args, **kwargs)
+    return result, count
+
+
+def time_per_call(fn, number=200, repeat=5):
+    """Best-of-`repeat` mean wall time of fn() in microseconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1e6
+
+
+def report(title, header, rows):
+    """Print a fixed-width results table."""
+    widths = [max(len(str(c)) for c in col) for col in zip(header, *rows)]
+    line = "  ".join(f"{{:<{w}}}" for w in widths)
+    print(f"\n{title}")
+    print(line.format(*header))
+    print(line.format(*("-" * w for w in widths)))
+    for row in rows:
+        print(line.format(*row))
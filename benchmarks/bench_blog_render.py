@@ -0,0 +1,114 @@
+"""
+Cost of rendering a blog post body: markdown + codehilite + bleach on
+every view (the old path) versus a hit in the rendered-HTML cache, and
+how long a render of a large post stalls the event loop when done inline
+versus through `rendering.arender()`.
+
+Bodies are synthetic posts of increasing size with a fenced code block
+every few paragraphs, since Pygments highlighting dominates the cost.
+
+    python -m benchmarks.bench_blog_render
+"""
+from benchmarks._setup import report, time_per_call
+
+import asyncio
+import time
+
+from django.core.cache import cache
+
+from utils import rendering
+from utils.rendering import render_markdown
+
+SIZES = [1, 10, 50]  # sections of prose + one code block each
+STALL_SECTIONS = 600  # ~200 KB
+
+SECTION = """
+## Section {n}
+
+Some prose with **bold**, _emphasis_, a [link](https://example.com) and
+`inline code`, long enough to look like a real paragraph of a post.
+
+```python
+def handler_{n}(request, items):
+    total = sum(item.price * item.quantity for item in items)
+    return {{"count": len(items), "total": round(total, 2)}}
+```
+"""
+
+
+def make_post(sections):
+    return "# Benchmark post\n" + "".join(SECTION.format(n=n) for n in range(sections))
+
+
+def main():
+    rows = []
+    for sections in SIZES:
+        content = make_post(sections)
+        cache.clear()
+        rendering.render(content)  # warm the entry
+
+        uncached = time_per_call(lambda: render_markdown(content), number=20)
+        rendering.clear_memo()
+        shared = time_per_call(lambda: cache.get(rendering.cache_key(content)), number=2000)
+        cached = time_per_call(lambda: rendering.render(content), number=2000)
+        rows.append((
+            sections, f"{len(content) / 1024:.1f}",
+            f"{uncached:.0f}", f"{shared:.1f}", f"{cached:.1f}", f"{uncached / cached:.0f}x",
+        ))
+
+    report(
+        "Blog post body render (µs per view)",
+        ("sections", "KiB", "render", "cache hit", "LRU hit", "speed-up"),
+        rows,
+    )
+
+    large = make_post(STALL_SECTIONS)
+
+    async def inline():
+        return render_markdown(large)
+
+    stalls = []
+    for label, render in (
+        ("inline render_markdown()", inline),
+        ("arender() (process pool)", lambda: rendering.arender(large)),
+    ):
+        cache.clear()
+        rendering.clear_memo()
+        ms, worst = asyncio.run(measure_stall(render))
+        stalls.append((label, f"{len(large) / 1024:.0f}", f"{ms:.0f}", f"{worst:.1f}"))
+    rendering._reset_pool()
+
+    report(
+        "Event-loop stall while rendering one large post",
+        ("strategy", "KiB", "render ms", "worst loop lag ms"),
+        stalls,
+    )
+
+
+async def measure_stall(render):
+    """(wall ms of `render()`, worst lag of a 1 ms ticker running alongside it)."""
+    worst = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal worst
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            worst = max(worst, (time.perf_counter() - start) * 1000 - 1)
+
+    pool = rendering._executor()
+    if pool is not None:  # start the workers outside the measurement
+        await asyncio.get_running_loop().run_in_executor(pool, render_markdown, "warm")
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await render()
+    elapsed = (time.perf_counter() - start) * 1000
+    done = True
+    await task
+    return elapsed, worst
+
+
+if __name__ == '__main__':
+    main()
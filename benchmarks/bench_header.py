@@ -0,0 +1,61 @@
+"""
+What SiteHeader costs each page, before and after moving its CSS/JS into
+static/ and memoizing the markup.
+
+"Inline" rebuilds the header the old way on every call: the FT tree is
+constructed and serialized, with the stylesheet and script embedded in
+<style>/<script> tags. "Memoized" is SiteHeader() as it is now: a cache
+lookup returning markup that links the two hashed assets, which browsers
+download once and keep (Cache-Control: immutable).
+
+    python -m benchmarks.bench_header
+"""
+from benchmarks._setup import report, time_per_call
+
+import gzip
+
+from fasthtml.common import Script, Style, to_xml
+
+import app  # noqa: F401  (builds the asset manifest)
+from routes.header import SiteHeader, _header_html
+from utils.assets import source_dir
+
+PATHS = ('/', '/blog', '/about')
+
+
+def inline_header(path):
+    css = (source_dir() / 'css' / 'site-header.css').read_text()
+    js = (source_dir() / 'js' / 'site-header.js').read_text()
+    return to_xml(Style(css)) + to_xml(Script(js)) + _header_html.__wrapped__(path if path != '/' else '', False)
+
+
+def sizes(html):
+    data = html.encode()
+    return len(data), len(gzip.compress(data))
+
+
+def main():
+    inline_bytes, memo_bytes = sizes(inline_header('/')), sizes(str(SiteHeader('/')))
+    report(
+        "Header bytes in every page response",
+        ["variant", "raw", "gzip"],
+        [
+            ("inline", *inline_bytes),
+            ("memoized", *memo_bytes),
+            ("saved", inline_bytes[0] - memo_bytes[0], inline_bytes[1] - memo_bytes[1]),
+        ],
+    )
+
+    rows = []
+    for path in PATHS:
+        SiteHeader(path)
+        rows.append((
+            path,
+            f"{time_per_call(lambda: inline_header(path), number=50):.0f}",
+            f"{time_per_call(lambda: str(SiteHeader(path)), number=2000):.1f}",
+        ))
+    report("Header render time per page (us)", ["path", "inline", "memoized"], rows)
+
+
+if __name__ == '__main__':
+    main()
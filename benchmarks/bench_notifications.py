@@ -0,0 +1,80 @@
+"""
+Cost of fanning out ChatNotification rows for one new message.
+
+For public rooms of 10, 1k and 10k joined members, compares the legacy
+per-recipient INSERT loop with the batch bulk_create path, the single
+INSERT ... SELECT the post_save signal now uses, and deferred mode (where
+the sender's request only pays for the message INSERT).
+
+    python -m benchmarks.bench_notifications
+"""
+from benchmarks._setup import count_queries, report, test_database
+
+import time
+
+from django.db.models.signals import post_save
+from django.test.utils import override_settings
+
+from chat.models import ChatMessage, ChatNotification, ChatRoom, UserPresence
+from chat.notifications import create_notifications, fan_out_notifications, wait_for_deferred
+from chat.signals import create_chat_notifications
+from users.models import User
+
+ROOM_SIZES = [10, 1_000, 10_000]
+
+
+def legacy_fan_out(message):
+    """The original signal body: one INSERT per joined user."""
+    for presence in UserPresence.objects.filter(room=message.room).exclude(user=message.user):
+        ChatNotification.objects.create(user=presence.user, room=message.room, message=message)
+
+
+def seed_room(size):
+    ChatRoom.objects.all().delete()
+    User.objects.all().delete()
+    users = User.objects.bulk_create(
+        User(email=f'member{i}@example.com', username=f'member{i}', password='!')
+        for i in range(size)
+    )
+    room = ChatRoom.objects.create(name=f'room-{size}', slug=f'room-{size}', type='public')
+    UserPresence.objects.bulk_create(UserPresence(user=u, room=room) for u in users)
+    return room, users[0]
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    _, queries = count_queries(fn, *args, **kwargs)
+    return (time.perf_counter() - start) * 1000, queries
+
+
+def main():
+    rows = []
+    with test_database():
+        for size in ROOM_SIZES:
+            room, sender = seed_room(size)
+
+            post_save.disconnect(create_chat_notifications, sender=ChatMessage)
+            try:
+                message = ChatMessage.objects.create(room=room, user=sender, content='benchmark')
+                strategies = [
+                    ("per-row INSERT (legacy)", legacy_fan_out, (message,)),
+                    ("bulk_create", create_notifications, ([message],)),
+                    ("INSERT ... SELECT", fan_out_notifications, (message.id, room.id, sender.id, False)),
+                ]
+                for label, fn, args in strategies:
+                    ChatNotification.objects.all().delete()
+                    ms, queries = timed(fn, *args)
+                    rows.append((size, label, queries, f"{ms:.1f}"))
+            finally:
+                post_save.connect(create_chat_notifications, sender=ChatMessage)
+
+            with override_settings(CHAT_NOTIFICATIONS_DEFERRED=True):
+                ms, queries = timed(ChatMessage.objects.create, room=room, user=sender, content='deferred')
+                wait_for_deferred()
+            rows.append((size, "deferred (hot path incl. message INSERT)", queries, f"{ms:.1f}"))
+
+    report("Notification fan-out for one message", ("members", "strategy", "queries", "ms"), rows)
+
+
+if __name__ == '__main__':
+    main()
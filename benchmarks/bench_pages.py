@@ -0,0 +1,50 @@
+"""
+Render cost of the mostly-static pages, with and without pre-rendered
+fragments (utils/fragments.py).
+
+Calls each page handler directly and serializes the result the way
+FastHTML does, so routing, middleware and the page cache are left out.
+"Rebuilt" clears the fragment cache before every render, which is what
+each request paid before the constant subtrees were wrapped in Static():
+build the whole FT tree, then serialize it. "Static" is the steady state:
+only the dynamic parts (SiteHeader, the title) are built per request.
+
+    python -m benchmarks.bench_pages
+"""
+from benchmarks._setup import report, time_per_call
+
+import main as landing
+import routes.about
+import routes.community
+import routes.features
+from utils import fragments
+
+PAGES = {
+    '/': landing.get,
+    '/about': routes.about.get,
+    '/features': routes.features.get,
+    '/community': routes.community.get,
+}
+
+
+def render(handler):
+    return fragments.render(handler({}))
+
+
+def rebuilt(handler):
+    fragments.clear()
+    return render(handler)
+
+
+def main():
+    rows = []
+    for path, handler in PAGES.items():
+        cold = time_per_call(lambda: rebuilt(handler), number=50)
+        render(handler)
+        warm = time_per_call(lambda: render(handler), number=500)
+        rows.append((path, len(render(handler)), f"{cold:.0f}", f"{warm:.0f}", f"{cold / warm:.1f}x"))
+    report("Page render time (us per request)", ["page", "bytes", "rebuilt", "static", "speedup"], rows)
+
+
+if __name__ == '__main__':
+    main()
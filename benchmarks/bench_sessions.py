@@ -0,0 +1,96 @@
+"""
+Per-request DB round trips spent on the FastHTML <-> Django session bridge.
+
+Replays what `auth_before` does (AuthBridge.sync_sessions followed by
+AuthBridge.get_current_user) for three kinds of visitor, once with the
+legacy eager session handling (db SessionStore + exists()/create() on
+every request) and once per SESSION_ENGINE with the current lazy bridge.
+
+    python -m benchmarks.bench_sessions
+"""
+from benchmarks._setup import count_queries, report, test_database, time_per_call
+
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DBSessionStore
+from django.core.cache import cache
+from django.test.utils import override_settings
+
+from auth_bridge import AuthBridge
+from users.models import User
+
+ENGINES = [
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.signed_cookies',
+]
+
+
+class FakeRequest:
+    def __init__(self, cookies):
+        self.cookies = dict(cookies)
+        self.scope = {}
+
+
+def legacy_get_django_session(request):
+    """The pre-lazy bridge: db backend, exists() + create() on every request."""
+    cached = getattr(request, '_dd_django_session', None)
+    if isinstance(cached, DBSessionStore):
+        return cached
+    session = DBSessionStore(session_key=request.cookies.get(settings.SESSION_COOKIE_NAME))
+    if not session.exists(session.session_key):
+        session.create()
+    request._dd_django_session = session
+    return session
+
+
+def auth_before(cookies, fasthtml_session):
+    request = FakeRequest(cookies)
+    session = dict(fasthtml_session)
+    AuthBridge.sync_sessions(request, session)
+    return AuthBridge.get_current_user(request, session)
+
+
+def logged_in_cookies(user):
+    """Log `user` in through the bridge and return the resulting cookie jar."""
+    request = FakeRequest({})
+    AuthBridge.login_user(request, {}, user)
+    return {settings.SESSION_COOKIE_NAME: AuthBridge.get_django_session(request).session_key}
+
+
+def measure(user, cookies_for_auth):
+    scenarios = [
+        ("anonymous, no cookie", {}, {}),
+        ("anonymous, stale cookie", {settings.SESSION_COOKIE_NAME: 'expired-session-key'}, {}),
+        ("authenticated, cold", cookies_for_auth, {'auth': user.username}),
+        ("authenticated, warm", cookies_for_auth, {'auth': user.username}),
+    ]
+    rows = []
+    for label, cookies, fasthtml_session in scenarios:
+        _, queries = count_queries(auth_before, cookies, fasthtml_session)
+        micros = time_per_call(lambda: auth_before(cookies, fasthtml_session), number=100)
+        rows.append((label, queries, f"{micros:.0f}"))
+    return rows
+
+
+def main():
+    with test_database():
+        user = User.objects.create_user(email='bench@example.com', username='bench', password='x-not-real')
+
+        with override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db'), \
+                mock.patch.object(AuthBridge, 'get_django_session', staticmethod(legacy_get_django_session)):
+            cache.clear()
+            rows = measure(user, logged_in_cookies(user))
+        report("before: eager db SessionStore", ("visitor", "queries", "us/request"), rows)
+
+        for engine in ENGINES:
+            with override_settings(SESSION_ENGINE=engine):
+                cache.clear()
+                rows = measure(user, logged_in_cookies(user))
+            report(f"after: lazy bridge, {engine.rsplit('.', 1)[-1]}", ("visitor", "queries", "us/request"), rows)
+
+
+if __name__ == '__main__':
+    main()
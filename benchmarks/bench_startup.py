@@ -0,0 +1,87 @@
+"""
+Cold-start cost of the app, phase by phase.
+
+Starts fresh interpreters that import main.py, once with the default
+startup (every routes.* module imported up front) and once with
+FAST_STARTUP=1 (routes imported on first hit), and prints the
+startup.timings() breakdown of the median run of each. Then times the
+migration check on a migrated test database: the full `migrate --check`
+versus startup.migrations_applied() with a cold cache (one query) and a
+warm one (a cache hit).
+
+    python -m benchmarks.bench_startup
+"""
+from benchmarks._setup import report, test_database
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.core.cache import cache
+from django.core.management import call_command
+
+import startup
+
+RUNS = 5
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROBE = "import json, main, startup; print(json.dumps(startup.timings()))"
+
+
+def cold_start(fast):
+    """startup.timings() of one fresh `import main` (migration check skipped)."""
+    env = dict(os.environ, SKIP_MIGRATION_CHECK='1')
+    env.pop('FAST_STARTUP', None)
+    if fast:
+        env['FAST_STARTUP'] = '1'
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def median_run(fast):
+    runs = sorted((cold_start(fast) for _ in range(RUNS)), key=lambda timings: timings['total'])
+    return runs[len(runs) // 2]
+
+
+def ms(fn, number=5):
+    best = float('inf')
+    for _ in range(number):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return f"{best * 1000:.1f}"
+
+
+def main():
+    modes = {'eager': median_run(False), 'FAST_STARTUP': median_run(True)}
+    phases = list(dict.fromkeys(name for timings in modes.values() for name in timings))
+    report(
+        f"Cold start, median of {RUNS} processes (ms)",
+        ["phase", *modes],
+        [(name, *(f"{timings.get(name, 0):.0f}" for timings in modes.values())) for name in phases],
+    )
+
+    with test_database():
+        def cold_check():
+            cache.clear()
+            startup.migrations_applied()
+
+        startup.migrations_applied()
+        report(
+            "Migration check (ms, best of 5)",
+            ["check", "time"],
+            [
+                ("migrate --check", ms(lambda: call_command('migrate', '--check', verbosity=0))),
+                ("fingerprint, cold cache", ms(cold_check)),
+                ("fingerprint, cached", ms(startup.migrations_applied)),
+            ],
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Time to first byte of the streamed pages (utils/streaming.py) versus the
+time to the last byte, which is when a buffered page used to start
+sending.
+
+Seeds a throwaway database with a user, projects, chat messages and
+posts, then drives the ASGI app directly and timestamps each body chunk
+of /dashboard, /blog and /profile/<user>. Against local SQLite every
+query is nearly free, so it runs again with a fixed delay added to each
+query to stand in for a database across the network.
+
+    python -m benchmarks.bench_streaming
+"""
+from benchmarks._setup import report, test_database
+
+import asyncio
+import statistics
+import time
+
+from django.db.backends import utils as backend_utils
+from starlette.testclient import TestClient
+
+import main  # noqa: F401  (registers the routes)
+from app import app
+
+LATENCIES_MS = (0, 5)
+RUNS = 7
+PASSWORD = 'bench-password-1!'
+
+
+def seed():
+    from chat.models import ChatMessage, ChatRoom
+    from users.models import BlogPost, Project, Tag, User
+
+    user = User.objects.create_user(
+        email='bench@example.com', username='bench', password=PASSWORD,
+        portfolio_content='# Portfolio\n\n' + 'Projects I built with AI.\n\n' * 40,
+    )
+    room = ChatRoom.objects.create(name='General', slug='general')
+    tags = [Tag.objects.create(name=f'tag{n}', slug=f'tag{n}') for n in range(8)]
+    for n in range(12):
+        Project.objects.create(owner=user, name=f'Project {n}', description='A project.', ai_percentage=70 + n)
+        ChatMessage.objects.create(room=room, user=user, content=f'Message {n}')
+    for n in range(30):
+        post = BlogPost.objects.create(author=user, title=f'Post {n}', content='Body ' * 200, is_published=True)
+        post.tags.set(tags[n % 8:n % 8 + 3])
+
+
+def session_cookie():
+    client = TestClient(app)
+    client.post('/login', data={'email': 'bench@example.com', 'password': PASSWORD}, follow_redirects=False)
+    return '; '.join(f'{name}={value}' for name, value in client.cookies.items())
+
+
+async def timed_get(path, cookie):
+    """(ms to the first body chunk, ms to the last) for one GET."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'root_path': '', 'query_string': b'',
+        'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+    }
+    first = None
+    start = time.perf_counter()
+
+    async def receive():
+        # No request body, and the client never disconnects.
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        nonlocal first
+        if message['type'] == 'http.response.body' and message.get('body') and first is None:
+            first = time.perf_counter()
+
+    await app(scope, receive, send)
+    end = time.perf_counter()
+    return (first - start) * 1000, (end - start) * 1000
+
+
+def with_query_latency(ms):
+    """Make every SQL statement take `ms` longer (in every thread)."""
+    original = backend_utils.CursorWrapper.execute
+
+    def execute(self, sql, params=None):
+        time.sleep(ms / 1000)
+        return original(self, sql, params)
+
+    backend_utils.CursorWrapper.execute = execute
+    return lambda: setattr(backend_utils.CursorWrapper, 'execute', original)
+
+
+def main():
+    with test_database():
+        seed()
+        cookie = session_cookie()
+        for latency in LATENCIES_MS:
+            restore = with_query_latency(latency)
+            rows = []
+            try:
+                for path in ('/dashboard', '/blog', '/profile/bench'):
+                    asyncio.run(timed_get(path, cookie))
+                    runs = [asyncio.run(timed_get(path, cookie)) for _ in range(RUNS)]
+                    ttfb = statistics.median(first for first, _ in runs)
+                    total = statistics.median(last for _, last in runs)
+                    rows.append((path, f"{ttfb:.1f}", f"{total:.1f}", f"{total - ttfb:.1f}"))
+            finally:
+                restore()
+            report(
+                f"Streamed pages, +{latency}ms per query (median of {RUNS}, ms)",
+                ["page", "first byte", "last byte (= buffered TTFB)", "saved"],
+                rows,
+            )
+
+
+if __name__ == '__main__':
+    main()
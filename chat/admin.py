@@ -1,9 +1,9 @@
 from django.contrib import admin
-from .models import ChatRoom, ChatMessage, ChatNotification, UserPresence
+from .models import ChatRoom, ChatMessage, ChatNotification, UserPresence, ChatUnreadCounter
 
 @admin.register(ChatRoom)
 class ChatRoomAdmin(admin.ModelAdmin):
-    list_display = ('name', 'slug', 'type', 'is_active', 'created_at', 'updated_at')
+    list_display = ('name', 'slug', 'type', 'is_active', 'online_count', 'created_at', 'updated_at')
     list_filter = ('type', 'is_active', 'created_at')
     search_fields = ('name', 'slug', 'description', 'topics')
     prepopulated_fields = {'slug': ('name',)}
@@ -43,4 +43,9 @@ class UserPresenceAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'room', 'is_online', 'last_seen')
     list_filter = ('is_online', 'last_seen')
     search_fields = ('user__username', 'room__name')
-    readonly_fields = ('last_seen',)
\ No newline at end of file
+    readonly_fields = ('last_seen',)
+
+@admin.register(ChatUnreadCounter)
+class ChatUnreadCounterAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'room', 'count')
+    search_fields = ('user__username', 'room__name')
@@ -1,8 +1,17 @@
-import json
+import asyncio
+from dataclasses import replace
 from channels.generic.websocket import AsyncWebsocketConsumer
+from asgiref.sync import sync_to_async
 from channels.db import database_sync_to_async
 from django.utils import timezone
-from .models import ChatRoom, ChatMessage, UserPresence
+from . import protocol
+from .models import ChatRoom, ChatMessage
+from .pagination import InvalidCursor, encode_cursor, page_size, paginate_messages
+from .serializers import message_row, message_values, serialize_message, serialize_presence
+from .pipeline import message_pipeline, write_behind_enabled
+from .presence import presence
+from .counters import advance_read_watermark
+from .throttle import FrameRateLimiter, read_tracker, typing_tracker
 
 
 class ChatConsumer(AsyncWebsocketConsumer):
@@ -13,7 +22,12 @@ class ChatConsumer(AsyncWebsocketConsumer):
     - Connecting to chat rooms
     - Sending and receiving messages
     - User presence updates
+    - Paging back through chat history
     - Message status updates
+    
+    Broadcast events are encoded once at group_send time and forwarded
+    verbatim, in the wire format each connection negotiated (see
+    chat/protocol.py).
     """
     
     async def connect(self):
@@ -46,23 +60,24 @@ class ChatConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
         
-        # Accept the WebSocket connection
-        await self.accept()
-        
-        # Update user presence
-        await self.update_user_presence(is_online=True)
+        # Accept the WebSocket connection in the client's preferred wire format
+        self.wire_format, subprotocol = protocol.negotiate(self.scope.get("subprotocols"))
+        await self.accept(subprotocol)
+        self.rate_limiter = FrameRateLimiter()
+        if self.wire_format != protocol.JSON:
+            await self.send_frame(protocol.schema_frame())
         
-        # Send user presence update to group
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                "type": "user_presence",
+        # Update user presence, and tell the group if the user just came online
+        if await self.join_presence():
+            await self.broadcast("user_presence", {
+                "type": "presence",
                 "user_id": self.user.id,
                 "username": self.user.username,
                 "is_online": True,
                 "timestamp": timezone.now().isoformat(),
-            }
-        )
+            })
+        self.presence_heartbeat = asyncio.create_task(self.heartbeat_presence())
+        presence.start_checkpointer()
         
         # Send chat history to the connected user
         await self.send_chat_history()
@@ -71,21 +86,21 @@ class ChatConsumer(AsyncWebsocketConsumer):
         """
         Called when the WebSocket closes for any reason.
         """
-        if hasattr(self, "room_group_name"):
-            # Update user presence
-            await self.update_user_presence(is_online=False)
+        if hasattr(self, "presence_heartbeat"):
+            self.presence_heartbeat.cancel()
+            typing_tracker.update(self.channel_layer, self.room_group_name, self.user.id, self.user.username, False)
             
-            # Send user presence update to group
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    "type": "user_presence",
+            # Update user presence, and tell the group if this was their last connection
+            if await self.leave_presence():
+                await self.broadcast("user_presence", {
+                    "type": "presence",
                     "user_id": self.user.id,
                     "username": self.user.username,
                     "is_online": False,
                     "timestamp": timezone.now().isoformat(),
-                }
-            )
+                })
+        
+        if hasattr(self, "room_group_name"):
             
             # Leave room group
             await self.channel_layer.group_discard(
@@ -93,122 +108,137 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 self.channel_name
             )
     
-    async def receive(self, text_data):
+    async def receive(self, text_data=None, bytes_data=None):
         """
-        Called when we get a text frame from the client.
+        Called when we get a frame from the client (binary frames are msgpack).
         """
-        text_data_json = json.loads(text_data)
+        try:
+            text_data_json = protocol.decode(text_data, bytes_data)
+        except ValueError:
+            await self.send_frame({"type": "error", "error": "Malformed frame"})
+            return
         message_type = text_data_json.get("type", "message")
         
+        # Per-connection token bucket for each frame type
+        if not self.rate_limiter.allow(message_type):
+            # Dropped typing frames are harmless; tell the client about the rest
+            if message_type != "typing":
+                await self.send_frame({"type": "error", "error": "Rate limit exceeded", "frame_type": message_type})
+            return
+        
         if message_type == "message":
             # Handle new message
             content = text_data_json["content"]
             is_code = text_data_json.get("is_code", False)
             code_language = text_data_json.get("code_language", "")
             
-            # Save message to database
-            message = await self.save_message(content, is_code, code_language)
-            
-            # Send message to room group
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    "type": "chat_message",
-                    "message_id": message.id,
-                    "user_id": self.user.id,
-                    "username": self.user.username,
-                    "content": content,
-                    "is_code": is_code,
-                    "code_language": code_language,
-                    "timestamp": message.timestamp.isoformat(),
-                }
-            )
+            if write_behind_enabled():
+                # Id is pre-assigned, so broadcast first and let the
+                # pipeline persist the message in its next batch.
+                message = await message_pipeline.build(
+                    room=self.room,
+                    user=self.user,
+                    content=content,
+                    is_code=is_code,
+                    code_language=code_language,
+                )
+                await self.broadcast_message(message)
+                await message_pipeline.submit(message)
+            else:
+                # Save message to database, then send it to the room group
+                message = await self.save_message(content, is_code, code_language)
+                await self.broadcast_message(message)
         
         elif message_type == "typing":
-            # Handle typing indicator
-            is_typing = text_data_json["is_typing"]
-            
-            # Send typing status to room group
-            await self.channel_layer.group_send(
+            # Handle typing indicator; the room gets coalesced snapshots on a
+            # fixed tick rather than one broadcast per frame (see chat/throttle.py)
+            typing_tracker.update(
+                self.channel_layer,
                 self.room_group_name,
-                {
-                    "type": "typing_indicator",
-                    "user_id": self.user.id,
-                    "username": self.user.username,
-                    "is_typing": is_typing,
-                }
+                self.user.id,
+                self.user.username,
+                bool(text_data_json.get("is_typing")),
             )
         
+        elif message_type == "heartbeat":
+            # Client-side keepalive; the server also heartbeats on its own
+            await self.refresh_presence()
+        
+        elif message_type == "history":
+            # Page back through older history with the cursor from the last page
+            await self.send_older_history(text_data_json.get("before"), text_data_json.get("limit"))
+        
         elif message_type == "read":
-            # Handle message read status
-            message_id = text_data_json["message_id"]
+            # Handle read status: the client batches, so one frame means
+            # "read everything up to message_id" for this user
+            try:
+                message_id = int(text_data_json["message_id"])
+            except (KeyError, TypeError, ValueError):
+                await self.send_frame({"type": "error", "error": "Invalid message_id"})
+                return
             
-            # Update message read status
-            await self.mark_message_as_read(message_id)
-            
-            # Send read status to room group
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    "type": "message_read",
-                    "message_id": message_id,
-                    "user_id": self.user.id,
-                    "username": self.user.username,
-                }
-            )
+            # Advance the watermark; the room hears about it in the next
+            # coalesced read frame (see chat/throttle.py)
+            timestamp = await self.advance_read_watermark(message_id)
+            if timestamp is not None:
+                read_tracker.update(
+                    self.channel_layer,
+                    self.room_group_name,
+                    self.user.id,
+                    self.user.username,
+                    timestamp,
+                    message_id,
+                )
     
-    async def chat_message(self, event):
+    async def broadcast_message(self, message):
         """
-        Called when a message is received from the room group.
+        Send a new message to the room group.
         """
-        # Send message to WebSocket
-        await self.send(text_data=json.dumps({
+        await self.broadcast("chat_message", {
             "type": "message",
-            "message_id": event["message_id"],
-            "user_id": event["user_id"],
-            "username": event["username"],
-            "content": event["content"],
-            "is_code": event["is_code"],
-            "code_language": event["code_language"],
-            "timestamp": event["timestamp"],
-        }))
+            "message_id": message.id,
+            "user_id": self.user.id,
+            "username": self.user.username,
+            "content": message.content,
+            "is_code": message.is_code,
+            "code_language": message.code_language,
+            "timestamp": message.timestamp.isoformat(),
+        })
     
-    async def typing_indicator(self, event):
+    async def broadcast(self, handler, payload):
         """
-        Called when a typing indicator is received from the room group.
+        Send `payload` to the room group, encoded once in every wire format.
+        `handler` names the consumer method that forwards it.
         """
-        # Send typing indicator to WebSocket
-        await self.send(text_data=json.dumps({
-            "type": "typing",
-            "user_id": event["user_id"],
-            "username": event["username"],
-            "is_typing": event["is_typing"],
-        }))
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {"type": handler, "frames": protocol.encode_all(payload)},
+        )
     
-    async def message_read(self, event):
+    async def send_frame(self, payload):
         """
-        Called when a message read status is received from the room group.
+        Send a frame to this connection only, in its wire format.
         """
-        # Send message read status to WebSocket
-        await self.send(text_data=json.dumps({
-            "type": "read",
-            "message_id": event["message_id"],
-            "user_id": event["user_id"],
-            "username": event["username"],
-        }))
+        await self.send_encoded(protocol.encode(payload, self.wire_format))
     
-    async def user_presence(self, event):
-        """
-        Called when a user presence update is received from the room group.
-        """
-        # Send user presence update to WebSocket
-        await self.send(text_data=json.dumps({
-            "type": "presence",
-            "user_id": event["user_id"],
-            "username": event["username"],
-            "is_online": event["is_online"],
-            "timestamp": event["timestamp"],
-        }))
+    async def send_encoded(self, data):
+        if isinstance(data, bytes):
+            await self.send(bytes_data=data)
+        else:
+            await self.send(text_data=data)
+    
+    async def forward_frame(self, event):
+        """
+        Forward a pre-encoded broadcast from the room group to the WebSocket.
+        """
+        await self.send_encoded(event["frames"][self.wire_format])
+    
+    # Group event handlers: new messages, typing snapshots, read receipts
+    # and presence updates all arrive pre-encoded.
+    chat_message = forward_frame
+    typing_snapshot = forward_frame
+    read_receipts = forward_frame
+    user_presence = forward_frame
     
     @database_sync_to_async
     def room_exists(self):
@@ -243,84 +273,128 @@ class ChatConsumer(AsyncWebsocketConsumer):
         return message
     
     @database_sync_to_async
-    def mark_message_as_read(self, message_id):
+    def advance_read_watermark(self, message_id):
         """
-        Mark a message as read.
+        Mark everything up to `message_id` read for this user (one UPDATE).
+        Returns the message's timestamp if their watermark moved, else None.
         """
-        try:
-            message = ChatMessage.objects.get(id=message_id)
-            message.mark_as_read()
-            return True
-        except ChatMessage.DoesNotExist:
-            return False
+        timestamp = self.message_timestamp(message_id)
+        if timestamp is None or not advance_read_watermark(self.user.id, self.room.id, timestamp, message_id):
+            return None
+        return timestamp
+    
+    def message_timestamp(self, message_id):
+        """Timestamp of `message_id` in this room, written or still buffered; None if unknown."""
+        for message in message_pipeline.pending_for_room(self.room.id):
+            if message.id == message_id:
+                return message.timestamp
+        return (
+            ChatMessage.objects
+            .filter(room=self.room, pk=message_id)
+            .values_list('timestamp', flat=True)
+            .first()
+        )
     
     @database_sync_to_async
-    def update_user_presence(self, is_online=True):
+    def join_presence(self):
         """
-        Update user presence in the chat room.
+        Register this connection with the presence service (see chat/presence.py).
+        Returns True if the user just came online in the room.
         """
-        presence, created = UserPresence.objects.get_or_create(
-            user=self.user,
-            room=self.room,
-            defaults={"is_online": is_online}
-        )
-        
-        if not created:
-            presence.update_presence(is_online)
-        
-        return presence
+        return presence.connect(self.user, self.room, self.channel_name)
+    
+    @sync_to_async
+    def refresh_presence(self):
+        """
+        Keep this connection's presence entry from expiring.
+        """
+        return presence.heartbeat(self.user, self.room, self.channel_name)
+    
+    @sync_to_async
+    def leave_presence(self):
+        """
+        Drop this connection. Returns True if the user has no connections left in the room.
+        """
+        return presence.disconnect(self.user, self.room, self.channel_name)
+    
+    async def heartbeat_presence(self):
+        """
+        Refresh presence every heartbeat interval for as long as the socket is open.
+        """
+        while True:
+            await asyncio.sleep(presence.heartbeat_interval)
+            await self.refresh_presence()
     
     @database_sync_to_async
-    def get_chat_history(self, limit=50):
+    def get_chat_history(self, limit=50, before=None):
         """
-        Get the chat history for the room.
+        Get a page of chat history for the room (keyset, see chat/pagination.py).
+        
+        Returns (history, page); the latest page also includes messages
+        still waiting in the write-behind buffer.
         """
-        messages = ChatMessage.objects.filter(room=self.room).order_by('-timestamp')[:limit]
+        page = paginate_messages(message_values(self.room.messages.all()), before=before, limit=limit)
+        rows = page.messages
         
-        # Convert to list of dictionaries for JSON serialization
-        history = []
-        for message in reversed(list(messages)):
-            history.append({
-                "message_id": message.id,
-                "user_id": message.user.id,
-                "username": message.user.username,
-                "content": message.content,
-                "is_code": message.is_code,
-                "code_language": message.code_language,
-                "timestamp": message.timestamp.isoformat(),
-                "is_edited": message.is_edited,
-                "edited_at": message.edited_at.isoformat() if message.edited_at else None,
-            })
+        if before is None:
+            # Include messages already broadcast but still waiting in the
+            # write-behind buffer, so a client joining mid-flush doesn't miss them
+            saved_ids = {row['id'] for row in rows}
+            pending = [
+                message_row(m) for m in message_pipeline.pending_for_room(self.room.id)
+                if m.id not in saved_ids
+            ]
+            # Ids come from per-process blocks, so they aren't in send
+            # order across workers; (timestamp, id) is, as in pagination.
+            merged = sorted(rows + pending, key=lambda row: (row['timestamp'], row['id']))
+            rows = merged[-limit:]
+            if rows:
+                # Page back from the oldest row actually sent, so saved rows
+                # pushed out by buffered ones stay reachable.
+                page = replace(
+                    page,
+                    before=encode_cursor(rows[0], 'timestamp'),
+                    has_more=page.has_more or len(merged) > limit,
+                )
         
-        return history
+        history = [serialize_message(row, id_key='message_id') for row in rows]
+        return history, page
     
-    @database_sync_to_async
+    @sync_to_async
     def get_online_users(self):
         """
         Get the list of online users in the chat room.
         """
-        presences = UserPresence.objects.filter(room=self.room, is_online=True)
-        
-        # Convert to list of dictionaries for JSON serialization
-        users = []
-        for presence in presences:
-            users.append({
-                "user_id": presence.user.id,
-                "username": presence.user.username,
-                "last_seen": presence.last_seen.isoformat(),
-            })
-        
-        return users
+        return [serialize_presence(row) for row in presence.online_users(self.room)]
     
     async def send_chat_history(self):
         """
         Send chat history to the connected user.
         """
-        history = await self.get_chat_history()
+        history, page = await self.get_chat_history()
         online_users = await self.get_online_users()
         
-        await self.send(text_data=json.dumps({
+        await self.send_frame({
             "type": "history",
             "messages": history,
             "online_users": online_users,
-        }))
\ No newline at end of file
+            "has_more": page.has_more,
+            "before": page.before,
+        })
+    
+    async def send_older_history(self, before, limit=None):
+        """
+        Send the page of history older than the `before` cursor.
+        """
+        try:
+            history, page = await self.get_chat_history(limit=page_size(limit), before=before)
+        except InvalidCursor:
+            await self.send_frame({"type": "error", "error": "Invalid cursor"})
+            return
+        
+        await self.send_frame({
+            "type": "history_page",
+            "messages": history,
+            "has_more": page.has_more,
+            "before": page.before,
+        })
\ No newline at end of file
@@ -0,0 +1,187 @@
+"""
+Materialized read state per (user, room): unread counts and watermarks.
+
+Room lists used to run a COUNT(*) over ChatNotification per room card.
+Instead, ChatUnreadCounter rows are bumped in one statement whenever
+notifications are fanned out (`add_unread_for_messages`) and reset when
+the user reads the room (`mark_room_read` / `mark_notifications_read`).
+
+Readers in a live room advance a last-read watermark instead of flagging
+messages one by one: `advance_read_watermark` moves it and recomputes the
+unread count in a single statement, and notifications at or below the
+watermark count as read (`unread_notifications`). Like history pages
+(chat/pagination.py), the watermark is a message's (timestamp, id): ids
+are handed out in per-process blocks (chat/pipeline.py), so a later
+message can have a lower id than an earlier one.
+
+Readers use `unread_counts()` / `total_unread()`: one query for any number
+of rooms. Online counts come from the presence service (chat/presence.py).
+"""
+from django.db import connection
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Greatest
+
+from .models import ChatMessage, ChatNotification, ChatUnreadCounter
+
+# Backends that understand INSERT ... ON CONFLICT (...) DO UPDATE.
+_UPSERT_VENDORS = ('postgresql', 'sqlite')
+
+
+def add_unread_for_messages(message_ids):
+    """
+    Add the unread notifications just created for `message_ids` to the
+    counters, skipping messages at or below the recipient's watermark.
+    """
+    if not message_ids:
+        return
+    if connection.vendor not in _UPSERT_VENDORS:
+        _add_unread_fallback(message_ids)
+        return
+
+    qn = connection.ops.quote_name
+    counter = qn(ChatUnreadCounter._meta.db_table)
+    notification = qn(ChatNotification._meta.db_table)
+    message = qn(ChatMessage._meta.db_table)
+    placeholders = ", ".join(["%s"] * len(message_ids))
+    sql = (
+        f"INSERT INTO {counter} ({qn('user_id')}, {qn('room_id')}, {qn('count')}, {qn('last_read_message_id')}) "
+        f"SELECT n.{qn('user_id')}, n.{qn('room_id')}, COUNT(*), 0 FROM {notification} n "
+        f"INNER JOIN {message} m ON m.{qn('id')} = n.{qn('message_id')} "
+        f"LEFT JOIN {counter} c ON c.{qn('user_id')} = n.{qn('user_id')} AND c.{qn('room_id')} = n.{qn('room_id')} "
+        f"WHERE n.{qn('message_id')} IN ({placeholders}) AND n.{qn('is_read')} = %s "
+        f"AND (c.{qn('last_read_timestamp')} IS NULL "
+        f"OR m.{qn('timestamp')} > c.{qn('last_read_timestamp')} "
+        f"OR (m.{qn('timestamp')} = c.{qn('last_read_timestamp')} AND m.{qn('id')} > c.{qn('last_read_message_id')})) "
+        f"GROUP BY n.{qn('user_id')}, n.{qn('room_id')} "
+        f"ON CONFLICT ({qn('user_id')}, {qn('room_id')}) "
+        f"DO UPDATE SET {qn('count')} = {counter}.{qn('count')} + excluded.{qn('count')}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*message_ids, False])
+
+
+def _add_unread_fallback(message_ids):
+    rows = (
+        _above_watermark(ChatNotification.objects.filter(message_id__in=message_ids, is_read=False))
+        .values('user_id', 'room_id')
+        .annotate(total=Count('id'))
+    )
+    for row in rows:
+        counter, _ = ChatUnreadCounter.objects.get_or_create(user_id=row['user_id'], room_id=row['room_id'])
+        ChatUnreadCounter.objects.filter(pk=counter.pk).update(count=F('count') + row['total'])
+
+
+def advance_read_watermark(user_id, room_id, timestamp, message_id):
+    """
+    Move the (user, room) last-read watermark up to the message
+    (`timestamp`, `message_id`) and recompute the unread count, in one
+    statement. Watermarks never move backwards. Returns True if the
+    watermark moved.
+    """
+    if connection.vendor not in _UPSERT_VENDORS:
+        return _advance_watermark_fallback(user_id, room_id, timestamp, message_id)
+
+    qn = connection.ops.quote_name
+    counter = qn(ChatUnreadCounter._meta.db_table)
+    notification = qn(ChatNotification._meta.db_table)
+    message = qn(ChatMessage._meta.db_table)
+    ts, last_ts, last_id = qn('timestamp'), qn('last_read_timestamp'), qn('last_read_message_id')
+    sql = (
+        f"INSERT INTO {counter} ({qn('user_id')}, {qn('room_id')}, {qn('count')}, {last_ts}, {last_id}) "
+        f"VALUES (%s, %s, (SELECT COUNT(*) FROM {notification} n "
+        f"INNER JOIN {message} m ON m.{qn('id')} = n.{qn('message_id')} "
+        f"WHERE n.{qn('user_id')} = %s AND n.{qn('room_id')} = %s AND n.{qn('is_read')} = %s "
+        f"AND (m.{ts} > %s OR (m.{ts} = %s AND m.{qn('id')} > %s))), %s, %s) "
+        f"ON CONFLICT ({qn('user_id')}, {qn('room_id')}) DO UPDATE SET "
+        f"{last_ts} = excluded.{last_ts}, "
+        f"{last_id} = excluded.{last_id}, "
+        f"{qn('count')} = excluded.{qn('count')} "
+        f"WHERE {counter}.{last_ts} IS NULL "
+        f"OR {counter}.{last_ts} < excluded.{last_ts} "
+        f"OR ({counter}.{last_ts} = excluded.{last_ts} AND {counter}.{last_id} < excluded.{last_id})"
+    )
+    timestamp = connection.ops.adapt_datetimefield_value(timestamp)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [
+            user_id, room_id, user_id, room_id, False,
+            timestamp, timestamp, message_id, timestamp, message_id,
+        ])
+        return cursor.rowcount > 0
+
+
+def _advance_watermark_fallback(user_id, room_id, timestamp, message_id):
+    counter, _ = ChatUnreadCounter.objects.get_or_create(user_id=user_id, room_id=room_id)
+    unread = ChatNotification.objects.filter(user_id=user_id, room_id=room_id, is_read=False).filter(
+        Q(message__timestamp__gt=timestamp) | Q(message__timestamp=timestamp, message_id__gt=message_id)
+    )
+    behind = (
+        Q(last_read_timestamp__isnull=True)
+        | Q(last_read_timestamp__lt=timestamp)
+        | Q(last_read_timestamp=timestamp, last_read_message_id__lt=message_id)
+    )
+    return bool(
+        ChatUnreadCounter.objects
+        .filter(behind, pk=counter.pk)
+        .update(last_read_timestamp=timestamp, last_read_message_id=message_id, count=unread.count())
+    )
+
+
+def _above_watermark(notifications):
+    """`notifications` whose message comes after its room's watermark for the recipient."""
+    counters = ChatUnreadCounter.objects.filter(user_id=OuterRef('user_id'), room_id=OuterRef('room_id'))
+    return (
+        notifications
+        .annotate(
+            watermark_timestamp=Subquery(counters.values('last_read_timestamp')[:1]),
+            watermark_id=Subquery(counters.values('last_read_message_id')[:1]),
+        )
+        .filter(
+            Q(watermark_timestamp__isnull=True)
+            | Q(message__timestamp__gt=F('watermark_timestamp'))
+            | Q(message__timestamp=F('watermark_timestamp'), message_id__gt=F('watermark_id'))
+        )
+    )
+
+
+def unread_notifications(user):
+    """`user`'s unread notifications, excluding those at or below each room's watermark."""
+    return _above_watermark(ChatNotification.objects.filter(user=user, is_read=False))
+
+
+def mark_room_read(user, room):
+    """Mark everything in `room` read for `user`: notifications, counter and watermark."""
+    ChatNotification.objects.filter(user=user, room=room, is_read=False).update(is_read=True)
+    ChatUnreadCounter.objects.filter(user=user, room=room).update(count=0)
+    latest = room.messages.order_by('-timestamp', '-id').values_list('timestamp', 'id').first()
+    if latest is not None:
+        advance_read_watermark(user.id, room.id, *latest)
+
+
+def mark_notifications_read(user, notification_ids=None):
+    """Mark specific notifications (or all of them) read, keeping counters in step."""
+    if not notification_ids:
+        ChatNotification.objects.filter(user=user, is_read=False).update(is_read=True)
+        ChatUnreadCounter.objects.filter(user=user).update(count=0)
+        return
+
+    unread = ChatNotification.objects.filter(id__in=notification_ids, user=user, is_read=False)
+    # Notifications at or below the watermark were never in the count.
+    per_room = list(_above_watermark(unread).values('room_id').annotate(total=Count('id')))
+    unread.update(is_read=True)
+    for row in per_room:
+        ChatUnreadCounter.objects.filter(user=user, room_id=row['room_id']).update(
+            count=Greatest(F('count') - row['total'], 0)
+        )
+
+
+def unread_counts(user, room_ids=None):
+    """{room_id: unread count} for `user`, optionally limited to `room_ids`. One query."""
+    counters = ChatUnreadCounter.objects.filter(user=user, count__gt=0)
+    if room_ids is not None:
+        counters = counters.filter(room_id__in=room_ids)
+    return dict(counters.values_list('room_id', 'count'))
+
+
+def total_unread(user):
+    """Unread notifications across all of `user`'s rooms. One query."""
+    return ChatUnreadCounter.objects.filter(user=user).aggregate(total=Sum('count'))['total'] or 0
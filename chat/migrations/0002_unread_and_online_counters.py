@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_counters(apps, schema_editor):
+    """Seed the new counters from the existing presence/notification rows."""
+    ChatRoom = apps.get_model('chat', 'ChatRoom')
+    ChatNotification = apps.get_model('chat', 'ChatNotification')
+    ChatUnreadCounter = apps.get_model('chat', 'ChatUnreadCounter')
+
+    rooms = ChatRoom.objects.annotate(online=Count('presence', filter=Q(presence__is_online=True)))
+    for room in rooms:
+        ChatRoom.objects.filter(pk=room.pk).update(online_count=room.online)
+
+    unread = (
+        ChatNotification.objects
+        .filter(is_read=False)
+        .values('user_id', 'room_id')
+        .annotate(total=Count('id'))
+    )
+    ChatUnreadCounter.objects.bulk_create(
+        [ChatUnreadCounter(user_id=row['user_id'], room_id=row['room_id'], count=row['total']) for row in unread],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatroom',
+            name='online_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='online count'),
+        ),
+        migrations.CreateModel(
+            name='ChatUnreadCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='count')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unread_counters', to='chat.chatroom', verbose_name='room')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chat_unread_counters', to=settings.AUTH_USER_MODEL, verbose_name='user')),
+            ],
+            options={
+                'verbose_name': 'chat unread counter',
+                'verbose_name_plural': 'chat unread counters',
+                'unique_together': {('user', 'room')},
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
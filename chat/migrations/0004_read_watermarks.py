@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0003_chatmessage_room_timestamp_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatunreadcounter',
+            name='last_read_message_id',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='last read message id'),
+        ),
+    ]
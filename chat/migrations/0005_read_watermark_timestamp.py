@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:58
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_watermark_timestamps(apps, schema_editor):
+    """Give existing id-only watermarks the timestamp of the message they point at."""
+    ChatMessage = apps.get_model('chat', 'ChatMessage')
+    ChatUnreadCounter = apps.get_model('chat', 'ChatUnreadCounter')
+
+    timestamp = ChatMessage.objects.filter(pk=OuterRef('last_read_message_id')).values('timestamp')[:1]
+    ChatUnreadCounter.objects.filter(last_read_message_id__gt=0).update(last_read_timestamp=Subquery(timestamp))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_read_watermarks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatunreadcounter',
+            name='last_read_timestamp',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='last read timestamp'),
+        ),
+        migrations.RunPython(backfill_watermark_timestamps, migrations.RunPython.noop),
+    ]
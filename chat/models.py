@@ -48,6 +48,10 @@ class ChatRoom(models.Model):
     is_active = models.BooleanField(_('is active'), default=True)
     max_participants = models.PositiveIntegerField(_('max participants'), default=0, help_text=_('0 for unlimited'))
     
+    # Users online as of the last presence checkpoint (chat/presence.py);
+    # live counts come from the presence service
+    online_count = models.PositiveIntegerField(_('online count'), default=0)
+    
     class Meta:
         verbose_name = _('chat room')
         verbose_name_plural = _('chat rooms')
@@ -127,6 +131,10 @@ class ChatMessage(models.Model):
         verbose_name = _('chat message')
         verbose_name_plural = _('chat messages')
         ordering = ['timestamp']
+        indexes = [
+            # Keyset pagination over a room's history (chat/pagination.py)
+            models.Index(fields=['room', 'timestamp', 'id'], name='chat_msg_room_ts_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username}: {self.content[:50]}"
@@ -211,4 +219,40 @@ class UserPresence(models.Model):
     def update_presence(self, is_online=True):
         """Update user presence status"""
         self.is_online = is_online
-        self.save()
\ No newline at end of file
+        self.save()
+
+
+class ChatUnreadCounter(models.Model):
+    """
+    Per-(user, room) read state: unread count and last-read watermark.
+
+    Maintained by chat.counters: the count is bumped when notifications are
+    fanned out and recomputed whenever the watermark advances. Lets room
+    lists show unread badges without a COUNT(*) over ChatNotification per
+    room, and replaces the global ChatMessage.is_read flag for readers.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='chat_unread_counters',
+        verbose_name=_('user')
+    )
+    room = models.ForeignKey(
+        ChatRoom,
+        on_delete=models.CASCADE,
+        related_name='unread_counters',
+        verbose_name=_('room')
+    )
+    count = models.PositiveIntegerField(_('count'), default=0)
+    # (timestamp, id) of the latest message the user has read in the room;
+    # everything at or below it counts as read. Null timestamp: nothing read
+    last_read_timestamp = models.DateTimeField(_('last read timestamp'), null=True, blank=True)
+    last_read_message_id = models.PositiveBigIntegerField(_('last read message id'), default=0)
+    
+    class Meta:
+        verbose_name = _('chat unread counter')
+        verbose_name_plural = _('chat unread counters')
+        unique_together = ('user', 'room')
+    
+    def __str__(self):
+        return f"{self.user.username} has {self.count} unread in {self.room.name}"
@@ -0,0 +1,167 @@
+"""
+Notification fan-out for new chat messages.
+
+A message notifies every recipient in its room: participants of a private
+room, or users with a UserPresence row in a public/global room. Rather
+than one INSERT per recipient, fan-out is set-based:
+
+- `fan_out_notifications()` handles one message with a single
+  INSERT ... SELECT straight from the presence/participant table, so the
+  recipient rows never round-trip through Python (used by the post_save
+  signal).
+- `create_notifications()` handles a batch of messages with one recipient
+  lookup per room and one bulk_create (used by the write-behind pipeline).
+
+Both paths also bump the materialized unread counters (chat/counters.py)
+with one extra upsert per call, not one write per recipient.
+
+With CHAT_NOTIFICATIONS_DEFERRED the signal hands fan-out to a background
+worker after the message commits, so the sender's request doesn't wait on
+it at all.
+"""
+import atexit
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .counters import add_unread_for_messages
+from .models import ChatNotification, ChatRoom, UserPresence
+
+logger = logging.getLogger('chat')
+
+# Backends that understand INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+_UPSERT_VENDORS = ('postgresql', 'sqlite')
+
+# One worker keeps deferred jobs in submission order and caps the extra
+# DB connections at one per process.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chat-notify')
+atexit.register(_executor.shutdown, wait=True)
+
+
+def recipient_ids(room):
+    """
+    Ids of the users who get a notification for a new message in `room`.
+
+    Private rooms notify their participants; public and global rooms notify
+    users who have explicitly joined (have a UserPresence row).
+    """
+    if room.is_private:
+        return list(room.participants.values_list('id', flat=True))
+    return list(UserPresence.objects.filter(room=room).values_list('user_id', flat=True))
+
+
+def create_notifications(messages):
+    """
+    Bulk-insert the ChatNotification rows for a batch of new messages.
+
+    Recipients are looked up once per room, not once per message, and the
+    rows go in with a single bulk_create. The call is idempotent: messages
+    that already have notifications are skipped (so unread counters aren't
+    bumped twice), and `ignore_conflicts` covers any remaining race on the
+    (user, message) unique constraint.
+
+    Returns the number of notification rows attempted.
+    """
+    already_notified = set(
+        ChatNotification.objects
+        .filter(message_id__in=[message.id for message in messages])
+        .values_list('message_id', flat=True)
+        .distinct()
+    )
+    by_room = defaultdict(list)
+    for message in messages:
+        if message.id not in already_notified:
+            by_room[message.room_id].append(message)
+
+    notifications = []
+    for room_messages in by_room.values():
+        room = room_messages[0].room
+        recipients = recipient_ids(room)
+        for message in room_messages:
+            notifications.extend(
+                ChatNotification(user_id=user_id, room_id=room.id, message_id=message.id)
+                for user_id in recipients
+                if user_id != message.user_id
+            )
+
+    ChatNotification.objects.bulk_create(notifications, batch_size=1000, ignore_conflicts=True)
+    add_unread_for_messages([m.id for room_messages in by_room.values() for m in room_messages])
+    return len(notifications)
+
+
+def fan_out_notifications(message_id, room_id, sender_id, is_private):
+    """
+    Create every notification for one message in a single statement.
+
+    Takes plain ids (not model instances) so it can run on the deferred
+    worker without sharing ORM objects across threads. Returns the number
+    of rows inserted.
+    """
+    if connection.vendor not in _UPSERT_VENDORS:
+        room = ChatRoom.objects.get(pk=room_id)
+        message = room.messages.get(pk=message_id)
+        return create_notifications([message])
+
+    if is_private:
+        through = ChatRoom.participants.through._meta
+        source = through.db_table
+        room_column = through.get_field('chatroom').column
+        user_column = through.get_field('user').column
+    else:
+        presence = UserPresence._meta
+        source = presence.db_table
+        room_column = presence.get_field('room').column
+        user_column = presence.get_field('user').column
+
+    qn = connection.ops.quote_name
+    notification = ChatNotification._meta
+    columns = ", ".join(
+        qn(notification.get_field(name).column)
+        for name in ('user', 'room', 'message', 'timestamp', 'is_read')
+    )
+    sql = (
+        f"INSERT INTO {qn(notification.db_table)} ({columns}) "
+        f"SELECT {qn(user_column)}, %s, %s, %s, %s FROM {qn(source)} "
+        f"WHERE {qn(room_column)} = %s AND {qn(user_column)} <> %s "
+        f"ON CONFLICT DO NOTHING"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [room_id, message_id, timezone.now(), False, room_id, sender_id])
+        inserted = cursor.rowcount
+    # A repeat call inserts nothing; don't count its notifications twice.
+    if inserted:
+        add_unread_for_messages([message_id])
+    return inserted
+
+
+def _deferred_fan_out(*args):
+    try:
+        fan_out_notifications(*args)
+    except Exception:
+        logger.exception("Deferred notification fan-out failed for message %s", args[0])
+    finally:
+        # Worker threads outlive requests; don't leak their connection.
+        close_old_connections()
+
+
+def schedule_fan_out(message):
+    """
+    Fan out notifications for `message`, inline or on the background worker.
+
+    Deferred jobs are queued with transaction.on_commit, so the worker never
+    sees a message its creating transaction later rolls back.
+    """
+    args = (message.id, message.room_id, message.user_id, message.room.is_private)
+    if not getattr(settings, 'CHAT_NOTIFICATIONS_DEFERRED', False):
+        fan_out_notifications(*args)
+        return
+    transaction.on_commit(lambda: _executor.submit(_deferred_fan_out, *args))
+
+
+def wait_for_deferred():
+    """Block until every deferred fan-out queued so far has run (tests, benchmarks)."""
+    _executor.submit(lambda: None).result()
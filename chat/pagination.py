@@ -0,0 +1,100 @@
+"""
+Keyset (cursor) pagination for chat history.
+
+Messages are ordered by (timestamp, id) within a room, which is unique
+even when timestamps collide, and match the composite
+(room, timestamp, id) index on ChatMessage. A page is fetched with a
+single range scan on that index, so paging deep into a room with
+millions of messages costs the same as fetching the latest page — no
+OFFSET, and no extra lookup to resolve where the previous page ended.
+
+Cursors are opaque to clients (utils/cursors.py): they encode the
+boundary message's (timestamp, id). Every page carries a `before`
+cursor (pass it back for older messages) and an `after` cursor (for
+newer ones).
+"""
+from dataclasses import dataclass
+
+from django.db.models import Q
+
+from utils.cursors import InvalidCursor, decode_cursor, encode_cursor
+
+from .models import ChatMessage
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+def page_size(value, default=DEFAULT_PAGE_SIZE):
+    """Parse a client-supplied limit, clamped to 1..MAX_PAGE_SIZE."""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+@dataclass
+class MessagePage:
+    """One page of chat history, oldest message first."""
+    messages: list
+    has_more: bool
+    before: str = None
+    after: str = None
+
+
+def paginate_messages(queryset, before=None, after=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Fetch one page of `queryset` (a room's messages, as instances or
+    values() rows) by keyset.
+
+    With no cursor this is the latest page. `before` pages backwards to
+    older messages, `after` forwards to newer ones; `has_more` says whether
+    another page exists in that direction. Raises InvalidCursor for
+    malformed cursors.
+    """
+    if before and after:
+        raise InvalidCursor("Pass either 'before' or 'after', not both.")
+
+    if after:
+        timestamp, message_id = decode_cursor(after)
+        # The redundant timestamp__gte bound turns the OR into an index range.
+        rows = (
+            queryset
+            .filter(timestamp__gte=timestamp)
+            .filter(Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=message_id))
+            .order_by('timestamp', 'id')
+        )
+        messages = list(rows[:limit + 1])
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+    else:
+        rows = queryset.order_by('-timestamp', '-id')
+        if before:
+            timestamp, message_id = decode_cursor(before)
+            rows = (
+                rows
+                .filter(timestamp__lte=timestamp)
+                .filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=message_id))
+            )
+        messages = list(rows[:limit + 1])
+        has_more = len(messages) > limit
+        messages = messages[:limit][::-1]
+
+    return MessagePage(
+        messages=messages,
+        has_more=has_more,
+        before=encode_cursor(messages[0], 'timestamp') if messages else before,
+        after=encode_cursor(messages[-1], 'timestamp') if messages else after,
+    )
+
+
+def cursor_for_message_id(room, message_id):
+    """Cursor for a legacy `before_id` parameter, or None if it isn't in `room`."""
+    message = (
+        ChatMessage.objects
+        .filter(room=room, id=message_id)
+        .only('id', 'timestamp')
+        .first()
+    )
+    return encode_cursor(message, 'timestamp') if message else None
@@ -0,0 +1,264 @@
+"""
+Write-behind persistence for chat messages.
+
+ChatConsumer used to await a ChatMessage INSERT — plus one ChatNotification
+INSERT per recipient via post_save — before broadcasting, so send latency
+grew with room size. The pipeline reverses the order:
+
+1. `build()` gives the message its primary key from a block of ids
+   reserved ahead of time (`reserve_message_ids`), so the broadcast can
+   carry the real id before the row exists.
+2. The consumer broadcasts straight away and hands the unsaved message
+   to `submit()`.
+3. A background task writes pending messages with one bulk_create, plus
+   one bulk notification insert, every CHAT_FLUSH_INTERVAL seconds or
+   CHAT_FLUSH_BATCH_SIZE messages, whichever comes first.
+
+Durability guarantees:
+
+- A broadcast message is committed within one flush interval, unless the
+  process is killed hard (SIGKILL / OOM). Graceful exits drain the buffer
+  through an atexit hook; ASGI servers with a shutdown hook can await
+  `drain()` instead.
+- Writes are idempotent (explicit ids + ignore_conflicts), so a failed
+  batch is retried CHAT_FLUSH_RETRIES times with backoff. A batch that
+  keeps failing is split and written row by row, so one bad row can't
+  take its neighbours down; rows that still fail are logged at ERROR on
+  the `chat` logger with their full payload for replay.
+- Memory is bounded: once CHAT_MAX_PENDING messages are waiting,
+  `submit()` flushes inline before accepting more (backpressure).
+
+Set CHAT_WRITE_BEHIND = False for commit-before-broadcast semantics; the
+consumer then writes each message inline as before.
+"""
+import asyncio
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from .models import ChatMessage
+from .notifications import create_notifications
+
+logger = logging.getLogger('chat')
+
+# Backends whose id sequence reserve_message_ids() knows how to advance.
+_ID_RESERVATION_VENDORS = ('postgresql', 'sqlite')
+
+
+def write_behind_enabled():
+    """Whether ChatConsumer should route new messages through the pipeline."""
+    return (
+        getattr(settings, 'CHAT_WRITE_BEHIND', True)
+        and connection.vendor in _ID_RESERVATION_VENDORS
+    )
+
+
+def reserve_message_ids(count):
+    """
+    Advance ChatMessage's id sequence by `count` and return the reserved ids.
+
+    Ids handed out here are never reused by an ordinary INSERT, so messages
+    built from them can be bulk-inserted later with their pk already set.
+    """
+    table = ChatMessage._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+                [table, count],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+        # SQLite AUTOINCREMENT keeps its high-water mark in sqlite_sequence.
+        # UPDATE first so the write lock is taken before reading it back.
+        cursor.execute(
+            "UPDATE sqlite_sequence SET seq = seq + %s WHERE name = %s",
+            [count, table],
+        )
+        if cursor.rowcount:
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = %s", [table])
+            end = cursor.fetchone()[0]
+        else:
+            # Table has never held a row, so there's no sequence entry yet.
+            cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {connection.ops.quote_name(table)}")
+            end = cursor.fetchone()[0] + count
+            cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)", [table, end])
+        return list(range(end - count + 1, end + 1))
+
+
+class MessagePipeline:
+    """Buffers ChatMessages built with pre-assigned ids and bulk-writes them."""
+
+    def __init__(self, batch_size=None, interval=None, max_pending=None,
+                 id_block_size=None, retries=None):
+        self.batch_size = batch_size or getattr(settings, 'CHAT_FLUSH_BATCH_SIZE', 100)
+        self.interval = interval or getattr(settings, 'CHAT_FLUSH_INTERVAL', 0.05)
+        self.max_pending = max_pending or getattr(settings, 'CHAT_MAX_PENDING', 5000)
+        self.id_block_size = id_block_size or getattr(settings, 'CHAT_ID_BLOCK_SIZE', 100)
+        self.retries = retries if retries is not None else getattr(settings, 'CHAT_FLUSH_RETRIES', 3)
+
+        self._ids = deque()
+        self._pending = []
+        # Guards the pending buffer and serialises writes between the event
+        # loop's worker threads and the atexit drain.
+        self._buffer_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+        self._loop = None
+        self._id_lock = None
+        self._has_pending = None
+        self._batch_full = None
+        self._flusher = None
+        self._atexit_registered = False
+
+    # ---------- Producer side ----------
+
+    async def build(self, **fields):
+        """Return an unsaved ChatMessage with its id and timestamp assigned."""
+        self._bind_loop()
+        async with self._id_lock:
+            if not self._ids:
+                self._ids.extend(await database_sync_to_async(reserve_message_ids)(self.id_block_size))
+            message_id = self._ids.popleft()
+        fields.setdefault('timestamp', timezone.now())
+        return ChatMessage(id=message_id, **fields)
+
+    async def submit(self, message):
+        """Queue a message built by build() for the next flush."""
+        self._bind_loop()
+        if len(self._pending) >= self.max_pending:
+            await self.flush()
+        with self._buffer_lock:
+            self._pending.append(message)
+            pending = len(self._pending)
+        self._has_pending.set()
+        if pending >= self.batch_size:
+            self._batch_full.set()
+
+    def pending_for_room(self, room_id):
+        """Messages accepted for `room_id` but not yet written, oldest first."""
+        with self._buffer_lock:
+            return [m for m in self._pending if m.room_id == room_id]
+
+    # ---------- Flushing ----------
+
+    async def flush(self):
+        """Write everything currently pending."""
+        batch = self._take_pending()
+        if batch:
+            await self._write(batch)
+
+    async def drain(self):
+        """Stop the background flusher and write whatever is left."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+
+    def drain_sync(self):
+        """Blocking drain for interpreter shutdown, when no loop is running."""
+        batch = self._take_pending()
+        if batch:
+            for attempt in range(self.retries):
+                if self._try_batch(batch, attempt):
+                    return
+                time.sleep(self._backoff(attempt))
+            self._write_each(batch)
+
+    def _take_pending(self):
+        with self._buffer_lock:
+            batch, self._pending = self._pending, []
+        return batch
+
+    async def _run(self):
+        while True:
+            await self._has_pending.wait()
+            if len(self._pending) < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._has_pending.clear()
+            self._batch_full.clear()
+            try:
+                await self.flush()
+            except Exception:
+                # _write already isolates and logs bad rows; never let the
+                # flusher die and strand later messages.
+                logger.exception("Chat message flush failed")
+
+    async def _write(self, batch):
+        # The writes run on Channels' single DB thread; the backoff between
+        # attempts must not, or it would stall every other ORM call.
+        for attempt in range(self.retries):
+            if await database_sync_to_async(self._try_batch)(batch, attempt):
+                return
+            await asyncio.sleep(self._backoff(attempt))
+        await database_sync_to_async(self._write_each)(batch)
+
+    @staticmethod
+    def _backoff(attempt):
+        return 0.05 * 2 ** attempt
+
+    def _try_batch(self, batch, attempt):
+        """Write `batch` in one transaction; False (logged) if the database refused it."""
+        with self._write_lock:
+            try:
+                self._write_batch(batch)
+                return True
+            except DatabaseError:
+                logger.warning(
+                    "Chat flush of %d messages failed (attempt %d/%d)",
+                    len(batch), attempt + 1, self.retries, exc_info=True,
+                )
+                return False
+
+    def _write_each(self, batch):
+        """Last resort after the retries: write row by row, logging any row that still fails."""
+        with self._write_lock:
+            for message in batch:
+                try:
+                    self._write_batch([message])
+                except DatabaseError:
+                    logger.error(
+                        "Dropping chat message id=%s room=%s user=%s timestamp=%s content=%r",
+                        message.id, message.room_id, message.user_id,
+                        message.timestamp.isoformat(), message.content,
+                        exc_info=True,
+                    )
+
+    def _write_batch(self, batch):
+        with transaction.atomic():
+            ChatMessage.objects.bulk_create(batch, batch_size=self.batch_size, ignore_conflicts=True)
+            create_notifications(batch)
+
+    def _bind_loop(self):
+        """(Re)create loop-bound primitives when first used on a new event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._flusher is not None and not self._flusher.done():
+            return
+        if self._loop is not loop:
+            self._loop = loop
+            self._id_lock = asyncio.Lock()
+            self._has_pending = asyncio.Event()
+            self._batch_full = asyncio.Event()
+            if self._pending:
+                self._has_pending.set()
+        self._flusher = loop.create_task(self._run())
+        if not self._atexit_registered:
+            atexit.register(self.drain_sync)
+            self._atexit_registered = True
+
+
+message_pipeline = MessagePipeline()
@@ -0,0 +1,351 @@
+"""
+Presence service: who is online in which chat room.
+
+Online state used to live in UserPresence, written on every WebSocket
+connect/disconnect and every chat page view, and read back with filter
+queries. It now lives in a presence backend, and the database is only
+brought up to date periodically:
+
+- Each WebSocket connection registers itself with `connect()` and then
+  heartbeats every CHAT_PRESENCE_HEARTBEAT seconds. An entry that misses
+  heartbeats for CHAT_PRESENCE_TTL seconds expires on its own, so users
+  on a crashed worker drop off without a disconnect ever running.
+- A user is online while any of their connections is live, so closing one
+  of two tabs doesn't mark them offline.
+- Every CHAT_PRESENCE_CHECKPOINT_INTERVAL seconds `checkpoint()` copies
+  the live state of recently changed rooms to UserPresence.is_online /
+  last_seen and ChatRoom.online_count. That's a fixed three UPDATEs per
+  changed room, however many users came and went.
+
+UserPresence rows still record room membership (public-room notifications
+go to members, see chat/notifications.py). `ensure_member()` creates one
+on first visit and is served from the cache afterwards.
+
+Backends: `InMemoryPresenceBackend` (single process; tests and local
+development) and `RedisPresenceBackend` (shared between workers, via the
+django-redis connection). CHAT_PRESENCE_BACKEND picks one by dotted path.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import ChatRoom, UserPresence
+
+logger = logging.getLogger('chat')
+
+_MEMBER_CACHE_PREFIX = 'chat:member:'
+_MEMBER_CACHE_TTL = 60 * 60 * 24
+
+
+def _timestamp(expires_at, ttl):
+    """Datetime of the last heartbeat of an entry expiring at `expires_at`."""
+    return datetime.fromtimestamp(expires_at - ttl, tz=dt_timezone.utc)
+
+
+class InMemoryPresenceBackend:
+    """Process-local presence. Only correct with a single worker process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # room_id -> user_id -> connection_id -> expiry (epoch seconds)
+        self._rooms = {}
+        self._users = {}
+
+    def touch(self, room_id, user_id, connection_id, info, ttl):
+        """Refresh one connection. Returns True if the user just came online."""
+        now = time.time()
+        with self._lock:
+            users = self._rooms.setdefault(room_id, {})
+            connections = self._live(users.get(user_id, {}), now)
+            newly_online = not connections
+            connections[connection_id] = now + ttl
+            users[user_id] = connections
+            self._users[user_id] = info
+        return newly_online
+
+    def remove(self, room_id, user_id, connection_id):
+        """Drop one connection. Returns True if the user has no live ones left."""
+        now = time.time()
+        with self._lock:
+            users = self._rooms.get(room_id, {})
+            connections = self._live(users.get(user_id, {}), now)
+            connections.pop(connection_id, None)
+            if connections:
+                users[user_id] = connections
+                return False
+            users.pop(user_id, None)
+            return True
+
+    def online(self, room_id, ttl):
+        """Rows for the users online in `room_id`."""
+        now = time.time()
+        with self._lock:
+            rows = []
+            for user_id, connections in self._rooms.get(room_id, {}).items():
+                live = self._live(connections, now)
+                if live:
+                    rows.append({
+                        'user_id': user_id,
+                        'last_seen': _timestamp(max(live.values()), ttl),
+                        **self._users.get(user_id, {}),
+                    })
+            return rows
+
+    def counts(self, room_ids):
+        """{room_id: users online} for each of `room_ids`."""
+        now = time.time()
+        with self._lock:
+            return {
+                room_id: sum(
+                    1 for connections in self._rooms.get(room_id, {}).values()
+                    if self._live(connections, now)
+                )
+                for room_id in room_ids
+            }
+
+    def clear(self):
+        with self._lock:
+            self._rooms.clear()
+            self._users.clear()
+
+    @staticmethod
+    def _live(connections, now):
+        return {conn: expires for conn, expires in connections.items() if expires > now}
+
+
+class RedisPresenceBackend:
+    """
+    Presence shared by every worker, stored in the cache's Redis server.
+
+    Per room, a sorted set of user ids scored by when they expire; per
+    (room, user), a sorted set of their connections scored the same way.
+    User display fields live in one hash.
+    """
+
+    prefix = 'chat:presence:'
+
+    # Check-and-set runs server-side so concurrent connects and disconnects
+    # of one user (two tabs, two workers) agree on who brought them online
+    # and who took them offline.
+    #
+    # KEYS: room set, user's connection set, user info hash.
+    # ARGV: user id, connection id, now, expiry, connection set TTL, info.
+    # Returns 1 if the user had no live entry in the room.
+    TOUCH = """
+    local previous = redis.call('ZSCORE', KEYS[1], ARGV[1])
+    redis.call('ZADD', KEYS[2], ARGV[4], ARGV[2])
+    redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', ARGV[3])
+    redis.call('EXPIRE', KEYS[2], ARGV[5])
+    redis.call('ZADD', KEYS[1], ARGV[4], ARGV[1])
+    redis.call('HSET', KEYS[3], ARGV[1], ARGV[6])
+    if previous and tonumber(previous) > tonumber(ARGV[3]) then
+        return 0
+    end
+    return 1
+    """
+
+    # KEYS: room set, user's connection set.
+    # ARGV: user id, connection id, now.
+    # Returns 1 if the user has no live connections left.
+    REMOVE = """
+    redis.call('ZREM', KEYS[2], ARGV[2])
+    redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', ARGV[3])
+    local latest = redis.call('ZRANGE', KEYS[2], -1, -1, 'WITHSCORES')
+    if latest[1] then
+        -- Another tab is still connected; keep the user until it expires.
+        redis.call('ZADD', KEYS[1], latest[2], ARGV[1])
+        return 0
+    end
+    redis.call('ZREM', KEYS[1], ARGV[1])
+    return 1
+    """
+
+    def __init__(self, alias='default'):
+        from django_redis import get_redis_connection
+
+        self.redis = get_redis_connection(alias)
+        self._touch = self.redis.register_script(self.TOUCH)
+        self._remove = self.redis.register_script(self.REMOVE)
+
+    def _room_key(self, room_id):
+        return f'{self.prefix}room:{room_id}'
+
+    def _connections_key(self, room_id, user_id):
+        return f'{self.prefix}room:{room_id}:user:{user_id}'
+
+    def touch(self, room_id, user_id, connection_id, info, ttl):
+        now = time.time()
+        keys = [self._room_key(room_id), self._connections_key(room_id, user_id), f'{self.prefix}users']
+        args = [user_id, connection_id, now, now + ttl, int(ttl) + 1, json.dumps(info)]
+        return bool(self._touch(keys=keys, args=args))
+
+    def remove(self, room_id, user_id, connection_id):
+        keys = [self._room_key(room_id), self._connections_key(room_id, user_id)]
+        return bool(self._remove(keys=keys, args=[user_id, connection_id, time.time()]))
+
+    def online(self, room_id, ttl):
+        now = time.time()
+        room_key = self._room_key(room_id)
+        self.redis.zremrangebyscore(room_key, '-inf', now)
+        entries = self.redis.zrangebyscore(room_key, now, '+inf', withscores=True)
+        if not entries:
+            return []
+        user_ids = [int(user_id) for user_id, _ in entries]
+        infos = self.redis.hmget(f'{self.prefix}users', user_ids)
+        return [
+            {
+                'user_id': user_id,
+                'last_seen': _timestamp(expires_at, ttl),
+                **(json.loads(info) if info else {}),
+            }
+            for user_id, (_, expires_at), info in zip(user_ids, entries, infos)
+        ]
+
+    def counts(self, room_ids):
+        now = time.time()
+        pipe = self.redis.pipeline()
+        for room_id in room_ids:
+            pipe.zcount(self._room_key(room_id), now, '+inf')
+        return dict(zip(room_ids, pipe.execute()))
+
+
+def default_backend_path():
+    if getattr(settings, 'CHAT_PRESENCE_BACKEND', None):
+        return settings.CHAT_PRESENCE_BACKEND
+    if 'redis' in settings.CACHES['default']['BACKEND'].lower():
+        return 'chat.presence.RedisPresenceBackend'
+    return 'chat.presence.InMemoryPresenceBackend'
+
+
+class PresenceService:
+    """Online state for chat rooms, backed by a presence backend."""
+
+    def __init__(self, backend=None):
+        self._backend = backend
+        self._dirty_rooms = set()
+        self._dirty_lock = threading.Lock()
+        self._loop = None
+        self._checkpointer = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = import_string(default_backend_path())()
+        return self._backend
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'CHAT_PRESENCE_TTL', 60)
+
+    @property
+    def heartbeat_interval(self):
+        return getattr(settings, 'CHAT_PRESENCE_HEARTBEAT', 20)
+
+    @property
+    def checkpoint_interval(self):
+        return getattr(settings, 'CHAT_PRESENCE_CHECKPOINT_INTERVAL', 30)
+
+    # ---------- Live state ----------
+
+    def connect(self, user, room, connection_id):
+        """Register a connection. Returns True if `user` just came online in `room`."""
+        self.ensure_member(user, room)
+        return self.heartbeat(user, room, connection_id)
+
+    def heartbeat(self, user, room, connection_id):
+        """Keep a connection alive for another TTL. Returns True if it had expired."""
+        info = {'username': user.username, 'avatar': user.avatar.name or ''}
+        newly_online = self.backend.touch(room.id, user.id, connection_id, info, self.ttl)
+        if newly_online:
+            self._mark_dirty(room.id)
+        return newly_online
+
+    def disconnect(self, user, room, connection_id):
+        """Drop a connection. Returns True if `user` is now offline in `room`."""
+        went_offline = self.backend.remove(room.id, user.id, connection_id)
+        if went_offline:
+            self._mark_dirty(room.id)
+        return went_offline
+
+    def online_users(self, room):
+        """Rows ({user_id, username, avatar, last_seen}) for users online in `room`."""
+        return self.backend.online(room.id, self.ttl)
+
+    def online_counts(self, rooms):
+        """{room_id: users online} for `rooms`."""
+        return self.backend.counts([room.id for room in rooms])
+
+    def ensure_member(self, user, room):
+        """Make sure `user` has a UserPresence (membership) row in `room`."""
+        key = f'{_MEMBER_CACHE_PREFIX}{room.id}:{user.id}'
+        if cache.get(key):
+            return
+        UserPresence.objects.get_or_create(user=user, room=room)
+        cache.set(key, True, _MEMBER_CACHE_TTL)
+
+    # ---------- Checkpointing ----------
+
+    def checkpoint(self):
+        """
+        Write the live state of changed rooms to UserPresence / ChatRoom.
+
+        Rooms this process changed since the last checkpoint are written,
+        plus any room the database still shows someone online in, so users
+        whose entries expired (e.g. on a crashed worker) are cleared too.
+        Returns the number of rooms written.
+        """
+        with self._dirty_lock:
+            room_ids, self._dirty_rooms = self._dirty_rooms, set()
+        room_ids |= set(
+            UserPresence.objects.filter(is_online=True).values_list('room_id', flat=True).distinct()
+        )
+
+        now = timezone.now()
+        for room_id in room_ids:
+            online_ids = [row['user_id'] for row in self.backend.online(room_id, self.ttl)]
+            with transaction.atomic():
+                (
+                    UserPresence.objects
+                    .filter(room_id=room_id, is_online=True)
+                    .exclude(user_id__in=online_ids)
+                    .update(is_online=False)
+                )
+                UserPresence.objects.filter(room_id=room_id, user_id__in=online_ids).update(
+                    is_online=True, last_seen=now,
+                )
+                ChatRoom.objects.filter(pk=room_id).update(online_count=len(online_ids))
+        return len(room_ids)
+
+    def start_checkpointer(self):
+        """Run checkpoint() every checkpoint_interval on the running loop (idempotent)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._checkpointer is not None and not self._checkpointer.done():
+            return
+        self._loop = loop
+        self._checkpointer = loop.create_task(self._run_checkpoints())
+
+    async def _run_checkpoints(self):
+        from channels.db import database_sync_to_async
+
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            try:
+                await database_sync_to_async(self.checkpoint)()
+            except Exception:
+                logger.exception("Presence checkpoint failed")
+
+    def _mark_dirty(self, room_id):
+        with self._dirty_lock:
+            self._dirty_rooms.add(room_id)
+
+
+presence = PresenceService()
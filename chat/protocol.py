@@ -0,0 +1,104 @@
+"""
+Wire formats for ChatConsumer.
+
+Broadcast events (message, typing snapshot, read watermarks, presence) are encoded once, when
+they are handed to group_send, in every format a connection may have
+negotiated. Each consumer then forwards its pre-encoded frame verbatim, so
+a message to a 1,000-member room costs three encodes rather than 1,000.
+
+Clients pick a format with a WebSocket subprotocol at connect time:
+
+- no subprotocol: JSON objects, exactly as before (`{"type": "message", ...}`)
+- `chat.compact.v1`: broadcast events as field-indexed JSON arrays,
+  `[type_code, field1, field2, ...]`
+- `chat.msgpack.v1`: the same arrays, msgpack-encoded in binary frames
+  (only offered when msgpack is installed)
+
+Compact clients receive a `schema` frame first mapping type codes to field
+names (see SCHEMAS). Frames that go to a single connection (history,
+errors, schema) stay objects in every format; msgpack clients get them
+msgpack-encoded. Msgpack clients may send binary msgpack frames too.
+"""
+import json
+
+try:
+    import msgpack
+except ImportError:  # msgpack ships with channels_redis, but stay optional
+    msgpack = None
+
+JSON = 'json'
+COMPACT = 'compact'
+MSGPACK = 'msgpack'
+
+SUBPROTOCOLS = {
+    'chat.compact.v1': COMPACT,
+    'chat.msgpack.v1': MSGPACK,
+}
+
+# Field order of each broadcast event in the compact formats. Append new
+# fields at the end; reordering is a protocol version bump.
+SCHEMAS = {
+    'message': ('message_id', 'user_id', 'username', 'content', 'is_code', 'code_language', 'timestamp'),
+    'typing': ('source', 'users'),
+    'read': ('watermarks',),
+    'presence': ('user_id', 'username', 'is_online', 'timestamp'),
+}
+TYPE_CODES = {name: code for code, name in enumerate(SCHEMAS, start=1)}
+
+
+def available_formats():
+    """Formats this server can encode."""
+    if msgpack is None:
+        return (JSON, COMPACT)
+    return (JSON, COMPACT, MSGPACK)
+
+
+def negotiate(subprotocols):
+    """
+    Pick the wire format for a connection from the client's subprotocols.
+
+    Returns (format, subprotocol to accept with, or None for plain JSON).
+    """
+    for subprotocol in subprotocols or ():
+        wire_format = SUBPROTOCOLS.get(subprotocol)
+        if wire_format in available_formats():
+            return wire_format, subprotocol
+    return JSON, None
+
+
+def schema_frame():
+    """Frame telling compact clients how to read event arrays."""
+    return {
+        'type': 'schema',
+        'types': {code: [name, list(SCHEMAS[name])] for name, code in TYPE_CODES.items()},
+    }
+
+
+def encode(payload, wire_format=JSON):
+    """Encode one frame: str for the JSON formats, bytes for msgpack."""
+    if wire_format == JSON:
+        return json.dumps(payload)
+    fields = SCHEMAS.get(payload.get('type'))
+    if fields is not None:
+        payload = [TYPE_CODES[payload['type']], *(payload[field] for field in fields)]
+    if wire_format == MSGPACK:
+        return msgpack.packb(payload)
+    return json.dumps(payload, separators=(',', ':'))
+
+
+def encode_all(payload):
+    """Pre-encode a broadcast frame once per available format."""
+    return {wire_format: encode(payload, wire_format) for wire_format in available_formats()}
+
+
+def decode(text_data=None, bytes_data=None):
+    """Decode an inbound frame (JSON text, or msgpack bytes) to a dict."""
+    if bytes_data is not None:
+        if msgpack is None:
+            raise ValueError("Binary frames need msgpack")
+        data = msgpack.unpackb(bytes_data)
+    else:
+        data = json.loads(text_data)
+    if not isinstance(data, dict):
+        raise ValueError("Frames must be objects")
+    return data
@@ -0,0 +1,64 @@
+"""
+Shared serialization for chat messages and presences.
+
+Every history endpoint (the WebSocket consumer, the two JSON views and the
+FastHTML message list) used to iterate model instances and touch
+`message.user` per row, costing one extra query per message. They now all
+go through the values projection here, which joins the author's fields
+into the same query: one query per page, whatever its size.
+
+Rows are plain dicts with the model's own fields plus `username` and
+`avatar` (the stored avatar file name); `serialize_*` turns them into the
+JSON shapes clients already consume.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models import F
+
+MESSAGE_FIELDS = (
+    'id', 'user_id', 'content', 'is_code', 'code_language',
+    'timestamp', 'is_edited', 'edited_at',
+)
+
+
+def message_values(queryset):
+    """Project a ChatMessage queryset to rows with the author joined in."""
+    return queryset.values(*MESSAGE_FIELDS, username=F('user__username'), avatar=F('user__avatar'))
+
+
+def message_row(message):
+    """Same row shape for an in-memory ChatMessage (e.g. the write-behind buffer)."""
+    row = {field: getattr(message, field) for field in MESSAGE_FIELDS}
+    row['username'] = message.user.username
+    row['avatar'] = message.user.avatar.name
+    return row
+
+
+def serialize_message(row, id_key='id'):
+    """JSON-ready dict for a message row."""
+    return {
+        id_key: row['id'],
+        'user_id': row['user_id'],
+        'username': row['username'],
+        'content': row['content'],
+        'is_code': row['is_code'],
+        'code_language': row['code_language'],
+        'timestamp': row['timestamp'].isoformat(),
+        'is_edited': row['is_edited'],
+        'edited_at': row['edited_at'].isoformat() if row['edited_at'] else None,
+    }
+
+
+def serialize_presence(row, id_key='user_id'):
+    """JSON-ready dict for an online-user row from chat.presence."""
+    return {
+        id_key: row['user_id'],
+        'username': row['username'],
+        'last_seen': row['last_seen'].isoformat(),
+    }
+
+
+def avatar_url(name, default):
+    """URL for a stored avatar file name, or `default` when there is none."""
+    if not name:
+        return default
+    return get_user_model()._meta.get_field('avatar').storage.url(name)
@@ -1,7 +1,8 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import ChatMessage, ChatNotification, ChatRoom
+from .models import ChatMessage
+from .notifications import schedule_fan_out
 
 User = get_user_model()
 
@@ -9,30 +10,12 @@ User = get_user_model()
 def create_chat_notifications(sender, instance, created, **kwargs):
     """
     Create notifications for all participants in a chat room when a new message is created.
+
+    Private chats notify all participants except the sender; public and
+    global chats notify users who have explicitly joined the room. The
+    fan-out is a single INSERT ... SELECT rather than one INSERT per
+    recipient, and runs on a background worker when
+    CHAT_NOTIFICATIONS_DEFERRED is set (see chat/notifications.py).
     """
     if created:
-        room = instance.room
-        sender_user = instance.user
-        
-        # For private chats, notify all participants except the sender
-        if room.is_private:
-            for user in room.participants.all():
-                if user != sender_user:
-                    ChatNotification.objects.create(
-                        user=user,
-                        room=room,
-                        message=instance
-                    )
-        
-        # For public and global chats, notify users who have explicitly joined the room
-        else:
-            # Get all users who have presence in this room
-            from .models import UserPresence
-            user_presences = UserPresence.objects.filter(room=room).exclude(user=sender_user)
-            
-            for presence in user_presences:
-                ChatNotification.objects.create(
-                    user=presence.user,
-                    room=room,
-                    message=instance
-                )
\ No newline at end of file
+        schedule_fan_out(instance)
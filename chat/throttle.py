@@ -0,0 +1,224 @@
+"""
+Typing-indicator coalescing and inbound rate limiting for ChatConsumer.
+
+Typing frames used to become one group_send each, so a busy room's channel
+layer traffic grew with keystrokes. Now:
+
+- `TypingTracker` keeps who is typing per room in this worker. A user's
+  repeated "typing" frames within CHAT_TYPING_DEBOUNCE seconds are dropped
+  outright, and the room's state goes out as a single snapshot at most
+  once per CHAT_TYPING_TICK seconds, and only when it changed. A user who
+  never sends "stopped typing" drops out after CHAT_TYPING_EXPIRY seconds.
+  Snapshots carry a per-worker `source` id; with several workers, clients
+  keep the latest snapshot per source and show the union.
+- `ReadReceiptTracker` does the same for read watermarks: however many
+  read frames arrive, a room gets at most one `read` frame per tick.
+- `FrameRateLimiter` gives each connection a token bucket per inbound
+  frame type (CHAT_RATE_LIMITS: type -> (tokens per second, burst)).
+"""
+import asyncio
+import time
+import uuid
+
+from django.conf import settings
+
+from . import protocol
+
+DEFAULT_RATE_LIMITS = {
+    'message': (2, 10),
+    'typing': (4, 8),
+    'read': (10, 30),
+    'history': (1, 5),
+    'heartbeat': (1, 3),
+    '*': (5, 20),
+}
+
+
+class TokenBucket:
+    """Allows `rate` events per second on average, in bursts of up to `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def allow(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class FrameRateLimiter:
+    """Per-connection token buckets, one per inbound frame type."""
+
+    def __init__(self, limits=None):
+        self.limits = limits or getattr(settings, 'CHAT_RATE_LIMITS', DEFAULT_RATE_LIMITS)
+        self._buckets = {}
+
+    def allow(self, frame_type):
+        key = frame_type if frame_type in self.limits else '*'
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(*self.limits[key])
+        return bucket.allow()
+
+
+class RoomTicker:
+    """
+    Base for per-room state that goes out as one coalesced frame per tick.
+
+    Subclasses record updates, call `_changed(channel_layer, group)`, and
+    implement `frame(group)`. Rooms with nothing to send stop ticking.
+    """
+
+    # Consumer method that forwards the pre-encoded frame.
+    handler = None
+    # Setting holding the tick length in seconds, and its default.
+    tick_setting = None
+    default_tick = 0.5
+
+    def __init__(self):
+        self.source = uuid.uuid4().hex[:8]
+        self._dirty = set()
+        self._tickers = {}
+
+    @property
+    def tick(self):
+        return getattr(settings, self.tick_setting, self.default_tick)
+
+    def frame(self, group):
+        raise NotImplementedError
+
+    def _expire(self, group):
+        """Drop stale state before a tick; mark the room dirty if anything went."""
+
+    def _is_idle(self, group):
+        return True
+
+    def _changed(self, channel_layer, group):
+        self._dirty.add(group)
+        ticker = self._tickers.get(group)
+        loop = asyncio.get_running_loop()
+        if ticker is not None and not ticker.done() and ticker.get_loop() is loop:
+            return
+        self._tickers[group] = loop.create_task(self._run(channel_layer, group))
+
+    async def _run(self, channel_layer, group):
+        while True:
+            await asyncio.sleep(self.tick)
+            self._expire(group)
+            if group in self._dirty:
+                self._dirty.discard(group)
+                await channel_layer.group_send(
+                    group,
+                    {'type': self.handler, 'frames': protocol.encode_all(self.frame(group))},
+                )
+            elif self._is_idle(group):
+                # Nothing left to report: stop ticking until the next update.
+                self._tickers.pop(group, None)
+                return
+
+
+class TypingTracker(RoomTicker):
+    """Who is typing in each room (in this worker), broadcast as periodic snapshots."""
+
+    handler = 'typing_snapshot'
+    tick_setting = 'CHAT_TYPING_TICK'
+
+    def __init__(self):
+        super().__init__()
+        # room group -> user_id -> (username, expires_at)
+        self._typing = {}
+        self._last_start = {}
+
+    @property
+    def debounce(self):
+        return getattr(settings, 'CHAT_TYPING_DEBOUNCE', 1.0)
+
+    @property
+    def expiry(self):
+        return getattr(settings, 'CHAT_TYPING_EXPIRY', 5.0)
+
+    def update(self, channel_layer, group, user_id, username, is_typing):
+        """Record a typing frame. Nothing is sent until the room's next tick."""
+        now = time.monotonic()
+        users = self._typing.setdefault(group, {})
+        if is_typing:
+            if now - self._last_start.get((group, user_id), float('-inf')) < self.debounce:
+                return
+            self._last_start[(group, user_id)] = now
+            changed = user_id not in users
+            users[user_id] = (username, now + self.expiry)
+        else:
+            self._last_start.pop((group, user_id), None)
+            changed = users.pop(user_id, None) is not None
+        if changed:
+            self._changed(channel_layer, group)
+
+    def frame(self, group):
+        """The typing snapshot for `group` as it stands."""
+        users = self._typing.get(group, {})
+        return {
+            'type': 'typing',
+            'source': self.source,
+            'users': [[user_id, users[user_id][0]] for user_id in sorted(users)],
+        }
+
+    def _expire(self, group):
+        now = time.monotonic()
+        users = self._typing.get(group, {})
+        expired = [user_id for user_id, (_, expires_at) in users.items() if expires_at <= now]
+        for user_id in expired:
+            del users[user_id]
+            self._last_start.pop((group, user_id), None)
+        if expired:
+            self._dirty.add(group)
+
+    def _is_idle(self, group):
+        if self._typing.get(group):
+            return False
+        self._typing.pop(group, None)
+        return True
+
+
+class ReadReceiptTracker(RoomTicker):
+    """
+    Read watermarks that moved in each room since the last tick, sent as
+    one `read` frame listing [user_id, username, last_read_message_id].
+    """
+
+    handler = 'read_receipts'
+    tick_setting = 'CHAT_READ_RECEIPT_TICK'
+    default_tick = 1.0
+
+    def __init__(self):
+        super().__init__()
+        # room group -> user_id -> (username, (timestamp, message_id))
+        self._pending = {}
+
+    def update(self, channel_layer, group, user_id, username, timestamp, message_id):
+        pending = self._pending.setdefault(group, {})
+        previous = pending.get(user_id)
+        # Ids aren't in time order (see chat/counters.py); compare (timestamp, id).
+        if previous is None or previous[1] < (timestamp, message_id):
+            pending[user_id] = (username, (timestamp, message_id))
+        self._changed(channel_layer, group)
+
+    def frame(self, group):
+        pending = self._pending.pop(group, {})
+        return {
+            'type': 'read',
+            'watermarks': [
+                [user_id, username, message_id]
+                for user_id, (username, (_, message_id)) in sorted(pending.items())
+            ],
+        }
+
+
+typing_tracker = TypingTracker()
+read_tracker = ReadReceiptTracker()
@@ -3,12 +3,17 @@ from django.http import JsonResponse, HttpResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
 from django.utils.text import slugify
-from django.db.models import Q
 from django.core.paginator import Paginator
 from django.utils import timezone
 import json
 
-from .models import ChatRoom, ChatMessage, ChatNotification, UserPresence
+from search.index import MAX_CANDIDATES, ranked
+
+from .counters import mark_notifications_read as mark_read, mark_room_read, total_unread, unread_notifications
+from .models import ChatRoom, ChatMessage, ChatNotification
+from .pagination import InvalidCursor, cursor_for_message_id, page_size, paginate_messages
+from .presence import presence
+from .serializers import message_values, serialize_message, serialize_presence
 
 @login_required
 def chat_home(request):
@@ -38,11 +43,8 @@ def chat_home(request):
         participants=request.user
     )
     
-    # Get unread notifications count
-    unread_count = ChatNotification.objects.filter(
-        user=request.user,
-        is_read=False
-    ).count()
+    # Get unread notifications count (materialized, see chat/counters.py)
+    unread_count = total_unread(request.user)
     
     context = {
         'global_room': global_room,
@@ -68,18 +70,11 @@ def chat_rooms(request):
         participants=request.user
     )
     
-    # Search functionality
+    # Search: full-text index (search/), best match first
     query = request.GET.get('q', '')
     if query:
-        public_rooms = public_rooms.filter(
-            Q(name__icontains=query) | 
-            Q(description__icontains=query) |
-            Q(topics__icontains=query)
-        )
-        private_rooms = private_rooms.filter(
-            Q(name__icontains=query) | 
-            Q(description__icontains=query)
-        )
+        public_rooms = ranked(public_rooms, 'room', query, limit=MAX_CANDIDATES)
+        private_rooms = ranked(private_rooms, 'room', query, limit=MAX_CANDIDATES)
     
     # Pagination for public rooms
     paginator = Paginator(public_rooms, 10)
@@ -147,32 +142,18 @@ def chat_room(request, room_slug):
     if room.is_private:
         room.add_participant(request.user)
     
-    # Update or create user presence
-    presence, created = UserPresence.objects.get_or_create(
-        user=request.user,
-        room=room,
-        defaults={"is_online": True}
-    )
-    
-    if not created:
-        presence.update_presence(is_online=True)
+    # Join the room (online state itself is tracked over the WebSocket)
+    presence.ensure_member(request.user, room)
     
     # Mark notifications as read
-    ChatNotification.objects.filter(
-        user=request.user,
-        room=room,
-        is_read=False
-    ).update(is_read=True)
+    mark_room_read(request.user, room)
     
     # Get recent messages
-    messages = ChatMessage.objects.filter(room=room).order_by('-timestamp')[:50]
+    messages = ChatMessage.objects.filter(room=room).select_related('user').order_by('-timestamp')[:50]
     messages = reversed(list(messages))  # Reverse to show oldest first
     
     # Get online users
-    online_users = UserPresence.objects.filter(
-        room=room,
-        is_online=True
-    ).select_related('user')
+    online_users = presence.online_users(room)
     
     context = {
         'room': room,
@@ -183,6 +164,34 @@ def chat_room(request, room_slug):
     
     return render(request, 'chat/room.html', context)
 
+def _message_page_response(request, room):
+    """
+    JSON page of `room`'s messages for the `before` / `after` cursor in the
+    query string (see chat/pagination.py). `before_id` is still accepted
+    from older clients.
+    """
+    before = request.GET.get('before')
+    after = request.GET.get('after')
+    limit = page_size(request.GET.get('limit'), default=20)
+    
+    before_id = request.GET.get('before_id')
+    if before_id and not before:
+        if not before_id.isdigit():
+            return JsonResponse({'error': 'Invalid before_id'}, status=400)
+        before = cursor_for_message_id(room, int(before_id))
+    
+    try:
+        page = paginate_messages(message_values(room.messages.all()), before=before, after=after, limit=limit)
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+    
+    return JsonResponse({
+        'messages': [serialize_message(row) for row in page.messages],
+        'has_more': page.has_more,
+        'before': page.before,
+        'after': page.after,
+    })
+
 @login_required
 def room_messages(request, room_slug):
     """
@@ -195,41 +204,8 @@ def room_messages(request, room_slug):
     if not room.can_user_access(request.user):
         return JsonResponse({'error': 'Access denied'}, status=403)
     
-    # Get messages with pagination
-    page = request.GET.get('page', 1)
-    before_id = request.GET.get('before_id')
-    limit = int(request.GET.get('limit', 20))
-    
-    messages_query = ChatMessage.objects.filter(room=room)
-    
-    if before_id:
-        try:
-            before_message = ChatMessage.objects.get(id=before_id)
-            messages_query = messages_query.filter(timestamp__lt=before_message.timestamp)
-        except ChatMessage.DoesNotExist:
-            pass
-    
-    messages = messages_query.order_by('-timestamp')[:limit]
-    
-    # Format messages for JSON response
-    messages_data = []
-    for message in reversed(list(messages)):
-        messages_data.append({
-            'id': message.id,
-            'user_id': message.user.id,
-            'username': message.user.username,
-            'content': message.content,
-            'is_code': message.is_code,
-            'code_language': message.code_language,
-            'timestamp': message.timestamp.isoformat(),
-            'is_edited': message.is_edited,
-            'edited_at': message.edited_at.isoformat() if message.edited_at else None,
-        })
-    
-    return JsonResponse({
-        'messages': messages_data,
-        'has_more': len(messages) == limit,
-    })
+    # Get messages with keyset pagination
+    return _message_page_response(request, room)
 
 @login_required
 def room_participants(request, room_slug):
@@ -244,19 +220,7 @@ def room_participants(request, room_slug):
         return JsonResponse({'error': 'Access denied'}, status=403)
     
     # Get online users
-    online_users = UserPresence.objects.filter(
-        room=room,
-        is_online=True
-    ).select_related('user')
-    
-    # Format users for JSON response
-    users_data = []
-    for presence in online_users:
-        users_data.append({
-            'id': presence.user.id,
-            'username': presence.user.username,
-            'last_seen': presence.last_seen.isoformat(),
-        })
+    users_data = [serialize_presence(row, id_key='id') for row in presence.online_users(room)]
     
     return JsonResponse({
         'online_users': users_data,
@@ -333,40 +297,8 @@ def api_messages(request, room_slug):
     if not room.can_user_access(request.user):
         return JsonResponse({'error': 'Access denied'}, status=403)
     
-    # Get messages with pagination
-    before_id = request.GET.get('before_id')
-    limit = int(request.GET.get('limit', 20))
-    
-    messages_query = ChatMessage.objects.filter(room=room)
-    
-    if before_id:
-        try:
-            before_message = ChatMessage.objects.get(id=before_id)
-            messages_query = messages_query.filter(timestamp__lt=before_message.timestamp)
-        except ChatMessage.DoesNotExist:
-            pass
-    
-    messages = messages_query.order_by('-timestamp')[:limit]
-    
-    # Format messages for JSON response
-    messages_data = []
-    for message in reversed(list(messages)):
-        messages_data.append({
-            'id': message.id,
-            'user_id': message.user.id,
-            'username': message.user.username,
-            'content': message.content,
-            'is_code': message.is_code,
-            'code_language': message.code_language,
-            'timestamp': message.timestamp.isoformat(),
-            'is_edited': message.is_edited,
-            'edited_at': message.edited_at.isoformat() if message.edited_at else None,
-        })
-    
-    return JsonResponse({
-        'messages': messages_data,
-        'has_more': len(messages) == limit,
-    })
+    # Get messages with keyset pagination
+    return _message_page_response(request, room)
 
 @login_required
 def api_notifications(request):
@@ -374,10 +306,7 @@ def api_notifications(request):
     API endpoint for getting chat notifications.
     """
     # Get unread notifications
-    notifications = ChatNotification.objects.filter(
-        user=request.user,
-        is_read=False
-    ).select_related('room', 'message', 'message__user')
+    notifications = unread_notifications(request.user).select_related('room', 'message', 'message__user')
     
     # Format notifications for JSON response
     notifications_data = []
@@ -413,17 +342,7 @@ def mark_notifications_read(request):
     data = json.loads(request.body)
     notification_ids = data.get('notification_ids', [])
     
-    if notification_ids:
-        # Mark specific notifications as read
-        ChatNotification.objects.filter(
-            id__in=notification_ids,
-            user=request.user
-        ).update(is_read=True)
-    else:
-        # Mark all notifications as read
-        ChatNotification.objects.filter(
-            user=request.user,
-            is_read=False
-        ).update(is_read=True)
+    # Mark specific notifications (or all of them) as read
+    mark_read(request.user, notification_ids)
     
     return JsonResponse({'success': True})
\ No newline at end of file
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     # Local apps
     'users.apps.UsersConfig',  # Custom user model
     'chat',  # Chat application
+    'search',  # Full-text search over posts, profiles and rooms
 ]
 
 MIDDLEWARE = [
@@ -87,6 +88,34 @@ CHANNEL_LAYERS = {
     }
 }
 
+# Chat write-behind pipeline (chat/pipeline.py). Messages are broadcast as
+# soon as they have an id and persisted in batches of up to
+# CHAT_FLUSH_BATCH_SIZE, at most CHAT_FLUSH_INTERVAL seconds later. Set
+# CHAT_WRITE_BEHIND=False to commit each message before broadcasting it.
+CHAT_WRITE_BEHIND = os.getenv('CHAT_WRITE_BEHIND', 'True') == 'True'
+CHAT_FLUSH_INTERVAL = float(os.getenv('CHAT_FLUSH_INTERVAL', '0.05'))
+CHAT_FLUSH_BATCH_SIZE = int(os.getenv('CHAT_FLUSH_BATCH_SIZE', '100'))
+CHAT_MAX_PENDING = int(os.getenv('CHAT_MAX_PENDING', '5000'))
+# Run the per-message notification fan-out (chat/notifications.py) on a
+# background worker after commit instead of inside the sender's request.
+CHAT_NOTIFICATIONS_DEFERRED = os.getenv('CHAT_NOTIFICATIONS_DEFERRED', 'False') == 'True'
+# Chat presence (chat/presence.py). Online state lives in Redis when the
+# cache is Redis, otherwise in process memory; connections heartbeat every
+# CHAT_PRESENCE_HEARTBEAT seconds and expire after CHAT_PRESENCE_TTL.
+# UserPresence / ChatRoom.online_count are checkpointed periodically.
+CHAT_PRESENCE_BACKEND = os.getenv('CHAT_PRESENCE_BACKEND') or None
+CHAT_PRESENCE_TTL = int(os.getenv('CHAT_PRESENCE_TTL', '60'))
+CHAT_PRESENCE_HEARTBEAT = int(os.getenv('CHAT_PRESENCE_HEARTBEAT', '20'))
+CHAT_PRESENCE_CHECKPOINT_INTERVAL = int(os.getenv('CHAT_PRESENCE_CHECKPOINT_INTERVAL', '30'))
+# Typing indicators (chat/throttle.py) go out as one snapshot per room every
+# CHAT_TYPING_TICK seconds at most. Inbound frame rate limits per connection
+# default to chat.throttle.DEFAULT_RATE_LIMITS; override with CHAT_RATE_LIMITS.
+CHAT_TYPING_TICK = float(os.getenv('CHAT_TYPING_TICK', '0.5'))
+CHAT_TYPING_DEBOUNCE = float(os.getenv('CHAT_TYPING_DEBOUNCE', '1.0'))
+CHAT_TYPING_EXPIRY = float(os.getenv('CHAT_TYPING_EXPIRY', '5.0'))
+# Read watermarks are broadcast as one coalesced frame per room per tick.
+CHAT_READ_RECEIPT_TICK = float(os.getenv('CHAT_READ_RECEIPT_TICK', '1.0'))
+
 # Parse database URL from Vercel
 if os.getenv('POSTGRES_URL'):
     db_url = urlparse(os.getenv('POSTGRES_URL'))
@@ -130,6 +159,10 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
+# Content-hashed, precompressed copies of static/css and static/js
+# (utils/assets.py), served under /assets/. Defaults to static/build.
+ASSETS_BUILD_DIR = os.getenv('ASSETS_BUILD_DIR') or None
+
 # Media files
 # Use Google Cloud Storage in production, local storage in development
 if os.getenv('GCS_BUCKET_NAME') and (os.getenv('GCS_CREDENTIALS_PATH') or os.getenv('GOOGLE_APPLICATION_CREDENTIALS')):
@@ -198,6 +231,42 @@ else:
         },
     }
 
+# Markdown rendering (utils/rendering.py): documents of at least
+# MARKDOWN_OFFLOAD_BYTES render in a pool of MARKDOWN_RENDER_WORKERS
+# processes (0 renders them in a thread instead).
+MARKDOWN_OFFLOAD_BYTES = int(os.getenv('MARKDOWN_OFFLOAD_BYTES', str(4 * 1024)))
+MARKDOWN_RENDER_WORKERS = int(os.getenv('MARKDOWN_RENDER_WORKERS', '2'))
+
+# Blog post views (users/view_counts.py) are buffered and written in one
+# UPDATE every BLOG_VIEW_FLUSH_INTERVAL seconds. BLOG_VIEW_DEDUP_SECONDS > 0
+# ignores repeat views from the same session within that window.
+BLOG_VIEW_BUFFER = os.getenv('BLOG_VIEW_BUFFER') or None
+BLOG_VIEW_FLUSH_INTERVAL = int(os.getenv('BLOG_VIEW_FLUSH_INTERVAL', '10'))
+BLOG_VIEW_DEDUP_SECONDS = int(os.getenv('BLOG_VIEW_DEDUP_SECONDS', '0'))
+
+# RSS/Atom/JSON feeds (users/feeds.py): how long clients and proxies may
+# reuse a feed before revalidating it with If-None-Match.
+BLOG_FEED_MAX_AGE = int(os.getenv('BLOG_FEED_MAX_AGE', '300'))
+
+# Public origin for absolute URLs in feeds. Taken from configuration, never
+# from the request's Host header, which clients control.
+SITE_URL = os.getenv('SITE_URL', 'https://deaddevelopers.com')
+
+# Rendered public pages (page_cache.py) are kept PAGE_CACHE_TTL seconds
+# server-side; anonymous visitors' browsers may reuse them for
+# PAGE_CACHE_MAX_AGE seconds before revalidating.
+PAGE_CACHE_TTL = int(os.getenv('PAGE_CACHE_TTL', '600'))
+PAGE_CACHE_MAX_AGE = int(os.getenv('PAGE_CACHE_MAX_AGE', '60'))
+
+# Session storage. cached_db serves reads from the cache above and only
+# falls through to the DB on a miss; AuthBridge honours whatever is set here
+# (db, cached_db, cache, signed_cookies) so FastHTML and Django agree.
+SESSION_ENGINE = os.getenv('SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
+
+# Seconds AuthBridge may serve a resolved User from the cache above instead
+# of querying it again (invalidated on login, logout and User save).
+AUTH_BRIDGE_USER_CACHE_TTL = int(os.getenv('AUTH_BRIDGE_USER_CACHE_TTL', '60'))
+
 # Security Settings
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
@@ -255,6 +324,12 @@ LOGGING = {
             'level': 'DEBUG' if DEBUG else 'INFO',
             'propagate': False,
         },
+        # Cold-start timings and lazy route loads (startup.py)
+        'startup': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -1,34 +1,46 @@
 from fasthtml.common import *
 from app import app, rt
+import startup
 from utils.feed_helpers import generate_live_updates, generate_live_feed, create_scrolling_feed
+from utils.fragments import Static
 
-# Import routes — every module here registers handlers via @rt at import time
-from routes.auth import *
-from routes.demo import *
-from routes.dashboard import *
-from routes.features import *
-from routes.community import *
-from routes.blog import *
-from routes.about import *
-from routes.header import SiteHeader
-from routes.email_confirmation import *
-from routes.profile import *
-from routes.chat import *  # /chat, /chat/<slug>, /chat/create
+with startup.phase('header'):
+    from routes.header import SiteHeader
+
+# Route modules by the first path segment they serve — every module here
+# registers handlers via @rt at import time. With FAST_STARTUP they're
+# imported on the first request under their prefix instead of here.
+ROUTE_MODULES = {
+    'login': 'routes.auth',
+    'logout': 'routes.auth',
+    'signup': 'routes.auth',
+    'demo': 'routes.demo',
+    'dashboard': 'routes.dashboard',
+    'features': 'routes.features',
+    'community': 'routes.community',
+    'blog': 'routes.blog',
+    'about': 'routes.about',
+    'accounts': 'routes.email_confirmation',
+    'profile': 'routes.profile',
+    'chat': 'routes.chat',  # /chat, /chat/<slug>, /chat/create
+}
+
+startup.route_loader.configure(ROUTE_MODULES, lazy=startup.fast_startup())
+if not startup.route_loader.lazy:
+    with startup.phase('routes'):
+        startup.route_loader.load_all()
 
 # Landing page route
 @rt('/')
-def get(session):
-    # Store current path in session for active link highlighting
-    session['path'] = '/'
-    
+def get():
     return Titled(
         "",
         Container(
             # Header/Navigation
-            SiteHeader(session),
+            SiteHeader('/'),
 
             # Hero Section
-            Section(
+            Static(lambda: Section(
                 Div(
                     Div(
                         Pre(
@@ -61,10 +73,10 @@ def get(session):
                     cls="hero-content"
                 ),
                 cls="hero"
-            ),
+            )),
             
             # Live Stats Section
-            Section(
+            Static(lambda: Section(
                 H2("Embrace AI-First Development", cls="section-title"),
                 Grid(
                     Card(
@@ -85,10 +97,10 @@ def get(session):
                     cls="stats-grid"
                 ),
                 cls="live-stats"
-            ),
+            )),
 
             # Features Section
-            Section(
+            Static(lambda: Section(
                 H2("Build Smarter, Not Harder", cls="section-title"),
                 P("Embrace the future of development with AI automation that adapts to your workflow", 
                   cls="section-subtitle"),
@@ -138,10 +150,10 @@ def get(session):
                     cls="features-grid"
                 ),
                 cls="features"
-            ),
+            )),
 
             # Live Feeds Section
-            Section(
+            Static(lambda: Section(
                 H2("Community Activity", cls="section-title"),
                 P("Real-time updates from our network of AI-powered developers", cls="section-subtitle"),
                 Div(
@@ -172,10 +184,10 @@ def get(session):
                     cls="feeds-container"
                 ),
                 cls="community-section"
-            ),
+            )),
 
             # Call to Action
-            Section(
+            Static(lambda: Section(
                 Div(
                     Div(
                         H2("Ready to Level Up Your Development?"),
@@ -197,10 +209,10 @@ def get(session):
                     cls="terminal-container"
                 ),
                 cls="bottom-cta"
-            ),
+            )),
 
             # Footer
-            Footer(
+            Static(lambda: Footer(
                 Div(
                     Div(
                         Img(src="/img/logo.svg", cls="footer-logo"),
@@ -247,9 +259,11 @@ def get(session):
                     cls="footer-bottom"
                 ),
                 cls="main-footer"
-            )
+            ))
         )
     )
 
+startup.log_report()
+
 # Run the server
 serve(reload=False)
@@ -0,0 +1,171 @@
+"""
+Rendered-page cache for the public FastHTML pages.
+
+`/`, `/features`, `/community` and `/about` build large FT trees that are
+the same for every visitor; only SiteHeader depends on whether someone is
+logged in. PageCache wraps the FastHTML app in the app.py dispatcher and
+keeps one rendered copy of each page per variant (anonymous,
+authenticated) in the Django cache. HTMX requests get FastHTML's partial
+rendering rather than the full page, so those are cached separately.
+
+- A miss runs the route as usual and stores the response body and
+  headers. Set-Cookie is never stored, since it carries the visitor's own
+  session. The ETag is a hash of the body.
+- A hit is served straight from the cache without running the route.
+- A request whose If-None-Match matches gets a bodiless 304.
+- Anonymous responses are `Cache-Control: public`, authenticated ones,
+  and any response that sets a cookie, `private`; Cookie is added to
+  FastHTML's Vary header.
+
+A hit never runs the route, so cached routes must be free of side
+effects: no session writes (SiteHeader takes the page's path instead of
+reading it back from the session), no counters, nothing a replayed copy
+would skip.
+
+The variant comes from the signed FastHTML session cookie, the same one
+AuthBridge reads. Requests with pending toasts (rendered into the page
+body by setup_toasts) and requests with a query string are passed
+through uncached.
+
+Cached pages expire after PAGE_CACHE_TTL seconds. Call `purge()` after
+changing a page's content, or on deploy when the cache is shared (Redis).
+"""
+import json
+from base64 import b64decode
+
+import itsdangerous
+from django.conf import settings
+from django.core.cache import cache
+from starlette.datastructures import Headers
+from starlette.requests import HTTPConnection
+
+from utils.conditional import etag_for, is_not_modified
+
+CACHED_PATHS = ('/', '/features', '/community', '/about')
+ANONYMOUS, AUTHENTICATED = 'anonymous', 'authenticated'
+VARIANTS = (ANONYMOUS, AUTHENTICATED)
+
+# FastHTML's toast queue in the session (fasthtml.toaster.sk).
+_TOASTS_KEY = 'toasts'
+# Never replayed from the cache; content-length and vary are rebuilt.
+_UNCACHED_HEADERS = {b'set-cookie', b'content-length', b'vary'}
+
+
+def cache_key(path: str, variant: str, partial: bool = False) -> str:
+    return f"page:{variant}:{'partial' if partial else 'full'}:{path}"
+
+
+def purge(*paths):
+    """Drop the cached copies (every variant) of `paths`, or of every cached page."""
+    cache.delete_many([
+        cache_key(path, variant, partial)
+        for path in (paths or CACHED_PATHS)
+        for variant in VARIANTS
+        for partial in (False, True)
+    ])
+
+
+def is_partial(headers) -> bool:
+    """Whether FastHTML answers this request with a fragment rather than a full page."""
+    return 'hx-request' in headers and 'hx-history-restore-request' not in headers
+
+
+def session_reader(secret_key, session_cookie='session_', max_age=None, **_):
+    """
+    A function decoding the FastHTML session from a request scope, the way
+    Starlette's SessionMiddleware does. Takes that middleware's kwargs;
+    a missing or tampered cookie reads as an empty session.
+    """
+    signer = itsdangerous.TimestampSigner(str(secret_key))
+
+    def read(scope):
+        raw = HTTPConnection(scope).cookies.get(session_cookie)
+        if not raw:
+            return {}
+        try:
+            return json.loads(b64decode(signer.unsign(raw.encode(), max_age=max_age)))
+        except (itsdangerous.BadSignature, ValueError):
+            return {}
+
+    return read
+
+
+class PageCache:
+    """ASGI wrapper serving CACHED_PATHS from the per-variant page cache."""
+
+    def __init__(self, app, read_session, paths=CACHED_PATHS):
+        self.app = app
+        self.read_session = read_session
+        self.paths = frozenset(paths)
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'PAGE_CACHE_TTL', 600)
+
+    def cache_control(self, variant, sets_cookie=False):
+        # A shared cache must never hand one visitor's Set-Cookie to another.
+        if variant == AUTHENTICATED or sets_cookie:
+            return 'private, no-cache'
+        return f"public, max-age={getattr(settings, 'PAGE_CACHE_MAX_AGE', 60)}"
+
+    async def __call__(self, scope, receive, send):
+        if (scope['type'] != 'http' or scope['method'] != 'GET'
+                or scope['path'] not in self.paths or scope.get('query_string')):
+            await self.app(scope, receive, send)
+            return
+        session = self.read_session(scope)
+        if _TOASTS_KEY in session:
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        variant = AUTHENTICATED if session.get('auth') else ANONYMOUS
+        key = cache_key(scope['path'], variant, is_partial(request_headers))
+        page = await cache.aget(key)
+        cookies = []
+        if page is None:
+            status, headers, body = await self._render(scope, receive)
+            content_type = Headers(raw=headers).get('content-type', '')
+            if status != 200 or not content_type.startswith('text/html'):
+                await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+                await send({'type': 'http.response.body', 'body': body})
+                return
+            vary = [value.decode() for name, value in headers if name.lower() == b'vary']
+            page = {
+                'headers': [(name, value) for name, value in headers if name.lower() not in _UNCACHED_HEADERS],
+                'body': body,
+                'etag': etag_for(body),
+                'vary': ', '.join([*vary, 'Cookie']),
+            }
+            await cache.aset(key, page, self.ttl)
+            # This visitor's session update still goes out with their copy.
+            cookies = [(name, value) for name, value in headers if name.lower() == b'set-cookie']
+        await self._send(send, page, variant, request_headers, cookies)
+
+    async def _render(self, scope, receive):
+        """Run the route, collecting its response instead of sending it."""
+        start, chunks = {}, []
+
+        async def capture(message):
+            if message['type'] == 'http.response.start':
+                start.update(message)
+            elif message['type'] == 'http.response.body':
+                chunks.append(message.get('body', b''))
+
+        await self.app(scope, receive, capture)
+        return start['status'], list(start.get('headers', [])), b''.join(chunks)
+
+    async def _send(self, send, page, variant, request_headers, cookies):
+        validators = [
+            (b'etag', page['etag'].encode()),
+            (b'cache-control', self.cache_control(variant, bool(cookies)).encode()),
+            (b'vary', page['vary'].encode()),
+        ]
+        if is_not_modified(request_headers, page['etag']):
+            await send({'type': 'http.response.start', 'status': 304, 'headers': [*validators, *cookies]})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        body = page['body']
+        headers = [*page['headers'], *validators, *cookies, (b'content-length', str(len(body)).encode())]
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
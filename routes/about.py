@@ -2,50 +2,48 @@ from fasthtml.common import *
 from app import rt
 from starlette.responses import RedirectResponse
 from routes.header import SiteHeader
+from utils.fragments import Static
 
-@rt('/about')
-def get(session):
-    """About page for DeadDevelopers platform"""
-    # Store current path in session for active link highlighting
-    session['path'] = '/about'
-    
-    # Define technologies data
-    technologies = [
-        {
-            "name": "FastHTML",
-            "description": "Lightning-fast rendering engine for the next generation of web applications."
-        },
-        {
-            "name": "Django",
-            "description": "Robust backend framework powering our supernatural development processes"
-        },
-        {
-            "name": "Vercel",
-            "description": "Deployment platform that brings our spectral creations to life"
-        }
-    ]
-    
-    # Create technology cards with animation delay
-    tech_cards = []
-    for i, tech in enumerate(technologies):
-        tech_cards.append(
+# Technologies shown on the about page
+technologies = [
+    {
+        "name": "FastHTML",
+        "description": "Lightning-fast rendering engine for the next generation of web applications."
+    },
+    {
+        "name": "Django",
+        "description": "Robust backend framework powering our supernatural development processes"
+    },
+    {
+        "name": "Vercel",
+        "description": "Deployment platform that brings our spectral creations to life"
+    }
+]
+
+def technology_cards():
+    """Technology cards with staggered animation delays"""
+    return [
+        Div(
             Div(
-                Div(
-                    Span(cls="tech-indicator"),
-                    H2(tech["name"], cls="technology-name"),
-                    cls="technology-header"
-                ),
-                P(tech["description"], cls="technology-description"),
-                cls="technology-card",
-                style=f"animation-delay: {i * 200}ms;"
-            )
+                Span(cls="tech-indicator"),
+                H2(tech["name"], cls="technology-name"),
+                cls="technology-header"
+            ),
+            P(tech["description"], cls="technology-description"),
+            cls="technology-card",
+            style=f"animation-delay: {i * 200}ms;"
         )
-    
+        for i, tech in enumerate(technologies)
+    ]
+
+@rt('/about')
+def get():
+    """About page for DeadDevelopers platform"""
     return Titled(
         "",
         Div(
             # Updated Style
-            Style("""
+            Static(lambda: Style("""
                 /* Base styles and variables */
                 :root {
                   --color-background: #1A1B1A;
@@ -339,19 +337,19 @@ def get(session):
                   .cta-button { display: none; }
                   .main-content::before, .main-content::after { display: none; }
                 }
-            """),
+            """)),
             
-            Script("""
+            Static(lambda: Script("""
                 document.addEventListener('DOMContentLoaded', function() {
                     setTimeout(function() {
                         document.querySelector('.animated-content').classList.add('visible');
                     }, 100);
                 });
-            """),
+            """)),
             
-            SiteHeader(session),
+            SiteHeader('/about'),
             
-            Div(
+            Static(lambda: Div(
                 Div(
                     Section(
                         H1(
@@ -369,7 +367,7 @@ def get(session):
                     ),
                     Section(
                         Div(
-                            *tech_cards,
+                            *technology_cards(),
                             cls="technologies-grid"
                         ),
                         cls="technologies-section"
@@ -385,9 +383,9 @@ def get(session):
                     cls="main-content"
                 ),
                 cls="animated-content"
-            ),
+            )),
             
-            Footer(
+            Static(lambda: Footer(
                 Div(
                     Div(
                         Img(src="/img/logo.svg", cls="footer-logo"),
@@ -434,7 +432,7 @@ def get(session):
                     cls="footer-bottom"
                 ),
                 cls="main-footer"
-            ),
+            )),
             
             cls="landing-container"
         )
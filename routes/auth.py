@@ -2,6 +2,7 @@ from fasthtml.common import *
 from dataclasses import dataclass
 from app import app, rt, User
 from auth_bridge import AuthBridge, csrf_input
+from utils.assets import asset_url
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
@@ -358,7 +359,7 @@ def login_form(req, error: str = None):
     
     # Return a structure that closely mirrors the React component's layout
     return Div(
-        Link(rel="stylesheet", href="/css/sign-in.css"),
+        Link(rel="stylesheet", href=asset_url("css/sign-in.css")),
         Div(
             Div(
                 H1("Sign In to DeadDevelopers"),
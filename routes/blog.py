@@ -6,63 +6,51 @@ sample posts and a "Write a Post" button that linked to a /write-post
 route that didn't exist) with real BlogPost CRUD against the model in
 users/models.py.
 
-Markdown rendering uses the same bleach-sanitization pipeline as the
-user portfolio in routes/profile.py — XSS protection is shared, not
-re-implemented.
+Markdown rendering (sanitization, caching, off-loop rendering of large
+posts) lives in utils/rendering.py, shared with the user portfolio in
+routes/profile.py — XSS protection is shared, not re-implemented.
 """
 from fasthtml.common import *
 from app import rt, User
 from auth_bridge import AuthBridge, csrf_input
 from routes.header import SiteHeader
 from users.models import BlogPost, Tag
-from django.db.models import Count, Q
-import markdown
-import bleach
-
-
-# Same sanitizer config as routes/profile.py — keep them in lockstep.
-POST_ALLOWED_TAGS = [
-    "p", "br", "strong", "em", "code", "pre", "blockquote",
-    "ul", "ol", "li", "a", "h1", "h2", "h3", "h4", "h5", "h6",
-    "img", "hr", "table", "thead", "tbody", "tr", "th", "td",
-    "div", "span",
-]
-POST_ALLOWED_ATTRS = {
-    "*": ["class"],
-    "a": ["href", "title", "rel"],
-    "img": ["src", "alt", "title"],
-    "code": ["class"],
-}
-POST_ALLOWED_PROTOCOLS = ["http", "https", "mailto"]
-
-
-def render_markdown(content: str) -> str:
-    """Markdown → sanitized HTML. Returns empty string on empty input."""
-    if not content:
-        return ""
-    rendered = markdown.markdown(content, extensions=['extra', 'codehilite'])
-    return bleach.clean(
-        rendered,
-        tags=POST_ALLOWED_TAGS,
-        attributes=POST_ALLOWED_ATTRS,
-        protocols=POST_ALLOWED_PROTOCOLS,
-        strip=True,
+from users import feeds
+from users.pagination import InvalidCursor, decode_cursor, feed_page
+from users.view_counts import view_counter
+from search.index import ranked
+from asgiref.sync import sync_to_async
+from utils import rendering
+from utils.conditional import is_not_modified
+from utils.streaming import Later, stream_page
+import uuid
+from urllib.parse import urlencode
+
+
+def feed_posts(queryset):
+    """
+    Card-ready published posts: author joined, tags prefetched, body deferred.
+
+    Renders any number of post_card()s in two queries (posts, tags).
+    """
+    return (
+        queryset
+        .filter(is_published=True)
+        .select_related('author')
+        .prefetch_related('tags')
+        .defer('content')
     )
 
 
-def _read_minutes(content: str) -> int:
-    """Rough read-time estimate at 200 wpm. Floor of 1 min."""
-    if not content:
-        return 1
-    words = len(content.split())
-    return max(1, round(words / 200))
+SEARCH_RESULTS = 30
 
 
 # ---------- Components ----------
 
 def post_card(post: BlogPost):
     """Compact card used in feeds and per-author lists."""
-    tag_chips = [Span(t.name, cls="tag") for t in post.tags.all()[:5]]
+    # Slice the prefetched list, not the manager: slicing .all() re-queries.
+    tag_chips = [Span(t.name, cls="tag") for t in list(post.tags.all())[:5]]
     return Article(
         Div(
             Img(
@@ -79,7 +67,7 @@ def post_card(post: BlogPost):
                     ),
                     cls="author-line",
                 ),
-                P(f"{_read_minutes(post.content)} min read", cls="read-time"),
+                P(f"{post.read_minutes} min read", cls="read-time"),
                 cls="post-meta",
             ),
             cls="post-header",
@@ -95,12 +83,15 @@ def post_card(post: BlogPost):
 
 
 def trending_topics_sidebar(limit: int = 6):
-    """Tags ranked by number of *published* posts they're attached to."""
+    """Tags ranked by number of *published* posts they're attached to.
+
+    Reads the maintained counter (users/post_counts.py) off its index, so
+    the cost is O(limit) rather than an aggregate over every post.
+    """
     tags = (
         Tag.objects
-        .annotate(post_count=Count('posts', filter=Q(posts__is_published=True)))
-        .filter(post_count__gt=0)
-        .order_by('-post_count')[:limit]
+        .filter(published_post_count__gt=0)
+        .order_by('-published_post_count', 'name')[:limit]
     )
     if not tags:
         return Section(
@@ -114,7 +105,7 @@ def trending_topics_sidebar(limit: int = 6):
             *[
                 A(
                     Span(t.name, cls="topic-name"),
-                    Span(f"{t.post_count} post{'s' if t.post_count != 1 else ''}", cls="topic-posts"),
+                    Span(f"{t.published_post_count} post{'s' if t.published_post_count != 1 else ''}", cls="topic-posts"),
                     href=f"/blog/tag/{t.slug}",
                     cls="topic-item",
                 )
@@ -127,12 +118,11 @@ def trending_topics_sidebar(limit: int = 6):
 
 
 def popular_authors_sidebar(limit: int = 5):
-    """Users ranked by number of published posts."""
+    """Users ranked by number of published posts (maintained counter, like topics)."""
     authors = (
         User.objects
-        .annotate(post_count=Count('blog_posts', filter=Q(blog_posts__is_published=True)))
-        .filter(post_count__gt=0)
-        .order_by('-post_count')[:limit]
+        .filter(published_post_count__gt=0)
+        .order_by('-published_post_count', 'username')[:limit]
     )
     if not authors:
         return ""
@@ -143,7 +133,7 @@ def popular_authors_sidebar(limit: int = 5):
                 A(
                     Img(src=u.get_avatar_url(), alt=f"{u.username}", cls="author-avatar-sm"),
                     Span(u.get_display_name(), cls="author-name-sm"),
-                    Span(f"{u.post_count} posts", cls="author-post-count"),
+                    Span(f"{u.published_post_count} posts", cls="author-post-count"),
                     href=f"/profile/{u.username}",
                     cls="popular-author",
                 )
@@ -155,36 +145,75 @@ def popular_authors_sidebar(limit: int = 5):
     )
 
 
+def feed_cards(posts, next_cursor, tag_slug: str = ""):
+    """Post cards for one feed page, followed by the "load more" trigger if there's more."""
+    cards = [post_card(p) for p in posts]
+    if next_cursor:
+        cards.append(load_more(next_cursor, tag_slug))
+    return cards
+
+
+def load_more(cursor: str, tag_slug: str = ""):
+    """
+    Infinite-scroll sentinel: when scrolled into view, HTMX swaps it for
+    the next page of cards (which ends with the next sentinel). Without
+    JS the link loads the next page as a full page.
+    """
+    query = urlencode({'cursor': cursor, **({'tag': tag_slug} if tag_slug else {})})
+    page_href = f"/blog/tag/{tag_slug}" if tag_slug else "/blog"
+    return Div(
+        A("Load more", href=f"{page_href}?{urlencode({'cursor': cursor})}", cls="btn-secondary"),
+        hx_get=f"/blog/more?{query}",
+        hx_trigger="revealed",
+        hx_swap="outerHTML",
+        cls="load-more",
+    )
+
+
+def search_form(query: str = ""):
+    return Form(
+        Input(type="search", name="q", value=query, placeholder="Search posts", aria_label="Search posts"),
+        method="get",
+        action="/blog/search",
+        cls="blog-search",
+    )
+
+
 def write_button(is_authenticated: bool):
     href = "/blog/write" if is_authenticated else "/login?next=/blog/write"
     return A("✎ Write a Post", href=href, cls="write-post-btn btn-primary")
 
 
+def blog_feed(cursor: str = ""):
+    """One page of the global feed as cards, or the empty state."""
+    posts, next_cursor = feed_page(feed_posts(BlogPost.objects), cursor)
+    if not posts:
+        return P("No posts published yet. Be the first.", cls="empty-state")
+    return Div(*feed_cards(posts, next_cursor), cls="posts-grid")
+
+
 # ---------- Routes ----------
 
 @rt('/blog')
-def get(req, session):
-    """Global blog feed — latest published posts across all users."""
+def get(req, session, cursor: str = ""):
+    """Global blog feed — latest published posts across all users.
+
+    Streamed: the header goes out at once, the feed and the sidebars
+    follow as their queries finish.
+    """
     session['path'] = '/blog'
 
     user = AuthBridge.get_current_user(req, session)
     is_authed = user is not None
 
-    posts = (
-        BlogPost.objects
-        .filter(is_published=True)
-        .select_related('author')
-        .prefetch_related('tags')
-        [:30]
-    )
+    # Checked up front: once streaming has started it's too late to redirect.
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except InvalidCursor:
+            return RedirectResponse('/blog', status_code=303)
 
-    feed = (
-        Div(*[post_card(p) for p in posts], cls="posts-grid")
-        if posts
-        else P("No posts published yet. Be the first.", cls="empty-state")
-    )
-
-    return Titled(
+    return stream_page(req, Titled(
         "Blog | DeadDevelopers",
         Container(
             SiteHeader(session),
@@ -195,22 +224,105 @@ def get(req, session):
                         write_button(is_authed),
                         cls="header section-header",
                     ),
-                    feed,
+                    Later(blog_feed, cursor),
                     cls="main-content",
                 ),
                 Div(
-                    trending_topics_sidebar(),
-                    popular_authors_sidebar(),
+                    search_form(),
+                    Later(trending_topics_sidebar),
+                    Later(popular_authors_sidebar),
                     cls="sidebar",
                 ),
                 cls="blog-container",
             ),
         ),
+    ))
+
+
+@rt('/blog/more')
+def get(cursor: str = "", tag: str = ""):
+    """
+    HTMX fragment: the next page of post cards after `cursor` (optionally
+    within a tag). Cards only — no header or sidebars.
+    """
+    posts = BlogPost.objects
+    if tag:
+        posts = BlogPost.objects.filter(tags__slug=tag)
+    try:
+        posts, next_cursor = feed_page(feed_posts(posts), cursor)
+    except InvalidCursor:
+        return Response("Invalid cursor", status_code=400)
+    return tuple(feed_cards(posts, next_cursor, tag))
+
+
+@rt('/blog/search')
+def get(req, session, q: str = ""):
+    """Published posts matching `q`, best match first (search/ index)."""
+    session['path'] = '/blog/search'
+    query = q.strip()
+    posts = ranked(feed_posts(BlogPost.objects), 'post', query, limit=SEARCH_RESULTS) if query else []
+
+    if posts:
+        results = Div(*[post_card(p) for p in posts], cls="posts-grid")
+    elif query:
+        results = P(f"No posts match “{query}”.", cls="empty-state")
+    else:
+        results = P("Type something to search posts.", cls="empty-state")
+
+    return Titled(
+        f"Search: {query} | Blog | DeadDevelopers" if query else "Search | Blog | DeadDevelopers",
+        Container(
+            SiteHeader(session),
+            Div(
+                Div(
+                    A("← All Posts", href="/blog", cls="back-link"),
+                    Div(
+                        H1(f"Results for “{query}”" if query else "Search", cls="section-title"),
+                        cls="header section-header",
+                    ),
+                    search_form(query),
+                    results,
+                    cls="main-content",
+                ),
+                cls="blog-container",
+            ),
+        ),
     )
 
 
+def feed_response(req, fmt: str, tag_slug: str = "", username: str = ""):
+    """A cached feed document, or 304 when the client's copy is current."""
+    if fmt not in feeds.CONTENT_TYPES:
+        return Response("Not found", status_code=404)
+    document = feeds.get_feed(fmt, tag_slug, username)
+    if document is None:
+        return Response("Not found", status_code=404)
+    headers = {'ETag': document.etag, 'Cache-Control': feeds.cache_control()}
+    if document.last_modified:
+        headers['Last-Modified'] = document.last_modified
+    if is_not_modified(req.headers, document.etag, document.last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(document.body, media_type=document.content_type, headers=headers)
+
+
+@rt('/blog/feed.{fmt}')
+def get(req, fmt: str):
+    """Latest posts across the blog as RSS (.xml), Atom (.atom) or JSON Feed (.json)."""
+    return feed_response(req, fmt)
+
+
+@rt('/blog/tag/{tag_slug}/feed.{fmt}')
+def get(req, tag_slug: str, fmt: str):
+    return feed_response(req, fmt, tag_slug=tag_slug)
+
+
+@rt('/blog/author/{username}/feed.{fmt}')
+def get(req, username: str, fmt: str):
+    return feed_response(req, fmt, username=username)
+
+
 @rt('/blog/tag/{tag_slug}')
-def get(req, session, tag_slug: str):
+def get(req, session, tag_slug: str, cursor: str = ""):
     """Posts filtered by tag."""
     session['path'] = f'/blog/tag/{tag_slug}'
 
@@ -222,16 +334,13 @@ def get(req, session, tag_slug: str):
     except Tag.DoesNotExist:
         return RedirectResponse('/blog', status_code=303)
 
-    posts = (
-        tag.posts
-        .filter(is_published=True)
-        .select_related('author')
-        .prefetch_related('tags')
-        [:50]
-    )
+    try:
+        posts, next_cursor = feed_page(feed_posts(tag.posts), cursor)
+    except InvalidCursor:
+        return RedirectResponse(f'/blog/tag/{tag.slug}', status_code=303)
 
     feed = (
-        Div(*[post_card(p) for p in posts], cls="posts-grid")
+        Div(*feed_cards(posts, next_cursor, tag.slug), cls="posts-grid")
         if posts
         else P("No posts with this tag yet.", cls="empty-state")
     )
@@ -252,6 +361,7 @@ def get(req, session, tag_slug: str):
                     cls="main-content",
                 ),
                 Div(
+                    search_form(),
                     trending_topics_sidebar(),
                     popular_authors_sidebar(),
                     cls="sidebar",
@@ -394,11 +504,12 @@ def post(req, session,
     return RedirectResponse(post.get_absolute_url(), status_code=303)
 
 
-@rt('/blog/{username}/{slug}')
-def get(req, session, username: str, slug: str):
-    """Post detail view."""
-    session['path'] = f'/blog/{username}/{slug}'
+def _load_post_view(req, session, username: str, slug: str):
+    """Sync half of the detail view: lookup, access check, view count, owner actions.
 
+    Returns (post, views to display, owner actions) or None when the viewer
+    can't see the post.
+    """
     try:
         post = (
             BlogPost.objects
@@ -407,24 +518,20 @@ def get(req, session, username: str, slug: str):
             .get(author__username=username, slug=slug)
         )
     except BlogPost.DoesNotExist:
-        return RedirectResponse('/blog', status_code=303)
+        return None
 
     current = AuthBridge.get_current_user(req, session)
     is_owner = current is not None and current.id == post.author_id
 
     # Drafts are visible only to the author.
     if not post.is_published and not is_owner:
-        return RedirectResponse('/blog', status_code=303)
+        return None
 
-    # Track views (cheap atomic UPDATE; skip for the author's own reads).
+    # Track views (buffered and flushed in bulk; skip the author's own reads).
+    # Only dedup needs a viewer id, so don't grow every session for it.
     if not is_owner:
-        post.increment_views()
-
-    body = render_markdown(post.content)
-    tag_chips = [
-        A(t.name, href=f"/blog/tag/{t.slug}", cls="tag")
-        for t in post.tags.all()
-    ]
+        viewer = session.setdefault('viewer_id', uuid.uuid4().hex) if view_counter.dedup_seconds else None
+        view_counter.record(post.pk, viewer=viewer)
 
     actions = ""
     if is_owner:
@@ -439,6 +546,29 @@ def get(req, session, username: str, slug: str):
             ),
             cls="post-owner-actions",
         )
+    return post, view_counter.total(post), actions
+
+
+@rt('/blog/{username}/{slug}')
+async def get(req, session, username: str, slug: str):
+    """Post detail view.
+
+    Async so the markdown render of a large post can be awaited off the
+    event loop (see utils/rendering.py); the ORM work runs in a thread.
+    """
+    session['path'] = f'/blog/{username}/{slug}'
+
+    loaded = await sync_to_async(_load_post_view)(req, session, username, slug)
+    if loaded is None:
+        return RedirectResponse('/blog', status_code=303)
+    post, views, actions = loaded
+    view_counter.start_flusher()
+
+    body = await rendering.arender(post.content)
+    tag_chips = [
+        A(t.name, href=f"/blog/tag/{t.slug}", cls="tag")
+        for t in post.tags.all()
+    ]
 
     return Titled(
         f"{post.title} | {post.author.get_display_name()}",
@@ -463,8 +593,8 @@ def get(req, session, username: str, slug: str):
                             f"{post.published_at:%b %d, %Y}" if post.published_at else "Draft",
                             cls="post-date",
                         ),
-                        Span(f"{_read_minutes(post.content)} min read", cls="read-time"),
-                        Span(f"{post.view_count} views", cls="view-count"),
+                        Span(f"{post.read_minutes} min read", cls="read-time"),
+                        Span(f"{views} views", cls="view-count"),
                         cls="post-meta",
                     ),
                     cls="post-author-block",
@@ -564,6 +694,8 @@ def post(req, session, username: str, slug: str,
         add_toast(session, "Title and content are required.", "error")
         return RedirectResponse(f'/blog/{username}/{slug}/edit', status_code=303)
 
+    if post.content != content:
+        rendering.invalidate(post.content)
     post.title = title[:200]
     post.excerpt = excerpt[:400]
     post.content = content
@@ -582,6 +714,9 @@ def post(req, session, username: str, slug: str):
     if not user or user.username != username:
         return RedirectResponse('/blog', status_code=303)
 
-    BlogPost.objects.filter(author=user, slug=slug).delete()
+    posts = BlogPost.objects.filter(author=user, slug=slug)
+    for content in posts.values_list('content', flat=True):
+        rendering.invalidate(content)
+    posts.delete()
     add_toast(session, "Post deleted.", "info")
     return RedirectResponse('/blog', status_code=303)
@@ -1,6 +1,7 @@
 from fasthtml.common import *
 from app import app, rt, User
 from auth_bridge import AuthBridge
+from utils.assets import asset_url
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.utils.text import slugify
@@ -8,7 +9,13 @@ from django.db.models import Q
 import json
 
 # Import chat models
-from chat.models import ChatRoom, ChatMessage, UserPresence, ChatNotification
+from chat.models import ChatRoom, ChatMessage, ChatNotification
+from chat.counters import mark_room_read, unread_counts
+from chat.pagination import paginate_messages
+from chat.presence import presence
+from chat.serializers import avatar_url, message_values
+
+DEFAULT_AVATAR = "/static/img/default-avatar.svg"
 
 def chat_header():
     """Header component for the chat section"""
@@ -18,18 +25,9 @@ def chat_header():
         cls="chat-header terminal-header"
     )
 
-def chat_room_card(room, user):
+def chat_room_card(room, unread_count=0, online_count=0):
     """Card component for a chat room"""
-    # Get online users count
-    online_count = UserPresence.objects.filter(room=room, is_online=True).count()
-
-    # Get unread messages count for current user
-    unread_count = ChatNotification.objects.filter(
-        room=room,
-        user=user,
-        is_read=False
-    ).count() if user else 0
-    
+
     # Format room type badge
     room_type_badge = ""
     if room.is_global:
@@ -91,6 +89,16 @@ def chat_sidebar(active_room=None, user=None):
         participants=user
     )[:5] if user else []
     
+    # Unread counts for every listed room in one query
+    unread = unread_counts(user) if user else {}
+
+    def unread_badge(room):
+        count = unread.get(room.id, 0)
+        # The active room has just been marked read
+        if not count or (active_room and active_room.id == room.id):
+            return ""
+        return Span(str(count), cls="unread-badge")
+
     # Create room list items
     room_items = []
     
@@ -101,6 +109,7 @@ def chat_sidebar(active_room=None, user=None):
             A(
                 Span("# ", cls="room-prefix"),
                 global_room.name,
+                unread_badge(global_room),
                 href=f"/chat/{global_room.slug}",
                 cls=f"room-link {active_class}"
             ),
@@ -118,6 +127,7 @@ def chat_sidebar(active_room=None, user=None):
                     A(
                         Span("# ", cls="room-prefix"),
                         room.name,
+                        unread_badge(room),
                         href=f"/chat/{room.slug}",
                         cls=f"room-link {active_class}"
                     ),
@@ -138,6 +148,7 @@ def chat_sidebar(active_room=None, user=None):
                     A(
                         Span("@ ", cls="room-prefix"),
                         room_name,
+                        unread_badge(room),
                         href=f"/chat/{room.slug}",
                         cls=f"room-link {active_class}"
                     ),
@@ -164,19 +175,17 @@ def chat_sidebar(active_room=None, user=None):
     )
 
 def message_item(message):
-    """Component for a single chat message"""
-    user = message.user
-    
+    """Component for a single chat message (a row from chat.serializers.message_values)"""
     # Format timestamp
-    timestamp = message.timestamp.strftime("%H:%M")
+    timestamp = message['timestamp'].strftime("%H:%M")
     
     # Format code block if message is code
-    content = message.content
-    if message.is_code:
-        language_class = f"language-{message.code_language}" if message.code_language else ""
+    content = message['content']
+    if message['is_code']:
+        language_class = f"language-{message['code_language']}" if message['code_language'] else ""
         content = Pre(
             Code(
-                message.content,
+                message['content'],
                 cls=language_class
             ),
             cls="message-code"
@@ -184,19 +193,19 @@ def message_item(message):
     
     # Format edited indicator
     edited_indicator = ""
-    if message.is_edited:
+    if message['is_edited']:
         edited_indicator = Span("(edited)", cls="edited-indicator")
     
     return Div(
         Div(
-            Img(src=user.avatar.url if hasattr(user, 'avatar') and user.avatar else "/static/img/default-avatar.svg", 
-                alt=f"{user.username}'s avatar", 
+            Img(src=avatar_url(message['avatar'], DEFAULT_AVATAR), 
+                alt=f"{message['username']}'s avatar", 
                 cls="message-avatar"),
             cls="message-avatar-container"
         ),
         Div(
             Div(
-                Span(user.username, cls="message-username"),
+                Span(message['username'], cls="message-username"),
                 Span(timestamp, cls="message-time"),
                 edited_indicator,
                 cls="message-header"
@@ -207,17 +216,16 @@ def message_item(message):
             ),
             cls="message-body"
         ),
-        id=f"message-{message.id}",
+        id=f"message-{message['id']}",
         cls="message-item",
-        data_message_id=str(message.id),
-        data_user_id=str(user.id)
+        data_message_id=str(message['id']),
+        data_user_id=str(message['user_id'])
     )
 
 def chat_message_list(room):
     """Component for the chat message list"""
-    # Get recent messages
-    messages = ChatMessage.objects.filter(room=room).order_by('-timestamp')[:50]
-    messages = reversed(list(messages))  # Reverse to show oldest first
+    # Get recent messages, oldest first, with authors joined in one query
+    messages = paginate_messages(message_values(room.messages.all()), limit=50).messages
     
     # Create message items
     message_items = [message_item(message) for message in messages]
@@ -260,24 +268,17 @@ def chat_input_form(room):
 
 def online_users_list(room):
     """Component for the online users list"""
-    # Get online users
-    online_users = UserPresence.objects.filter(
-        room=room,
-        is_online=True
-    ).select_related('user')
-    
     # Create user items
     user_items = []
-    for presence in online_users:
-        user = presence.user
+    for user in presence.online_users(room):
         user_items.append(
             Li(
-                Img(src=user.avatar.url if hasattr(user, 'avatar') and user.avatar else "/static/img/default-avatar.svg", 
-                    alt=f"{user.username}'s avatar", 
+                Img(src=avatar_url(user['avatar'], DEFAULT_AVATAR), 
+                    alt=f"{user['username']}'s avatar", 
                     cls="user-avatar"),
-                Span(user.username, cls="user-name"),
+                Span(user['username'], cls="user-name"),
                 cls="user-item",
-                data_user_id=str(user.id)
+                data_user_id=str(user['user_id'])
             )
         )
     
@@ -344,7 +345,7 @@ def chat_websocket_script(room):
                     messageList.scrollTop = messageList.scrollHeight;
                 }}
                 else if (data.type === 'typing') {{
-                    // Show typing indicator
+                    // Show typing indicator from the room's latest snapshot
                     updateTypingIndicator(data);
                 }}
                 else if (data.type === 'presence') {{
@@ -408,6 +409,7 @@ def chat_websocket_script(room):
             `;
             
             messageList.appendChild(messageItem);
+            noteSeen(data.message_id);
             
             // Highlight code if needed
             if (data.is_code && window.Prism) {{
@@ -415,22 +417,53 @@ def chat_websocket_script(room):
             }}
         }}
         
-        // Update typing indicator
+        // Read receipts: remember the newest message shown and report it at
+        // most every few seconds while the tab is visible, as one watermark
+        let lastSeenId = 0;
+        let lastSentId = 0;
+        let readTimer = null;
+        function noteSeen(messageId) {{
+            lastSeenId = Math.max(lastSeenId, Number(messageId) || 0);
+            if (!readTimer) {{
+                readTimer = setTimeout(sendReadWatermark, 3000);
+            }}
+        }}
+        function sendReadWatermark() {{
+            readTimer = null;
+            if (document.hidden || lastSeenId <= lastSentId) {{
+                return;
+            }}
+            if (!socket || socket.readyState !== WebSocket.OPEN) {{
+                return;
+            }}
+            socket.send(JSON.stringify({{type: 'read', message_id: lastSeenId}}));
+            lastSentId = lastSeenId;
+        }}
+        document.addEventListener('visibilitychange', function() {{
+            if (!document.hidden && lastSeenId > lastSentId) {{
+                sendReadWatermark();
+            }}
+        }});
+        
+        // Update typing indicator. Each server worker sends snapshots of
+        // [user_id, username] pairs; keep the latest per worker and show the union.
+        const typingBySource = {{}};
         function updateTypingIndicator(data) {{
-            const typingIndicator = document.getElementById('typing-indicator');
+            typingBySource[data.source] = data.users;
+            const names = [...new Set(Object.values(typingBySource).flat().map(user => user[1]))];
+            let typingIndicator = document.getElementById('typing-indicator');
             
-            if (data.is_typing) {{
+            if (names.length) {{
                 if (!typingIndicator) {{
-                    const indicator = document.createElement('div');
-                    indicator.id = 'typing-indicator';
-                    indicator.className = 'typing-indicator';
-                    indicator.innerHTML = `<span>${{data.username}} is typing...</span>`;
-                    messageList.appendChild(indicator);
-                }}
-            }} else {{
-                if (typingIndicator) {{
-                    typingIndicator.remove();
+                    typingIndicator = document.createElement('div');
+                    typingIndicator.id = 'typing-indicator';
+                    typingIndicator.className = 'typing-indicator';
+                    messageList.appendChild(typingIndicator);
                 }}
+                const verb = names.length === 1 ? 'is' : 'are';
+                typingIndicator.innerHTML = `<span>${{escapeHtml(names.join(', '))}} ${{verb}} typing...</span>`;
+            }} else if (typingIndicator) {{
+                typingIndicator.remove();
             }}
         }}
         
@@ -639,19 +672,17 @@ def get(req, session):
         participants=user
     )
 
-    # Create room cards
-    room_cards = []
-
-    # Add global room card
-    room_cards.append(chat_room_card(global_room, user))
+    rooms = [global_room, *public_rooms, *private_rooms]
 
-    # Add public room cards
-    for room in public_rooms:
-        room_cards.append(chat_room_card(room, user))
+    # Unread counts in one query, online counts from the presence service
+    unread = unread_counts(user)
+    online = presence.online_counts(rooms)
 
-    # Add private room cards
-    for room in private_rooms:
-        room_cards.append(chat_room_card(room, user))
+    # Create room cards (global, then public, then private)
+    room_cards = [
+        chat_room_card(room, unread.get(room.id, 0), online.get(room.id, 0))
+        for room in rooms
+    ]
     
     # Create chat home component
     chat_home = Div(
@@ -675,7 +706,7 @@ def get(req, session):
     return Titled(
         "Chat | DeadDevelopers",
         Div(
-            Link(rel="stylesheet", href="/static/css/chat.css"),
+            Link(rel="stylesheet", href=asset_url("css/chat.css")),
             chat_home,
             cls="chat-page"
         )
@@ -702,26 +733,15 @@ def get(req, session, room_slug: str):
     if room.is_private:
         room.add_participant(user)
 
-    # Update or create user presence
-    presence, created = UserPresence.objects.get_or_create(
-        user=user,
-        room=room,
-        defaults={"is_online": True}
-    )
-
-    if not created:
-        presence.update_presence(is_online=True)
+    # Join the room (online state itself is tracked over the WebSocket)
+    presence.ensure_member(user, room)
 
     # Mark notifications as read
-    ChatNotification.objects.filter(
-        user=user,
-        room=room,
-        is_read=False
-    ).update(is_read=True)
+    mark_room_read(user, room)
 
     # Create chat room page
     chat_room_page = Div(
-        Link(rel="stylesheet", href="/static/css/chat.css"),
+        Link(rel="stylesheet", href=asset_url("css/chat.css")),
         Link(rel="stylesheet", href="/static/css/prism.css"),
         Div(
             chat_sidebar(active_room=room, user=user),
@@ -806,7 +826,7 @@ def get(req, session):
     return Titled(
         "Create Chat Room | DeadDevelopers",
         Div(
-            Link(rel="stylesheet", href="/static/css/chat.css"),
+            Link(rel="stylesheet", href=asset_url("css/chat.css")),
             Div(
                 create_form,
                 cls="create-room-container terminal-card"
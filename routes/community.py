@@ -1,19 +1,17 @@
 from fasthtml.common import *
 from app import rt
 from routes.header import SiteHeader
+from utils.fragments import Static
 from fasthtml.svg import Svg, ft_svg as tag
 
 @rt('/community')
-def get(session):
+def get():
     """Community page for DeadDevelopers platform"""
-    # Store current path in session for active link highlighting
-    session['path'] = '/community'
-    
     return Titled(
         "Join the DeadDevelopers Community",
         Div(
             # Add community-specific CSS
-            Style("""
+            Static(lambda: Style("""
                 /* Base styles */
                 :root {
                   --color-background: #1a1a1a;
@@ -336,14 +334,14 @@ def get(session):
                     box-shadow: none;
                   }
                 }
-            """),
+            """)),
             
             # Header/Navigation - Using the same structure as in features.py
             
-            SiteHeader(session),
+            SiteHeader('/community'),
             
             # Main content container
-            Main(
+            Static(lambda: Main(
                 Div(
                     # Hero Section
                     Section(
@@ -573,6 +571,6 @@ def get(session):
             ),
                 
                 cls="community-wrapper"
-            )
+            ))
         )
     )
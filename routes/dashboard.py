@@ -5,6 +5,7 @@ from routes.ai import get_ai_response
 from routes.header import SiteHeader
 from users.models import Project
 from chat.models import ChatMessage
+from utils.streaming import Later, stream_page
 
 
 # ---------- Components ----------
@@ -153,17 +154,8 @@ def assistant_widget():
     )
 
 
-# ---------- Routes ----------
-
-@rt('/dashboard')
-def get(req, session):
-    """Main dashboard: stats, projects, activity, AI assistant."""
-    session['path'] = '/dashboard'
-
-    user = AuthBridge.get_current_user(req, session)
-    if not user:
-        return RedirectResponse('/login', status_code=303)
-
+def project_sections(user):
+    """Stats row and projects grid, both built from one query of the user's projects."""
     projects = list(Project.objects.filter(owner=user))
     active_count = sum(1 for p in projects if p.status in ('planned', 'in_progress'))
     completed_count = sum(1 for p in projects if p.status == 'completed')
@@ -174,44 +166,64 @@ def get(req, session):
     else:
         avg_ai = user.ai_percentage
 
-    return Titled(
+    return (
+        Section(
+            Grid(
+                stat_card(f"{avg_ai}%", "AI-Generated Code", cls="highlight"),
+                stat_card(active_count, "Active Projects"),
+                stat_card(completed_count, "Completed"),
+                stat_card(user.challenge_count, "Challenges"),
+                cls="dashboard-stats",
+            ),
+            cls="dashboard-header",
+        ),
+
+        Section(
+            Div(
+                H2("Your Projects"),
+                Button("+ New", cls="btn-primary new-project-btn",
+                       hx_get="/dashboard/projects/new",
+                       hx_target="#new-project-slot",
+                       hx_swap="innerHTML"),
+                cls="section-header",
+            ),
+            Div(id="new-project-slot"),
+            Grid(
+                *[project_card(p) for p in projects] if projects
+                  else [P("No projects yet. Hit '+ New' to start one.", cls="empty-state")],
+                id="projects-grid",
+                cls="projects-grid",
+            ),
+            cls="projects-section",
+        ),
+    )
+
+
+# ---------- Routes ----------
+
+@rt('/dashboard')
+def get(req, session):
+    """Main dashboard: stats, projects, activity, AI assistant.
+
+    Streamed: the header goes out at once, the DB-backed sections follow
+    as their queries finish.
+    """
+    session['path'] = '/dashboard'
+
+    user = AuthBridge.get_current_user(req, session)
+    if not user:
+        return RedirectResponse('/login', status_code=303)
+
+    return stream_page(req, Titled(
         f"Dashboard - {user.get_display_name()}",
         Container(
             SiteHeader(session),
 
-            Section(
-                Grid(
-                    stat_card(f"{avg_ai}%", "AI-Generated Code", cls="highlight"),
-                    stat_card(active_count, "Active Projects"),
-                    stat_card(completed_count, "Completed"),
-                    stat_card(user.challenge_count, "Challenges"),
-                    cls="dashboard-stats",
-                ),
-                cls="dashboard-header",
-            ),
-
-            Section(
-                Div(
-                    H2("Your Projects"),
-                    Button("+ New", cls="btn-primary new-project-btn",
-                           hx_get="/dashboard/projects/new",
-                           hx_target="#new-project-slot",
-                           hx_swap="innerHTML"),
-                    cls="section-header",
-                ),
-                Div(id="new-project-slot"),
-                Grid(
-                    *[project_card(p) for p in projects] if projects
-                      else [P("No projects yet. Hit '+ New' to start one.", cls="empty-state")],
-                    id="projects-grid",
-                    cls="projects-grid",
-                ),
-                cls="projects-section",
-            ),
+            Later(project_sections, user),
 
             Section(
                 H2("Recent Activity"),
-                Card(recent_activity(user), cls="activity-card"),
+                Card(Later(recent_activity, user), cls="activity-card"),
                 cls="activity-section",
             ),
 
@@ -221,7 +233,7 @@ def get(req, session):
                 cls="assistant-section",
             ),
         ),
-    )
+    ))
 
 
 @rt('/dashboard/projects/new')
@@ -1,5 +1,6 @@
 from fasthtml.common import *
 from app import app, rt
+from utils.assets import asset_url
 from django.urls import reverse
 from allauth.account.models import EmailConfirmation, EmailAddress
 from django.utils.http import urlsafe_base64_decode
@@ -34,8 +35,8 @@ def terminal_link(text, href, **kwargs):
 def email_page_headers():
     """Return common headers for email confirmation pages"""
     return [
-        Link(rel='stylesheet', href='/css/style.css'),
-        Link(rel='stylesheet', href='/css/email_confirm.css'),
+        Link(rel='stylesheet', href=asset_url('css/style.css')),
+        Link(rel='stylesheet', href=asset_url('css/email_confirm.css')),
         Link(rel='stylesheet', href='https://fonts.googleapis.com/css2?family=JetBrains+Mono:wght@400;700&display=swap')
     ]
 
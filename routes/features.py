@@ -1,24 +1,23 @@
 from fasthtml.common import *
 from app import rt
 from routes.header import SiteHeader
+from utils.assets import asset_url
+from utils.fragments import Static
 
 @rt('/features')
-def get(session):
+def get():
     """Features page showing platform capabilities"""
-    # Store current path in session for active link highlighting
-    session['path'] = '/features'
-    
     return Titled(
         "Platform Features",
         Div(
             # Add link to features-specific CSS
-            Link(rel='stylesheet', href='/css/features.css'),
+            Link(rel='stylesheet', href=asset_url('css/features.css')),
             
             # Header/Navigation
-            SiteHeader(session),
+            SiteHeader('/features'),
             
             # Main content container
-            Main(
+            Static(lambda: Main(
                 Div(
                     # Header with page title
                     H1("Platform Features", cls="page-title"),
@@ -92,10 +91,10 @@ def get(session):
                     
                     cls="content-container"
                 )
-            ),
+            )),
             
             # Footer
-            Footer(
+            Static(lambda: Footer(
                 Div(
                     Div(
                         Img(src="/img/logo.svg", cls="footer-logo"),
@@ -142,7 +141,7 @@ def get(session):
                     cls="footer-bottom"
                 ),
                 cls="main-footer"
-            ),
+            )),
             
             cls="features-wrapper"
         )
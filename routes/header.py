@@ -1,9 +1,11 @@
 from fasthtml.common import *
 # Import the SVG components properly from fasthtml.svg
 from fasthtml.svg import Svg, ft_svg as tag
+from functools import lru_cache
 from pathlib import Path
 import re
 
+
 # Initialize the FastHTML app with necessary headers
 app, rt = fast_app(
     hdrs=(
@@ -11,390 +13,6 @@ app, rt = fast_app(
     )
 )
 
-# Original CSS with adjustments for FastHTML (unchanged)
-header_css = """
-:root {
-  --terminal-dark: #0a0a0a;
-  --terminal-light: #1a1a1a;
-  --light: #ffffff;
-  --acid: #00ff66;
-  --voltage: #00ffff;
-  --hover-green: #00ff66;
-}
-
-.siteHeader {
-  position: fixed;
-  top: 0;
-  left: 0;
-  right: 0;
-  z-index: 1000;
-  background: rgba(26, 26, 26, 0.75);
-  backdrop-filter: blur(10px);
-  -webkit-backdrop-filter: blur(10px);
-  border-bottom: 1px solid rgba(255, 255, 255, 0.07);
-  transition: all 0.3s ease;
-}
-
-.siteHeader.scrolled {
-  background: rgba(10, 10, 10, 0.85);
-  backdrop-filter: blur(12px);
-  -webkit-backdrop-filter: blur(12px);
-  box-shadow: 0 4px 20px rgba(0, 0, 0, 0.25);
-  border-bottom: 1px solid rgba(255, 255, 255, 0.08);
-}
-
-.mainNav {
-  max-width: 1400px;
-  margin: 0 auto;
-  padding: 1.25rem 0.25rem;
-  display: grid;
-  grid-template-columns: 1fr auto 1fr;
-  align-items: center;
-  position: relative;
-}
-
-.navLeft {
-  display: flex;
-  align-items: center;
-  justify-content: flex-start;
-  width: auto;
-}
-
-.navCenter {
-  display: flex;
-  gap: 2.5rem;
-  justify-content: center;
-  grid-column: 2;
-}
-
-.navRight {
-  display: flex;
-  gap: 0.5rem;
-  justify-content: flex-end;
-  grid-column: 3;
-}
-
-.navLogoContainer {
-  display: flex;
-  align-items: center;
-}
-
-.navLogo {
-  height: 40px;
-  width: 40px;
-  border-radius: 6px;
-  transition: all 0.3s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-  display: flex;
-  align-items: center;
-  justify-content: center;
-  background: transparent;
-  padding: 3px;
-  overflow: hidden;
-}
-
-.navLogo img {
-  width: 100%;
-  height: 100%;
-  object-fit: contain;
-  filter: brightness(0) invert(1);
-}
-
-.navText {
-  font-size: 1.25rem;
-  font-weight: 900;
-  color: var(--light);
-  text-transform: uppercase;
-  letter-spacing: -0.5px;
-  margin-left: 0.5rem;
-}
-
-.brandLogo {
-  font-size: 1.25rem;
-  font-weight: 900;
-  color: var(--light);
-  text-decoration: none;
-  text-transform: uppercase;
-  letter-spacing: -0.5px;
-  display: flex;
-  align-items: center;
-  gap: 1rem;
-}
-
-.navCenter a {
-  color: var(--light);
-  text-decoration: none;
-  font-size: 1.5rem;
-  font-weight: 500;
-  text-transform: uppercase;
-  letter-spacing: 0.6px;
-  position: relative;
-  padding: 0.25rem 0.5rem;
-  opacity: 0.8;
-  transition: all 0.3s cubic-bezier(0.25, 0.1, 0.25, 1);
-}
-
-.navCenter a.active {
-  opacity: 1;
-  color: var(--hover-green);
-  font-weight: 600;
-  text-shadow: 0 0 10px rgba(0, 255, 102, 0.4);
-  letter-spacing: 0.7px;
-}
-
-.navCenter a::after {
-  content: "";
-  position: absolute;
-  left: 0;
-  right: 0;
-  bottom: -3px;
-  height: 2px;
-  background: var(--hover-green);
-  transform: scaleX(0);
-  transform-origin: right;
-  transition: transform 0.4s cubic-bezier(0.23, 1, 0.32, 1);
-}
-
-.navCenter a:hover::after,
-.navCenter a.active::after {
-  transform: scaleX(1);
-  transform-origin: left;
-  box-shadow: 0 0 8px var(--hover-green);
-}
-
-.navLogin {
-  color: var(--light);
-  text-decoration: none;
-  padding: 0.75rem 1.5rem;
-  font-weight: 700;
-  font-size: 1.2rem;
-  text-transform: uppercase;
-  letter-spacing: 0.5px;
-  position: relative;
-  transition: all 0.3s;
-  opacity: 0.7;
-}
-
-.navLogin:hover {
-  opacity: 1;
-  color: var(--voltage);
-}
-
-.navSignup {
-  background: rgba(0, 255, 102, 0.9);
-  box-shadow: 0 0 10px rgba(0, 255, 102, 0.3);
-  color: var(--terminal-dark);
-  text-decoration: none;
-  padding: 0.35rem 1.35rem;
-  font-weight: 700;
-  font-size: 1.2rem;
-  text-transform: uppercase;
-  letter-spacing: 0.5px;
-  position: relative;
-  display: flex;
-  align-items: center;
-  clip-path: polygon(0 0, 100% 0, 100% calc(100% - 6px), calc(100% - 6px) 100%, 0 100%);
-  transition: all 0.3s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-}
-
-.navSignup:hover {
-  transform: translate(-2px, -2px);
-  box-shadow: 3px 3px 0 var(--voltage), 0 0 15px rgba(0, 255, 102, 0.8);
-  filter: brightness(1.1);
-}
-
-.menuButton {
-  display: none;
-  background: none;
-  border: none;
-  color: var(--light);
-  cursor: pointer;
-  padding: 0.5rem;
-  z-index: 1001;
-  transition: color 0.3s ease;
-}
-
-.menuButton svg:first-child {
-  display: block;
-}
-
-.menuButton svg:last-child {
-  display: none;
-}
-
-body.menu-open .menuButton svg:first-child {
-  display: none;
-}
-
-body.menu-open .menuButton svg:last-child {
-  display: block;
-}
-
-.mobileMenu {
-  display: none;
-  position: absolute;
-  top: 100%;
-  left: 0;
-  right: 0;
-  background: rgba(10, 10, 10, 0.9);
-  backdrop-filter: blur(15px);
-  -webkit-backdrop-filter: blur(15px);
-  border-top: 1px solid rgba(255, 255, 255, 0.1);
-  box-shadow: 0 8px 30px rgba(0, 0, 0, 0.3);
-  flex-direction: column;
-  padding: 1.75rem;
-  z-index: 1004;
-}
-
-/* Make sure this selector exists and works correctly */
-.mobileMenu.open {
-  display: flex !important;
-}
-
-.mobileMenuBackdrop {
-  display: none;
-  background: rgba(0, 0, 0, 0.6);
-  backdrop-filter: blur(5px);
-  -webkit-backdrop-filter: blur(5px);
-  position: fixed;
-  top: 0;
-  left: 0;
-  right: 0;
-  bottom: 0;
-  z-index: 999;
-  animation: fadeIn 0.3s ease;
-}
-
-.mobileMenuBackdrop.open {
-  display: block;
-}
-
-@keyframes fadeIn {
-  from { opacity: 0; }
-  to { opacity: 1; }
-}
-
-:global(body.menu-open) {
-  overflow: hidden;
-}
-
-.mobileLink {
-  color: var(--light);
-  text-decoration: none;
-  font-size: 1.5rem;
-  font-weight: 500;
-  text-transform: uppercase;
-  letter-spacing: 0.6px;
-  padding: 0.85rem 0;
-  margin: 0.25rem 0;
-  opacity: 0.8;
-  transition: all 0.3s ease;
-  text-align: center;
-  width: 100%;
-  position: relative;
-}
-
-.mobileLink:hover {
-  opacity: 1;
-  color: var(--hover-green);
-  transform: translateX(3px);
-}
-
-.mobileLink.active {
-  opacity: 1;
-  color: var(--hover-green);
-  font-weight: 600;
-  text-shadow: 0 0 8px rgba(0, 255, 102, 0.3);
-}
-
-.mobileLink::after {
-  content: "";
-  position: absolute;
-  left: 35%;
-  right: 35%;
-  bottom: 0.5rem;
-  height: 2px;
-  background: var(--hover-green);
-  transform: scaleX(0);
-  transform-origin: right;
-  transition: transform 0.3s ease;
-}
-
-.mobileLink:hover::after,
-.mobileLink.active::after {
-  transform: scaleX(1);
-  transform-origin: left;
-  box-shadow: 0 0 8px var(--hover-green);
-}
-
-.mobileAuthLinks {
-  display: flex;
-  flex-direction: column;
-  gap: 1rem;
-  margin-top: 2rem;
-  width: 100%;
-  border-top: 1px solid rgba(255, 255, 255, 0.07);
-  padding-top: 1.5rem;
-}
-
-.mobileAuthLinks .navLogin,
-.mobileAuthLinks .navSignup {
-  width: 100%;
-  display: flex;
-  justify-content: center;
-  align-items: center;
-  padding: 0.85rem 1rem;
-  margin: 0;
-  border-radius: 4px;
-}
-
-.mobileAuthLinks .navLogin {
-  background: rgba(255, 255, 255, 0.05);
-  transition: all 0.3s ease;
-}
-
-.mobileAuthLinks .navLogin:hover {
-  background: rgba(255, 255, 255, 0.1);
-}
-
-@media (max-width: 980px) {
-  .mainNav {
-    display: flex;
-    justify-content: space-between;
-  }
-  .navLeft {
-    width: 100%;
-  }
-  .menuButton {
-    display: block;
-    position: absolute;
-    right: 1rem;
-    top: 50%;
-    transform: translateY(-50%);
-  }
-  .navCenter,
-  .navRight {
-    display: none;
-  }
-  .mobileMenu.open {
-    display: flex;
-  }
-  .mobileMenuBackdrop.open {
-    display: block;
-  }
-}
-
-/* Remove the hover effects for the logo */
-.brandLogo:hover .navLogo {
-  transform: none;
-  background: transparent;
-}
-
-.brandLogo:hover .navLogo img {
-  filter: none;
-  transform: none;
-}
-"""
-
 # Navigation links data
 nav_links = [
     {"href": "/features", "label": "/Features", "id": "nav-features"},
@@ -402,120 +20,37 @@ nav_links = [
     {"href": "/blog", "label": "/Blog", "id": "nav-blog"},
     {"href": "/about", "label": "/About", "id": "nav-about"},
 ]
+NAV_HREFS = frozenset(link["href"] for link in nav_links)
 
 # Header component
 def SiteHeader(current_path):
+    """
+    The site navigation bar. `current_path` is the session (its 'path'
+    picks the active link) or a path string.
+
+    Only the active nav link changes the markup, so each variant is
+    rendered once and reused; the stylesheet and script are external,
+    content-hashed assets (see the app hdrs) browsers cache.
+    """
     # Handle different types of input for current_path
-    if isinstance(current_path, dict) and 'path' in current_path:
-        # If it's a session dictionary with a path key
-        path = current_path['path']
+    if isinstance(current_path, dict):
+        # If it's a session dictionary, get the path from it
+        path = current_path.get('path', "/")
     elif isinstance(current_path, str):
         # If it's already a string path
         path = current_path
     else:
         # Default fallback
         path = "/"
-        
-    normalized_path = path.rstrip('/')
-    
-    # Inline JavaScript for menu functionality
-    inline_js = """
-    // Define toggleMobileMenu as a simple global function
-    function toggleMobileMenu() {
-        const mobileMenu = document.getElementById('mobileMenu');
-        const backdrop = document.getElementById('mobileMenuBackdrop');
-        const body = document.body;
-        
-        if (mobileMenu.classList.contains('open')) {
-            mobileMenu.classList.remove('open');
-            backdrop.classList.remove('open');
-            body.classList.remove('menu-open');
-        } else {
-            mobileMenu.classList.add('open');
-            backdrop.classList.add('open');
-            body.classList.add('menu-open');
-        }
-    }
 
-    function closeMobileMenu() {
-        const mobileMenu = document.getElementById('mobileMenu');
-        const backdrop = document.getElementById('mobileMenuBackdrop');
-        document.body.classList.remove('menu-open');
-        mobileMenu.classList.remove('open');
-        backdrop.classList.remove('open');
-    }
-    
-    function setActivePage(path) {
-        localStorage.setItem('activePage', path);
-    }
+    normalized_path = path.rstrip('/')
+    active_href = normalized_path if normalized_path in NAV_HREFS else ""
+    return NotStr(_header_html(active_href))
 
-    // Add direct event listener during page load
-    window.addEventListener('load', function() {
-        // Set up menu button click handler
-        const menuButton = document.getElementById('menuToggleButton');
-        if (menuButton) {
-            menuButton.addEventListener('click', function(e) {
-                e.preventDefault();
-                toggleMobileMenu();
-            });
-        }
-        
-        // Apply scroll effect to header
-        const header = document.querySelector('.siteHeader');
-        if (header) {
-            window.addEventListener('scroll', function() {
-                if (window.scrollY > 20) {
-                    header.classList.add('scrolled');
-                } else {
-                    header.classList.remove('scrolled');
-                }
-            });
-        }
-        
-        // Set up backdrop click to close menu
-        const backdrop = document.getElementById('mobileMenuBackdrop');
-        if (backdrop) {
-            backdrop.addEventListener('click', closeMobileMenu);
-        }
-        
-        // Apply active state on load
-        const currentPath = localStorage.getItem('activePage') || window.location.pathname;
-        const normalizedPath = currentPath.endsWith('/') ? currentPath.slice(0, -1) : currentPath;
-        
-        // Desktop nav links
-        document.querySelectorAll('.navCenter a').forEach(link => {
-            const linkPath = link.getAttribute('href').endsWith('/') ? 
-                link.getAttribute('href').slice(0, -1) : link.getAttribute('href');
-            
-            if (normalizedPath === linkPath) {
-                link.classList.add('active');
-            } else {
-                link.classList.remove('active');
-            }
-        });
-        
-        // Mobile nav links
-        document.querySelectorAll('.mobileLink').forEach(link => {
-            const linkPath = link.getAttribute('href').endsWith('/') ? 
-                link.getAttribute('href').slice(0, -1) : link.getAttribute('href');
-            
-            if (normalizedPath === linkPath) {
-                link.classList.add('active');
-            } else {
-                link.classList.remove('active');
-            }
-        });
-        
-        // Add click event listeners to all nav links to store active state
-        document.querySelectorAll('.navCenter a, .mobileLink').forEach(link => {
-            link.addEventListener('click', function() {
-                localStorage.setItem('activePage', link.getAttribute('href'));
-                closeMobileMenu(); // Close menu when a link is clicked
-            });
-        });
-    });
-    """
 
+@lru_cache(maxsize=None)
+def _header_html(active_href):
+    """Rendered header for one active nav link."""
     # Create SVG hamburger menu icon properly
     hamburger_icon = Svg(
         tag("path", d="M4 8H20M4 16H20", stroke="currentColor", stroke_width="2", stroke_linecap="round", stroke_linejoin="round"),
@@ -576,10 +111,8 @@ def SiteHeader(current_path):
         xmlns="http://www.w3.org/2000/svg"
     )
 
-    
-    return Header(
-        Style(header_css),
-        Script(inline_js),
+
+    return to_xml(Header(
         Nav(
             # Left section: Logo and menu button
             Div(
@@ -610,7 +143,7 @@ def SiteHeader(current_path):
                 *[A(link["label"], 
                     href=link["href"], 
                     id=link["id"], 
-                    cls="active" if normalized_path == link["href"] else "", 
+                    cls="active" if active_href == link["href"] else "", 
                     onclick=f"setActivePage('{link['href']}')")
                   for link in nav_links],
                 cls="navCenter"
@@ -629,7 +162,7 @@ def SiteHeader(current_path):
             *[A(link["label"], 
                 href=link["href"], 
                 id=f"mobile-{link['id']}", 
-                cls="mobileLink" + (" active" if normalized_path == link["href"] else ""))
+                cls="mobileLink" + (" active" if active_href == link["href"] else ""))
               for link in nav_links],
             # Mobile auth buttons
             Div(
@@ -643,7 +176,7 @@ def SiteHeader(current_path):
         # Backdrop for mobile menu (previously missing)
         Div(id="mobileMenuBackdrop", cls="mobileMenuBackdrop"),
         cls="siteHeader"
-    )
+    ))
 
 # Route definitions with Request object
 @rt("/")
@@ -3,36 +3,31 @@ from app import app, rt
 from routes.header import SiteHeader
 from django.shortcuts import get_object_or_404
 from users.models import User
-import markdown
-import bleach
+from asgiref.sync import sync_to_async
+from utils import rendering
+from utils.streaming import Later, stream_page
 
-# Tags + attrs allowed in user-rendered portfolio markdown.
-# Anything else (script, iframe, on* handlers, etc.) is stripped.
-PORTFOLIO_ALLOWED_TAGS = [
-    "p", "br", "strong", "em", "code", "pre", "blockquote",
-    "ul", "ol", "li", "a", "h1", "h2", "h3", "h4", "h5", "h6",
-    "img", "hr", "table", "thead", "tbody", "tr", "th", "td",
-    "div", "span",
-]
-PORTFOLIO_ALLOWED_ATTRS = {
-    "*": ["class"],
-    "a": ["href", "title", "rel"],
-    "img": ["src", "alt", "title"],
-    "code": ["class"],
-}
-PORTFOLIO_ALLOWED_PROTOCOLS = ["http", "https", "mailto"]
+
+def _load_profile(username, req, session):
+    """Sync half of the profile view: (profile user or None, is own profile)."""
+    try:
+        profile_user = User.objects.get(username=username)
+    except User.DoesNotExist:
+        return None, False
+    from auth_bridge import AuthBridge
+    current_user = AuthBridge.get_current_user(req, session)
+    return profile_user, bool(current_user and current_user.id == profile_user.id)
 
 
 @rt('/profile/{username}')
-def get(username: str, session, req):
+async def get(username: str, session, req):
     """Display a user's profile page"""
     # Store current path in session
     session['path'] = f'/profile/{username}'
     
     # Get the user or 404
-    try:
-        profile_user = User.objects.get(username=username)
-    except User.DoesNotExist:
+    profile_user, is_own_profile = await sync_to_async(_load_profile)(username, req, session)
+    if profile_user is None:
         return Titled(
             "User Not Found",
             Container(
@@ -47,10 +42,6 @@ def get(username: str, session, req):
         )
     
     # Check if profile is public or if viewing own profile
-    from auth_bridge import AuthBridge
-    current_user = AuthBridge.get_current_user(req, session)
-    is_own_profile = current_user and current_user.id == profile_user.id
-    
     if not profile_user.is_public and not is_own_profile:
         return Titled(
             "Private Profile",
@@ -65,24 +56,9 @@ def get(username: str, session, req):
             )
         )
     
-    # Convert portfolio markdown to HTML, then sanitize against XSS.
-    # markdown.markdown() does NOT strip raw HTML tags, so untrusted user
-    # content could inject <script> or event handlers without bleach.
-    portfolio_html = ""
-    if profile_user.portfolio_content:
-        rendered = markdown.markdown(
-            profile_user.portfolio_content,
-            extensions=['extra', 'codehilite']
-        )
-        portfolio_html = bleach.clean(
-            rendered,
-            tags=PORTFOLIO_ALLOWED_TAGS,
-            attributes=PORTFOLIO_ALLOWED_ATTRS,
-            protocols=PORTFOLIO_ALLOWED_PROTOCOLS,
-            strip=True,
-        )
-    
-    return Titled(
+    # Streamed: the header and profile card go out at once, the portfolio
+    # and recent posts follow.
+    return stream_page(req, Titled(
         f"{profile_user.get_display_name()} - Profile",
         Container(
             SiteHeader(session),
@@ -339,21 +315,31 @@ def get(username: str, session, req):
                 ),
                 
                 # Portfolio
-                Div(
-                    H2("Portfolio"),
-                    Div(
-                        NotStr(portfolio_html) if portfolio_html else P("No portfolio content yet.", style="color: #888;"),
-                        cls="portfolio-content"
-                    ),
-                    cls="portfolio-section"
-                ) if portfolio_html or is_own_profile else None,
+                Later(_portfolio_section, profile_user, is_own_profile),
 
                 # Recent posts by this user
-                _profile_blog_section(profile_user, is_own_profile),
+                Later(_profile_blog_section, profile_user, is_own_profile),
 
                 cls="profile-container"
             )
         )
+    ))
+
+
+async def _portfolio_section(profile_user, is_own_profile):
+    """The rendered portfolio, or None when there's none and the viewer isn't the owner."""
+    # Portfolio markdown → sanitized HTML (utils/rendering.py); large
+    # portfolios render off the event loop.
+    portfolio_html = await rendering.arender(profile_user.portfolio_content)
+    if not portfolio_html and not is_own_profile:
+        return None
+    return Div(
+        H2("Portfolio"),
+        Div(
+            NotStr(portfolio_html) if portfolio_html else P("No portfolio content yet.", style="color: #888;"),
+            cls="portfolio-content"
+        ),
+        cls="portfolio-section"
     )
 
 
@@ -367,7 +353,8 @@ def _profile_blog_section(profile_user, is_own_profile):
     qs = BlogPost.objects.filter(author=profile_user)
     if not is_own_profile:
         qs = qs.filter(is_published=True)
-    posts = list(qs.order_by('-published_at', '-created_at')[:5])
+    # Titles and dates only: skip the bodies, join the author for the URLs.
+    posts = list(qs.select_related('author').defer('content').order_by('-published_at', '-created_at')[:5])
 
     if not posts and not is_own_profile:
         return None
@@ -731,7 +718,6 @@ async def post(username: str, session, req):
     All sync ORM calls (lookup, save) go through sync_to_async to avoid
     Django 6's SynchronousOnlyOperation in async contexts.
     """
-    from asgiref.sync import sync_to_async
     from auth_bridge import AuthBridge
 
     current_user = await AuthBridge.aget_current_user(req, session)
@@ -775,7 +761,10 @@ async def post(username: str, session, req):
     current_user.linkedin_username = form_data.get('linkedin_username', '')
     current_user.website = form_data.get('website', '')
     current_user.portfolio_url = form_data.get('portfolio_url', '')
-    current_user.portfolio_content = form_data.get('portfolio_content', '')
+    portfolio_content = form_data.get('portfolio_content', '')
+    if portfolio_content != current_user.portfolio_content:
+        await sync_to_async(rendering.invalidate)(current_user.portfolio_content)
+    current_user.portfolio_content = portfolio_content
     current_user.is_public = 'is_public' in form_data
     current_user.show_email = 'show_email' in form_data
     current_user.theme_preference = form_data.get('theme_preference', 'dark')
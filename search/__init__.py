@@ -0,0 +1,15 @@
+"""
+Full-text search over blog posts, public profiles and chat rooms.
+
+Documents live in one `search_index` table whose shape depends on the
+database backend (see search/backends.py):
+
+- PostgreSQL: a weighted `tsvector` per document with a GIN index, ranked
+  with ts_rank_cd;
+- SQLite: an FTS5 virtual table ranked with bm25 (local development, tests);
+- anything else: no index; `icontains` scans over the source models.
+
+What gets indexed, and from which fields, is declared in search/index.py.
+Signal receivers (search/signals.py) keep the index in step with every
+save and delete, one document at a time.
+"""
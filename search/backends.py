@@ -0,0 +1,206 @@
+"""
+Search index backends.
+
+Each backend stores one document per (source kind, object id) — a title
+and a body, title weighted higher — and answers ranked queries with a
+list of object ids, best match first. A query can be scoped to the pks
+of a queryset (`within`), which becomes a subquery in the same SQL, so
+the limit applies to objects the caller may actually show. Backends are
+picked per database vendor by `default_backend_path()`, or by dotted path
+in SEARCH_BACKEND.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+
+def default_backend_path():
+    if getattr(settings, 'SEARCH_BACKEND', None):
+        return settings.SEARCH_BACKEND
+    if connection.vendor == 'postgresql':
+        return 'search.backends.PostgresBackend'
+    if connection.vendor == 'sqlite' and SQLiteFTSBackend.available():
+        return 'search.backends.SQLiteFTSBackend'
+    return 'search.backends.ScanBackend'
+
+
+def _within(column, queryset):
+    """An `AND column IN (<pks of queryset>)` clause and its params; empty without a queryset."""
+    if queryset is None:
+        return '', []
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    return f" AND {column} IN ({sql})", list(params)
+
+
+class PostgresBackend:
+    """Weighted tsvector documents with a GIN index, ranked by ts_rank_cd."""
+
+    table = 'search_index'
+
+    @property
+    def config(self):
+        return getattr(settings, 'SEARCH_TEXT_CONFIG', 'english')
+
+    def create_schema(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "kind varchar(16) NOT NULL, "
+                "object_id bigint NOT NULL, "
+                "document tsvector NOT NULL, "
+                "PRIMARY KEY (kind, object_id))"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_document_idx "
+                f"ON {self.table} USING gin (document)"
+            )
+
+    def drop_schema(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def upsert(self, source, object_id, title, body):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {self.table} (kind, object_id, document) VALUES (%s, %s, "
+                "setweight(to_tsvector(%s::regconfig, %s), 'A') || "
+                "setweight(to_tsvector(%s::regconfig, %s), 'B')) "
+                "ON CONFLICT (kind, object_id) DO UPDATE SET document = excluded.document",
+                [source.kind, object_id, self.config, title, self.config, body],
+            )
+
+    def delete(self, source, object_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE kind = %s AND object_id = %s",
+                [source.kind, object_id],
+            )
+
+    def clear(self, source):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE kind = %s", [source.kind])
+
+    def search(self, source, query, limit, within=None):
+        scope, scope_params = _within('object_id', within)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT object_id FROM {self.table}, websearch_to_tsquery(%s::regconfig, %s) AS query "
+                f"WHERE kind = %s AND document @@ query{scope} "
+                "ORDER BY ts_rank_cd(document, query) DESC, object_id DESC LIMIT %s",
+                [self.config, query, source.kind, *scope_params, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class SQLiteFTSBackend:
+    """
+    An FTS5 virtual table ranked by bm25, for local development and tests.
+
+    Rows are keyed by rowid = object_id * KIND_SLOTS + source code, so an
+    update or delete is a rowid lookup rather than a scan.
+    """
+
+    table = 'search_index'
+    KIND_SLOTS = 16
+    # bm25 weights for (kind, title, body); kind is UNINDEXED.
+    WEIGHTS = (0.0, 10.0, 1.0)
+
+    @staticmethod
+    def available():
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA compile_options")
+            return any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall())
+
+    def create_schema(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} "
+                "USING fts5(kind UNINDEXED, title, body, tokenize = 'porter unicode61')"
+            )
+
+    def drop_schema(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def _rowid(self, source, object_id):
+        return object_id * self.KIND_SLOTS + source.code
+
+    def upsert(self, source, object_id, title, body):
+        rowid = self._rowid(source, object_id)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [rowid])
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, kind, title, body) VALUES (%s, %s, %s, %s)",
+                [rowid, source.kind, title, body],
+            )
+
+    def delete(self, source, object_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [self._rowid(source, object_id)])
+
+    def clear(self, source):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE kind = %s", [source.kind])
+
+    def search(self, source, query, limit, within=None):
+        match = self.match_expression(query)
+        if not match:
+            return []
+        weights = ", ".join(str(w) for w in self.WEIGHTS)
+        scope, scope_params = _within(f"rowid / {self.KIND_SLOTS}", within)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s AND kind = %s{scope} "
+                f"ORDER BY bm25({self.table}, {weights}), rowid DESC LIMIT %s",
+                [match, source.kind, *scope_params, limit],
+            )
+            return [row[0] // self.KIND_SLOTS for row in cursor.fetchall()]
+
+    @staticmethod
+    def match_expression(query):
+        """
+        Turn free text into a safe FTS5 query: every word must match, and
+        the last one may be a prefix (for search-as-you-type). Quoting each
+        term keeps FTS5 operators in user input from being interpreted.
+        """
+        terms = re.findall(r'\w+', query or '')
+        if not terms:
+            return ''
+        quoted = [f'"{term}"' for term in terms]
+        quoted[-1] += '*'
+        return ' '.join(quoted)
+
+
+class ScanBackend:
+    """No index: icontains scans over the source's fields, newest first."""
+
+    def create_schema(self):
+        pass
+
+    def drop_schema(self):
+        pass
+
+    def upsert(self, source, object_id, title, body):
+        pass
+
+    def delete(self, source, object_id):
+        pass
+
+    def clear(self, source):
+        pass
+
+    def search(self, source, query, limit, within=None):
+        terms = query.split()
+        if not terms:
+            return []
+        queryset = source.model()._default_manager.all()
+        if within is not None:
+            queryset = queryset.filter(pk__in=within.order_by().values('pk'))
+        for term in terms:
+            matches = Q()
+            for field in source.scan_fields:
+                matches |= Q(**{f'{field}__icontains': term})
+            queryset = queryset.filter(matches)
+        return list(queryset.order_by('-pk').values_list('pk', flat=True).distinct()[:limit])
@@ -0,0 +1,131 @@
+"""
+What is searchable, and the index API used by views and signals.
+
+Each Source declares a model, how to turn an instance into a (title, body)
+document, and whether an instance belongs in the index at all (drafts,
+private profiles and inactive rooms don't). Views call `ranked()` with the
+queryset the viewer may see; the index query is restricted to it and
+supplies the ranking.
+"""
+from dataclasses import dataclass
+from typing import Callable
+
+from django.apps import apps
+from django.utils.module_loading import import_string
+
+from .backends import default_backend_path
+
+# Upper bound on results for list views that page through matches
+# themselves (chat room search).
+MAX_CANDIDATES = 200
+
+
+@dataclass(frozen=True)
+class Source:
+    kind: str
+    code: int  # stable per kind: SQLite rowids encode it, never renumber
+    model_label: str
+    fields: tuple  # changes to these re-index an instance
+    scan_fields: tuple  # matched with icontains when there's no index
+    title: Callable
+    body: Callable
+    searchable: Callable
+
+    def model(self, get_model=apps.get_model):
+        return get_model(self.model_label)
+
+
+def _post_body(post):
+    tags = ' '.join(tag.name for tag in post.tags.all())
+    return f"{post.excerpt}\n{tags}\n{post.content}"
+
+
+SOURCES = {
+    source.kind: source
+    for source in (
+        Source(
+            kind='post', code=1, model_label='users.BlogPost',
+            fields=('title', 'excerpt', 'content', 'is_published'),
+            scan_fields=('title', 'excerpt', 'content'),
+            title=lambda post: post.title,
+            body=_post_body,
+            searchable=lambda post: post.is_published,
+        ),
+        Source(
+            kind='profile', code=2, model_label='users.User',
+            fields=('username', 'first_name', 'last_name', 'tagline', 'bio', 'is_public', 'is_active'),
+            scan_fields=('username', 'first_name', 'last_name'),
+            title=lambda user: f"{user.username} {user.first_name} {user.last_name}",
+            body=lambda user: f"{user.tagline}\n{user.bio}",
+            searchable=lambda user: user.is_public and user.is_active,
+        ),
+        Source(
+            kind='room', code=3, model_label='chat.ChatRoom',
+            fields=('name', 'description', 'topics', 'is_active'),
+            scan_fields=('name', 'description', 'topics'),
+            title=lambda room: room.name,
+            body=lambda room: f"{room.topics.replace(',', ' ')}\n{room.description}",
+            searchable=lambda room: room.is_active,
+        ),
+    )
+}
+
+_backend = None
+
+
+def backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(default_backend_path())()
+    return _backend
+
+
+def source_for(model):
+    """The Source indexing `model` (a class or instance), or None."""
+    label = model._meta.label
+    return next((s for s in SOURCES.values() if s.model_label == label), None)
+
+
+def index_instance(instance, source=None):
+    """Add, refresh or remove `instance`'s document to match its current state."""
+    source = source or source_for(instance)
+    if source.searchable(instance):
+        backend().upsert(source, instance.pk, source.title(instance), source.body(instance))
+    else:
+        backend().delete(source, instance.pk)
+
+
+def remove_instance(instance, source=None):
+    source = source or source_for(instance)
+    backend().delete(source, instance.pk)
+
+
+def search_ids(kind, query, limit=20, within=None):
+    """Ids of `kind` objects matching `query`, best match first, optionally only pks of `within`."""
+    query = (query or '').strip()
+    if not query:
+        return []
+    return backend().search(SOURCES[kind], query, limit, within=within)
+
+
+def ranked(queryset, kind, query, limit=20):
+    """The objects in `queryset` matching `query`, best match first (at most `limit`)."""
+    # Scoped in the index query itself: filtering a global top-N afterwards
+    # loses visible matches whenever hidden ones outrank them.
+    ids = search_ids(kind, query, limit, within=queryset)
+    if not ids:
+        return []
+    found = queryset.in_bulk(ids)
+    return [found[pk] for pk in ids if pk in found]
+
+
+def rebuild(get_model=apps.get_model):
+    """Re-index every source from scratch (also the initial backfill)."""
+    for source in SOURCES.values():
+        backend().clear(source)
+        queryset = source.model(get_model)._default_manager.all()
+        if source.kind == 'post':
+            queryset = queryset.prefetch_related('tags')
+        for instance in queryset.iterator(chunk_size=500):
+            if source.searchable(instance):
+                backend().upsert(source, instance.pk, source.title(instance), source.body(instance))
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    from search import index
+
+    index.backend().create_schema()
+    index.rebuild(apps.get_model)
+
+
+def drop_index(apps, schema_editor):
+    from search import index
+
+    index.backend().drop_schema()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_blogpost_word_count'),
+        ('chat', '0004_read_watermarks'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,43 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import BlogPost
+
+from . import index
+from .index import SOURCES
+
+
+def reindex_after_save(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Refresh the saved instance's document, unless only unindexed fields changed."""
+    source = index.source_for(sender)
+    if raw or (update_fields is not None and not set(update_fields) & set(source.fields)):
+        return
+    index.index_instance(instance, source)
+
+
+def remove_after_delete(sender, instance, **kwargs):
+    index.remove_instance(instance)
+
+
+for _source in SOURCES.values():
+    post_save.connect(reindex_after_save, sender=_source.model_label, dispatch_uid=f'search-save-{_source.kind}')
+    post_delete.connect(remove_after_delete, sender=_source.model_label, dispatch_uid=f'search-delete-{_source.kind}')
+
+
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def reindex_after_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Tag names are part of a post's document."""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            index.index_instance(instance)
+        return
+    # `instance` is a Tag; the posts it gained or lost need re-indexing.
+    if action == 'pre_clear':
+        instance._search_post_ids = list(instance.posts.values_list('pk', flat=True))
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_search_post_ids', [])
+    elif action not in ('post_add', 'post_remove'):
+        return
+    for post in BlogPost.objects.filter(pk__in=pk_set).prefetch_related('tags'):
+        index.index_instance(post)
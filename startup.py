@@ -0,0 +1,184 @@
+"""
+Cold-start support for app.py and main.py.
+
+Serverless deployments (vercel.json routes everything to main.py) start a
+fresh process for many requests, so import-time work is paid often. Three
+pieces here keep it small and visible:
+
+- `phase()` times each startup phase; `report()` formats the breakdown
+  (`log_report()` logs it under FAST_STARTUP) and `timings()` returns
+  it (benchmarks/bench_startup.py tracks it).
+- `migrations_applied()` is the cheap migration check. It fingerprints the
+  migration files on disk (names only, nothing is imported) and compares
+  them with the django_migrations table. A fingerprint that passed is
+  remembered in the Django cache, so later starts skip even that query.
+  Anything unexpected (e.g. a squashed migration recorded under its
+  replaced names) returns False, and app.py runs the full `migrate --check`.
+- `route_loader` imports route modules. Normally all of them at startup;
+  with FAST_STARTUP each module is imported on the first request under its
+  path prefix.
+
+FAST_STARTUP=1 turns on the cached migration check and lazy routes; the
+timings are always recorded. Only the standard library is imported at
+module level: this runs before django.setup().
+"""
+import hashlib
+import importlib
+import logging
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_started = time.perf_counter()
+_phases = {}
+
+
+def fast_startup() -> bool:
+    return os.getenv('FAST_STARTUP', '').lower() in ('1', 'true', 'yes')
+
+
+@contextmanager
+def phase(name):
+    """Time the enclosed block as startup phase `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases[name] = _phases.get(name, 0.0) + time.perf_counter() - start
+
+
+def timings():
+    """{phase: milliseconds} in the order phases ran, plus 'total' since this module loaded."""
+    result = {name: seconds * 1000 for name, seconds in _phases.items()}
+    result['total'] = (time.perf_counter() - _started) * 1000
+    return result
+
+
+def report() -> str:
+    breakdown = timings()
+    total = breakdown.pop('total')
+    phases = ', '.join(f"{name} {ms:.0f}ms" for name, ms in breakdown.items())
+    return f"Startup {total:.0f}ms ({phases})"
+
+
+def log_report():
+    """Log report() once the app is up; only with FAST_STARTUP, where cold starts matter."""
+    if fast_startup():
+        logger.info(report())
+
+
+# ---------- Migration check ----------
+
+_MIGRATIONS_CACHE_PREFIX = 'startup:migrations:'
+
+
+def migrations_on_disk():
+    """{(app_label, migration name)} for every installed app, from file names alone."""
+    from importlib.util import find_spec
+
+    from django.apps import apps
+    from django.db.migrations.loader import MigrationLoader
+
+    found = set()
+    for config in apps.get_app_configs():
+        module_name, _ = MigrationLoader.migrations_module(config.label)
+        if module_name is None:
+            continue
+        try:
+            spec = find_spec(module_name)
+        except ModuleNotFoundError:
+            continue
+        if spec is None or not spec.submodule_search_locations:
+            continue
+        for location in spec.submodule_search_locations:
+            found.update(
+                (config.label, path.stem)
+                for path in Path(location).glob('*.py')
+                if not path.name.startswith(('_', '~'))
+            )
+    return found
+
+
+def migration_fingerprint(on_disk, connection) -> str:
+    """Hash of the migration graph's node names and the database they're checked against."""
+    database = (connection.vendor, connection.settings_dict.get('HOST'), str(connection.settings_dict.get('NAME')))
+    return hashlib.sha256(repr((database, sorted(on_disk))).encode()).hexdigest()[:24]
+
+
+def remember_migrations(fingerprint=None):
+    """Record that the migration graph (the current one, by default) is fully applied."""
+    from django.core.cache import cache
+    from django.db import connection
+
+    fingerprint = fingerprint or migration_fingerprint(migrations_on_disk(), connection)
+    try:
+        cache.set(_MIGRATIONS_CACHE_PREFIX + fingerprint, True, None)
+    except Exception:
+        logger.warning("Could not cache the migration fingerprint", exc_info=True)
+
+
+def migrations_applied(connection=None) -> bool:
+    """
+    True if every migration on disk is known to be applied: from the cache,
+    or from one query against django_migrations. False means "run the full
+    check", not necessarily that migrations are missing.
+    """
+    from django.core.cache import cache
+    from django.db import connection as default_connection
+    from django.db.migrations.recorder import MigrationRecorder
+
+    connection = connection or default_connection
+    on_disk = migrations_on_disk()
+    fingerprint = migration_fingerprint(on_disk, connection)
+    try:
+        if cache.get(_MIGRATIONS_CACHE_PREFIX + fingerprint):
+            return True
+    except Exception:
+        logger.warning("Could not read the migration fingerprint cache", exc_info=True)
+    recorder = MigrationRecorder(connection)
+    if not recorder.has_table() or not on_disk <= set(recorder.applied_migrations()):
+        return False
+    remember_migrations(fingerprint)
+    return True
+
+
+# ---------- Route modules ----------
+
+class RouteLoader:
+    """
+    Imports the modules that register FastHTML routes, keyed by the first
+    path segment they serve ('blog' for /blog/...).
+    """
+
+    def __init__(self):
+        self.modules = {}
+        self.loaded = set()
+        self.lazy = False
+
+    def configure(self, modules, lazy=False):
+        self.modules = dict(modules)
+        self.lazy = lazy
+
+    def load_all(self):
+        for module in dict.fromkeys(self.modules.values()):
+            self._load(module)
+
+    def load_for(self, path):
+        """Import the module serving `path` if it hasn't been yet (lazy mode only)."""
+        if not self.lazy:
+            return
+        module = self.modules.get(path.lstrip('/').split('/', 1)[0])
+        if module is not None and module not in self.loaded:
+            start = time.perf_counter()
+            self._load(module)
+            logger.info("Loaded %s on first request in %.0fms", module, (time.perf_counter() - start) * 1000)
+
+    def _load(self, module):
+        importlib.import_module(module)
+        self.loaded.add(module)
+
+
+route_loader = RouteLoader()
@@ -0,0 +1,95 @@
+// SiteHeader (routes/header.py): mobile menu, scroll effect and active link state
+// Define toggleMobileMenu as a simple global function
+function toggleMobileMenu() {
+    const mobileMenu = document.getElementById('mobileMenu');
+    const backdrop = document.getElementById('mobileMenuBackdrop');
+    const body = document.body;
+
+    if (mobileMenu.classList.contains('open')) {
+        mobileMenu.classList.remove('open');
+        backdrop.classList.remove('open');
+        body.classList.remove('menu-open');
+    } else {
+        mobileMenu.classList.add('open');
+        backdrop.classList.add('open');
+        body.classList.add('menu-open');
+    }
+}
+
+function closeMobileMenu() {
+    const mobileMenu = document.getElementById('mobileMenu');
+    const backdrop = document.getElementById('mobileMenuBackdrop');
+    document.body.classList.remove('menu-open');
+    mobileMenu.classList.remove('open');
+    backdrop.classList.remove('open');
+}
+
+function setActivePage(path) {
+    localStorage.setItem('activePage', path);
+}
+
+// Add direct event listener during page load
+window.addEventListener('load', function() {
+    // Set up menu button click handler
+    const menuButton = document.getElementById('menuToggleButton');
+    if (menuButton) {
+        menuButton.addEventListener('click', function(e) {
+            e.preventDefault();
+            toggleMobileMenu();
+        });
+    }
+
+    // Apply scroll effect to header
+    const header = document.querySelector('.siteHeader');
+    if (header) {
+        window.addEventListener('scroll', function() {
+            if (window.scrollY > 20) {
+                header.classList.add('scrolled');
+            } else {
+                header.classList.remove('scrolled');
+            }
+        });
+    }
+
+    // Set up backdrop click to close menu
+    const backdrop = document.getElementById('mobileMenuBackdrop');
+    if (backdrop) {
+        backdrop.addEventListener('click', closeMobileMenu);
+    }
+
+    // Apply active state on load
+    const currentPath = localStorage.getItem('activePage') || window.location.pathname;
+    const normalizedPath = currentPath.endsWith('/') ? currentPath.slice(0, -1) : currentPath;
+
+    // Desktop nav links
+    document.querySelectorAll('.navCenter a').forEach(link => {
+        const linkPath = link.getAttribute('href').endsWith('/') ? 
+            link.getAttribute('href').slice(0, -1) : link.getAttribute('href');
+
+        if (normalizedPath === linkPath) {
+            link.classList.add('active');
+        } else {
+            link.classList.remove('active');
+        }
+    });
+
+    // Mobile nav links
+    document.querySelectorAll('.mobileLink').forEach(link => {
+        const linkPath = link.getAttribute('href').endsWith('/') ? 
+            link.getAttribute('href').slice(0, -1) : link.getAttribute('href');
+
+        if (normalizedPath === linkPath) {
+            link.classList.add('active');
+        } else {
+            link.classList.remove('active');
+        }
+    });
+
+    // Add click event listeners to all nav links to store active state
+    document.querySelectorAll('.navCenter a, .mobileLink').forEach(link => {
+        link.addEventListener('click', function() {
+            localStorage.setItem('activePage', link.getAttribute('href'));
+            closeMobileMenu(); // Close menu when a link is clicked
+        });
+    });
+});
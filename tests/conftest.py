@@ -25,3 +25,31 @@ def _enable_db_access_for_all_tests(request, transactional_db):
     if 'no_db' in request.keywords:
         return
     return transactional_db
+
+
+@pytest.fixture(autouse=True)
+def _reset_shared_state():
+    """
+    Clear the process-wide state tests would otherwise leak into each
+    other: chat presence, buffered blog views and the cache (room
+    memberships, view dedup, rendered markdown).
+    """
+    from django.core.cache import cache
+
+    from chat.presence import presence
+    from users.view_counts import view_counter
+
+    if hasattr(presence.backend, 'clear'):
+        presence.backend.clear()
+    if hasattr(view_counter.buffer, 'clear'):
+        view_counter.buffer.clear()
+    cache.clear()
+    yield
+
+
+@pytest.fixture
+def room(transactional_db):
+    """A public chat room, for the chat tests."""
+    from chat.models import ChatRoom
+
+    return ChatRoom.objects.create(name='General', slug='general', type='public')
@@ -0,0 +1,126 @@
+"""
+Tests for the hashed, precompressed static asset pipeline (utils/assets.py)
+and the /assets/ route in the app.py dispatcher.
+"""
+import gzip
+import hashlib
+import json
+
+import pytest
+from starlette.testclient import TestClient
+
+import main
+from app import app
+from utils import assets
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def tree(tmp_path, settings, monkeypatch):
+    """A scratch static/ tree built into a scratch output directory."""
+    source, output = tmp_path / 'static', tmp_path / 'build'
+    (source / 'css').mkdir(parents=True)
+    (source / 'js').mkdir()
+    (source / 'img').mkdir()
+    (source / 'css' / 'site.css').write_text('body { color: #0f6; }\n' * 50)
+    (source / 'js' / 'menu.js').write_text('function toggle() {}\n')
+    (source / 'img' / 'logo.svg').write_text('<svg/>')
+    settings.ASSETS_BUILD_DIR = str(output)
+    monkeypatch.setattr(assets, '_manifest', None)
+    return source, output
+
+
+def test_build_fingerprints_css_and_js_only(tree):
+    source, output = tree
+
+    manifest = assets.build(source, output)
+
+    digest = hashlib.sha256((source / 'css' / 'site.css').read_bytes()).hexdigest()[:assets.HASH_LENGTH]
+    assert manifest == {'css/site.css': f'css/site.{digest}.css', 'js/menu.js': manifest['js/menu.js']}
+    assert json.loads((output / 'manifest.json').read_text()) == manifest
+    assert (output / manifest['css/site.css']).read_bytes() == (source / 'css' / 'site.css').read_bytes()
+
+
+def test_build_writes_compressed_variants(tree):
+    source, output = tree
+    hashed = output / assets.build(source, output)['css/site.css']
+
+    assert gzip.decompress(hashed.with_name(hashed.name + '.gz').read_bytes()) == hashed.read_bytes()
+    brotli = pytest.importorskip('brotli')
+    assert brotli.decompress(hashed.with_name(hashed.name + '.br').read_bytes()) == hashed.read_bytes()
+
+
+def test_rebuild_only_writes_changes_and_keeps_old_outputs(tree):
+    source, output = tree
+    first = assets.build(source, output)
+    hashed = output / first['css/site.css']
+    written_at = hashed.stat().st_mtime_ns
+
+    assert assets.build(source, output) == first
+    assert hashed.stat().st_mtime_ns == written_at
+
+    (source / 'css' / 'site.css').write_text('body { color: red; }\n')
+    second = assets.build(source, output)
+    assert second['css/site.css'] != first['css/site.css']
+    assert hashed.exists()
+
+
+def test_asset_url_resolves_through_the_manifest(tree):
+    source, output = tree
+    assets.build(source, output)
+
+    assert assets.asset_url('css/site.css') == '/assets/' + assets.read_manifest(output)['css/site.css']
+    assert assets.asset_url('/js/menu.js').startswith('/assets/js/menu.')
+    assert assets.asset_url('css/unbuilt.css') == '/css/unbuilt.css'
+
+
+def test_prepare_falls_back_when_the_build_dir_is_unwritable(tree, monkeypatch):
+    def read_only(*args, **kwargs):
+        raise PermissionError("read-only file system")
+
+    monkeypatch.setattr(assets, 'build', read_only)
+
+    assets.prepare()
+
+    assert assets.asset_url('css/site.css') == '/css/site.css'
+
+
+def test_pages_link_hashed_assets():
+    html = client.get('/about').text
+
+    assert assets.asset_url('css/style.css') in html
+    assert assets.asset_url('css/style.css').startswith('/assets/css/style.')
+    assert '?v=' not in html
+
+
+@pytest.mark.parametrize('accept, encoding', [
+    ('br, gzip', 'br'),
+    ('gzip, deflate', 'gzip'),
+    ('br;q=0, gzip', 'gzip'),
+    ('identity', None),
+])
+def test_assets_are_negotiated_and_immutable(accept, encoding):
+    if encoding == 'br' and assets.brotli is None:
+        pytest.skip("brotli not installed")
+    url = assets.asset_url('css/style.css')
+
+    response = client.get(url, headers={'Accept-Encoding': accept})
+
+    assert response.status_code == 200
+    assert response.headers.get('content-encoding') == encoding
+    assert response.headers['content-type'].startswith('text/css')
+    assert response.headers['cache-control'] == 'public, max-age=31536000, immutable'
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert response.text.startswith((assets.source_dir() / 'css' / 'style.css').read_text()[:40])
+
+
+def test_asset_revalidation_and_unknown_names():
+    url = assets.asset_url('js/header.js')
+    etag = client.get(url, headers={'Accept-Encoding': 'identity'}).headers['etag']
+
+    assert client.get(url, headers={'Accept-Encoding': 'identity', 'If-None-Match': etag}).status_code == 304
+    assert client.get('/assets/js/header.0000000000.js').status_code == 404
+    assert client.get('/assets/manifest.json').status_code == 404
+    assert client.get('/assets/../../settings.py').status_code == 404
+    assert client.post(url).status_code == 405
@@ -5,7 +5,7 @@ Tests the unified authentication layer between FastHTML and Django
 
 import pytest
 from django.contrib.auth import get_user_model
-from auth_bridge import AuthBridge
+from auth_bridge import SCOPE_USER_KEY, AuthBridge
 from unittest.mock import Mock, MagicMock
 
 User = get_user_model()
@@ -117,3 +117,119 @@ class TestAuthBridgeIntegration:
         # Verify user is no longer authenticated
         user = AuthBridge.get_current_user(mock_request, fasthtml_session)
         assert user is None
+
+
+@pytest.fixture
+def scoped_request():
+    """A mock request carrying a real ASGI scope dict and a Django session cookie."""
+    request = Mock()
+    request.client = Mock()
+    request.client.host = '127.0.0.1'
+    request.cookies = {'sessionid': 'identity-cache-test'}
+    request.scope = {}
+    return request
+
+
+@pytest.fixture
+def clean_cache():
+    from django.core.cache import cache
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+class TestIdentityCache:
+    """get_current_user resolves the user once per request and caches it briefly."""
+
+    def test_second_call_in_request_hits_scope(self, test_user, scoped_request, clean_cache, django_assert_num_queries):
+        session = {'auth': 'testuser'}
+        with django_assert_num_queries(1):
+            first = AuthBridge.get_current_user(scoped_request, session)
+            second = AuthBridge.get_current_user(scoped_request, session)
+        assert first is second
+        assert scoped_request.scope[SCOPE_USER_KEY] is first
+        assert 'user' not in scoped_request.scope
+
+    def test_next_request_on_same_session_skips_db(self, test_user, scoped_request, clean_cache, django_assert_num_queries):
+        session = {'auth': 'testuser'}
+        AuthBridge.get_current_user(scoped_request, session)
+
+        scoped_request.scope = {}
+        with django_assert_num_queries(0):
+            user = AuthBridge.get_current_user(scoped_request, session)
+        assert user.username == 'testuser'
+
+    def test_profile_save_invalidates_cache(self, test_user, scoped_request, clean_cache):
+        session = {'auth': 'testuser'}
+        AuthBridge.get_current_user(scoped_request, session)
+
+        test_user.tagline = 'Updated'
+        test_user.save()
+
+        scoped_request.scope = {}
+        assert AuthBridge.get_current_user(scoped_request, session).tagline == 'Updated'
+
+    def test_logout_drops_cached_identity(self, test_user, scoped_request, clean_cache, django_assert_num_queries):
+        from auth_bridge import _session_cache_key
+        session = {'auth': 'testuser'}
+        AuthBridge.get_current_user(scoped_request, session)
+        assert scoped_request.scope[SCOPE_USER_KEY] == test_user
+        assert clean_cache.get(_session_cache_key(scoped_request)) == test_user
+
+        AuthBridge.logout_user(scoped_request, session)
+
+        assert SCOPE_USER_KEY not in scoped_request.scope
+        assert clean_cache.get(_session_cache_key(scoped_request)) is None
+        # Nothing cached is left to answer for the old cookie: resolving it
+        # again has to go back to the database.
+        with django_assert_num_queries(1):
+            assert AuthBridge.get_current_user(scoped_request, {'auth': 'testuser'}) == test_user
+
+    def test_cached_user_ignored_for_different_auth(self, test_user, scoped_request, clean_cache):
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        AuthBridge.get_current_user(scoped_request, {'auth': 'testuser'})
+
+        scoped_request.scope = {}
+        assert AuthBridge.get_current_user(scoped_request, {'auth': 'other'}) == other
+
+
+class TestLazyDjangoSession:
+    """The bridge's Django session is engine-aware and only written on demand."""
+
+    def test_anonymous_sync_touches_no_tables(self, mock_request, fasthtml_session, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            AuthBridge.sync_sessions(mock_request, fasthtml_session)
+        assert AuthBridge.get_django_session(mock_request).session_key is None
+
+    def test_stale_cookie_is_not_recreated_until_save(self, mock_request, fasthtml_session):
+        from django.contrib.sessions.models import Session
+        mock_request.cookies = {'sessionid': 'no-such-session'}
+
+        AuthBridge.sync_sessions(mock_request, fasthtml_session)
+
+        assert not Session.objects.exists()
+
+    def test_login_persists_session(self, test_user, mock_request, fasthtml_session):
+        AuthBridge.login_user(mock_request, fasthtml_session, test_user)
+
+        session = AuthBridge.get_django_session(mock_request)
+        assert session.session_key
+        reloaded = type(session)(session_key=session.session_key)
+        assert reloaded['_auth_user_id'] == str(test_user.id)
+
+    @pytest.mark.parametrize('engine', [
+        'django.contrib.sessions.backends.db',
+        'django.contrib.sessions.backends.cache',
+        'django.contrib.sessions.backends.signed_cookies',
+    ])
+    def test_honours_session_engine(self, engine, settings, test_user, mock_request, fasthtml_session):
+        settings.SESSION_ENGINE = engine
+        AuthBridge.login_user(mock_request, fasthtml_session, test_user)
+        session_key = AuthBridge.get_django_session(mock_request).session_key
+
+        # A follow-up request carrying the new cookie sees the same login.
+        follow_up = Mock()
+        follow_up.cookies = {'sessionid': session_key}
+        follow_up_session = {}
+        AuthBridge.sync_sessions(follow_up, follow_up_session)
+        assert follow_up_session['auth'] == 'testuser'
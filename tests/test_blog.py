@@ -103,3 +103,25 @@ def test_write_post_route_redirects_unauthenticated():
     response = client.get("/blog/write", follow_redirects=False)
     assert response.status_code in [302, 303]
     assert "/login" in response.headers.get("location", "")
+
+
+@pytest.mark.parametrize("count", [3, 12])
+def test_feed_cards_render_in_constant_queries(count, django_assert_num_queries):
+    """Posts + one prefetch for tags, however many cards and tags there are."""
+    from fasthtml.common import to_xml
+    from routes.blog import feed_posts, post_card
+    from users.models import Tag
+
+    author = User.objects.create_user(email="feed@example.com", username="feed")
+    tags = [Tag.objects.create(name=f"tag{n}") for n in range(7)]
+    for n in range(count):
+        BlogPost.objects.create(
+            author=author, title=f"Post {n}", content="word " * 600, is_published=True,
+        ).tags.set(tags)
+
+    with django_assert_num_queries(2):
+        html = "".join(to_xml(post_card(p)) for p in feed_posts(BlogPost.objects)[:30])
+
+    assert html.count('class="post-card"') == count
+    assert html.count('class="tag"') == count * 5
+    assert "3 min read" in html
@@ -2,6 +2,7 @@
 Unit tests for BlogPost + Tag models and the markdown sanitizer used by
 the blog. Together these cover: auto-slug, auto-excerpt, draft visibility
 gating, published_at stamping, view-count atomicity, and XSS scrubbing.
+Render caching is covered in tests/test_rendering.py.
 """
 import os
 import sys
@@ -16,7 +17,7 @@ import pytest
 from django.db import IntegrityError
 
 from users.models import BlogPost, Tag, User
-from routes.blog import render_markdown
+from utils.rendering import render_markdown
 
 
 @pytest.fixture
@@ -137,3 +138,17 @@ def test_render_markdown_strips_event_handlers():
 def test_render_markdown_empty_returns_empty():
     assert render_markdown("") == ""
     assert render_markdown(None) == ""
+
+
+
+@pytest.mark.django_db
+def test_word_count_and_read_time_persisted_on_save(author):
+    p = BlogPost.objects.create(author=author, title="t", content="word " * 450)
+    assert p.word_count == 450
+    assert BlogPost.objects.get(pk=p.pk).read_minutes == 2
+
+    p.content = "short"
+    p.save(update_fields=["content"])
+    p.refresh_from_db()
+    assert p.word_count == 1
+    assert p.read_minutes == 1
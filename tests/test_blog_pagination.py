@@ -0,0 +1,95 @@
+"""
+Tests for keyset-paginated blog feeds (users/pagination.py) and the HTMX
+"load more" fragment endpoint.
+"""
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from starlette.testclient import TestClient
+
+import main
+from app import app
+from users.models import BlogPost, Tag, User
+from users.pagination import InvalidCursor, decode_cursor, feed_page
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def posts(transactional_db):
+    """25 published posts; pairs share a published_at to exercise the id tiebreak."""
+    author = User.objects.create_user(email='pager@example.com', username='pager')
+    python = Tag.objects.create(name='python')
+    start = timezone.now()
+    created = []
+    for n in range(25):
+        post = BlogPost.objects.create(author=author, title=f'Post {n}', content='x', is_published=True)
+        BlogPost.objects.filter(pk=post.pk).update(published_at=start + timedelta(minutes=n // 2))
+        if n % 2:
+            post.tags.add(python)
+        created.append(post)
+    BlogPost.objects.create(author=author, title='Draft', content='x')
+    return created
+
+
+def walk(queryset, limit):
+    seen, cursor = [], None
+    while True:
+        page, cursor = feed_page(queryset, cursor, limit=limit)
+        seen.extend(p.pk for p in page)
+        if cursor is None:
+            return seen
+
+
+def newest_first(posts):
+    return [p.pk for p in BlogPost.objects.filter(pk__in=[p.pk for p in posts]).order_by('-published_at', '-id')]
+
+
+@pytest.mark.parametrize('limit', [1, 4, 20, 50])
+def test_pages_cover_feed_exactly_once(posts, limit):
+    assert walk(BlogPost.objects.filter(is_published=True), limit) == newest_first(posts)
+
+
+def test_each_page_is_one_query(posts, django_assert_num_queries):
+    _, cursor = feed_page(BlogPost.objects.filter(is_published=True), limit=5)
+    with django_assert_num_queries(1):
+        page, _ = feed_page(BlogPost.objects.filter(is_published=True), cursor, limit=5)
+    assert len(page) == 5
+
+
+def test_invalid_cursor_rejected():
+    with pytest.raises(InvalidCursor):
+        decode_cursor('not-a-cursor')
+
+
+def test_blog_page_links_to_next_page(posts):
+    response = client.get('/blog')
+    assert response.text.count('class="post-card"') == 20
+    assert 'hx-get="/blog/more?cursor=' in response.text
+
+
+def test_load_more_fragment_is_cards_only(posts):
+    _, cursor = feed_page(BlogPost.objects.filter(is_published=True), limit=20)
+
+    response = client.get('/blog/more', params={'cursor': cursor}, headers={'HX-Request': 'true'})
+
+    assert response.status_code == 200
+    assert response.text.count('class="post-card"') == 5
+    assert 'siteHeader' not in response.text
+    assert 'sidebar' not in response.text
+    assert 'hx-get' not in response.text  # last page: no further sentinel
+
+
+def test_load_more_within_tag(posts):
+    tagged = [p for n, p in enumerate(posts) if n % 2]
+    _, cursor = feed_page(BlogPost.objects.filter(is_published=True, tags__slug='python'), limit=10)
+
+    response = client.get('/blog/more', params={'cursor': cursor, 'tag': 'python'}, headers={'HX-Request': 'true'})
+
+    assert response.text.count('class="post-card"') == len(tagged) - 10
+
+
+def test_load_more_bad_cursor_is_400(posts):
+    response = client.get('/blog/more', params={'cursor': 'garbage'}, headers={'HX-Request': 'true'})
+    assert response.status_code == 400
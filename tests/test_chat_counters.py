@@ -0,0 +1,84 @@
+"""
+Tests for the materialized unread counters (chat/counters.py): counts kept
+in step with notification fan-out and reads.
+"""
+import pytest
+
+from chat.counters import (
+    mark_notifications_read,
+    mark_room_read,
+    total_unread,
+    unread_counts,
+)
+from chat.models import ChatMessage, ChatNotification, ChatRoom, UserPresence
+from chat.notifications import create_notifications
+from users.models import User
+
+
+@pytest.fixture
+def members(room):
+    users = [
+        User.objects.create_user(email=f'counter{i}@example.com', username=f'counter{i}', password='x-not-real')
+        for i in range(3)
+    ]
+    for user in users:
+        UserPresence.objects.create(user=user, room=room)
+    return users
+
+
+def test_fan_out_bumps_unread_counters(room, members):
+    sender, reader, other = members
+    for n in range(3):
+        ChatMessage.objects.create(room=room, user=sender, content=f'msg {n}')
+
+    assert unread_counts(reader) == {room.id: 3}
+    assert total_unread(other) == 3
+    assert total_unread(sender) == 0
+
+
+def test_batch_notifications_are_counted_once(room, members):
+    sender, reader, _ = members
+    message = ChatMessage(room=room, user=sender, content='batched')
+    ChatMessage.objects.bulk_create([message])
+
+    create_notifications([message])
+    create_notifications([message])  # retried batch
+
+    assert ChatNotification.objects.filter(user=reader).count() == 1
+    assert total_unread(reader) == 1
+
+
+def test_mark_room_read_resets_counter(room, members):
+    sender, reader, other = members
+    ChatMessage.objects.create(room=room, user=sender, content='hello')
+
+    mark_room_read(reader, room)
+
+    assert unread_counts(reader) == {}
+    assert total_unread(other) == 1
+    assert not ChatNotification.objects.filter(user=reader, is_read=False).exists()
+
+
+def test_mark_specific_notifications_read(room, members):
+    sender, reader, _ = members
+    for n in range(3):
+        ChatMessage.objects.create(room=room, user=sender, content=f'msg {n}')
+    first = ChatNotification.objects.filter(user=reader).order_by('id').first()
+
+    mark_notifications_read(reader, [first.id])
+    assert total_unread(reader) == 2
+
+    mark_notifications_read(reader)
+    assert total_unread(reader) == 0
+
+
+def test_unread_counts_is_one_query(room, members, django_assert_num_queries):
+    sender, reader, _ = members
+    rooms = [ChatRoom.objects.create(name=f'Extra {i}', slug=f'extra-{i}', type='public') for i in range(5)]
+    for extra in rooms:
+        UserPresence.objects.create(user=reader, room=extra)
+        ChatMessage.objects.create(room=extra, user=sender, content='ping')
+
+    with django_assert_num_queries(1):
+        counts = unread_counts(reader)
+    assert counts == {extra.id: 1 for extra in rooms}
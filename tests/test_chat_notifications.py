@@ -0,0 +1,62 @@
+"""
+Tests for the set-based notification fan-out behind the ChatMessage
+post_save signal (chat/notifications.py), inline and deferred.
+"""
+import pytest
+
+from chat.models import ChatMessage, ChatNotification, ChatRoom, UserPresence
+from chat.notifications import wait_for_deferred
+from users.models import User
+
+
+def make_users(n, prefix='user'):
+    return [
+        User.objects.create_user(email=f'{prefix}{i}@example.com', username=f'{prefix}{i}', password='x-not-real')
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def public_room(transactional_db):
+    room = ChatRoom.objects.create(name='Public', slug='public', type='public')
+    for user in make_users(4):
+        UserPresence.objects.create(user=user, room=room)
+    return room
+
+
+def test_public_room_notifies_joined_users_except_sender(public_room):
+    sender = public_room.presence.first().user
+    message = ChatMessage.objects.create(room=public_room, user=sender, content='hi')
+
+    recipients = set(ChatNotification.objects.filter(message=message).values_list('user__username', flat=True))
+    assert recipients == {'user1', 'user2', 'user3'}
+
+
+def test_private_room_notifies_participants_except_sender(transactional_db):
+    alice, bob, carol = make_users(3, prefix='dm')
+    room = ChatRoom.objects.create(name='DM', slug='dm', type='private')
+    room.participants.add(alice, bob)
+
+    message = ChatMessage.objects.create(room=room, user=alice, content='psst')
+
+    notified = list(ChatNotification.objects.filter(message=message).values_list('user', flat=True))
+    assert notified == [bob.id]
+
+
+def test_fan_out_is_one_statement(public_room, django_assert_num_queries):
+    sender = public_room.presence.first().user
+    # One INSERT for the message, one INSERT ... SELECT for the notifications
+    # and one upsert for the unread counters, regardless of room size.
+    with django_assert_num_queries(3):
+        ChatMessage.objects.create(room=public_room, user=sender, content='hi')
+
+
+def test_deferred_mode_fans_out_after_commit(public_room, settings, django_assert_num_queries):
+    settings.CHAT_NOTIFICATIONS_DEFERRED = True
+    sender = public_room.presence.first().user
+
+    with django_assert_num_queries(1):
+        message = ChatMessage.objects.create(room=public_room, user=sender, content='later')
+    wait_for_deferred()
+
+    assert ChatNotification.objects.filter(message=message).count() == 3
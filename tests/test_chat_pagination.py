@@ -0,0 +1,127 @@
+"""
+Tests for keyset pagination of chat history (chat/pagination.py): stable
+ordering when timestamps collide, forward/backward paging, the JSON views
+and the WebSocket history frames.
+"""
+import json
+from datetime import timedelta
+
+import pytest
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.test import RequestFactory
+from django.utils import timezone
+
+from chat import views
+from chat.models import ChatMessage
+from chat.pagination import InvalidCursor, decode_cursor, encode_cursor, paginate_messages
+from chat.routing import websocket_urlpatterns
+from users.models import User
+
+
+@pytest.fixture
+def author(transactional_db):
+    return User.objects.create_user(email='author@example.com', username='author', password='x-not-real')
+
+
+@pytest.fixture
+def messages(room, author):
+    """Ten messages where pairs share a timestamp."""
+    start = timezone.now() - timedelta(hours=1)
+    return [
+        ChatMessage.objects.create(
+            room=room, user=author, content=f'msg {n}', timestamp=start + timedelta(seconds=n // 2)
+        )
+        for n in range(10)
+    ]
+
+
+def walk_back(queryset, limit):
+    pages, before = [], None
+    while True:
+        page = paginate_messages(queryset, before=before, limit=limit)
+        pages.append([m.content for m in page.messages])
+        if not page.has_more:
+            return pages
+        before = page.before
+
+
+def test_cursor_round_trip(messages):
+    message = messages[3]
+    assert decode_cursor(encode_cursor(message, 'timestamp')) == (message.timestamp, message.id)
+
+
+def test_garbage_cursor_is_rejected(room):
+    with pytest.raises(InvalidCursor):
+        paginate_messages(room.messages.all(), before='not-a-cursor')
+
+
+def test_backward_paging_visits_every_message_once(room, messages):
+    pages = walk_back(room.messages.all(), limit=3)
+
+    # Pages are oldest-first internally and walk from newest to oldest.
+    flattened = [content for page in reversed(pages) for content in page]
+    assert flattened == [m.content for m in messages]
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+
+
+def test_forward_paging_from_older_cursor(room, messages):
+    page = paginate_messages(room.messages.all(), after=encode_cursor(messages[4], 'timestamp'), limit=3)
+
+    assert [m.id for m in page.messages] == [m.id for m in messages[5:8]]
+    assert page.has_more
+    rest = paginate_messages(room.messages.all(), after=page.after, limit=3)
+    assert [m.id for m in rest.messages] == [m.id for m in messages[8:]]
+    assert not rest.has_more
+
+
+def test_page_is_one_query(room, messages, django_assert_num_queries):
+    before = encode_cursor(messages[6], 'timestamp')
+    with django_assert_num_queries(1):
+        paginate_messages(room.messages.all(), before=before, limit=3)
+
+
+def test_api_messages_returns_cursors(room, messages, author):
+    request = RequestFactory().get(f'/chat/api/messages/{room.slug}/', {'limit': 4})
+    request.user = author
+    data = json.loads(views.api_messages(request, room.slug).content)
+
+    assert [m['content'] for m in data['messages']] == [m.content for m in messages[6:]]
+    assert data['has_more']
+
+    request = RequestFactory().get(f'/chat/api/messages/{room.slug}/', {'limit': 4, 'before': data['before']})
+    request.user = author
+    older = json.loads(views.api_messages(request, room.slug).content)
+    assert [m['content'] for m in older['messages']] == [m.content for m in messages[2:6]]
+
+
+def test_legacy_before_id_still_works(room, messages, author):
+    request = RequestFactory().get(f'/chat/{room.slug}/messages/', {'before_id': messages[5].id, 'limit': 2})
+    request.user = author
+    data = json.loads(views.room_messages(request, room.slug).content)
+
+    assert [m['id'] for m in data['messages']] == [messages[3].id, messages[4].id]
+
+
+def test_invalid_cursor_is_a_bad_request(room, author):
+    request = RequestFactory().get(f'/chat/api/messages/{room.slug}/', {'before': '!!!'})
+    request.user = author
+    assert views.api_messages(request, room.slug).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_websocket_pages_back_through_history(room, messages, author):
+    communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f'/ws/chat/{room.slug}/')
+    communicator.scope['user'] = author
+    connected, _ = await communicator.connect()
+    assert connected
+    frames = {frame['type']: frame for frame in [await communicator.receive_json_from() for _ in range(2)]}
+    history = frames['history']
+    assert not history['has_more']
+
+    await communicator.send_json_to({'type': 'history', 'before': encode_cursor(messages[4], 'timestamp'), 'limit': 3})
+    page = await communicator.receive_json_from()
+    assert page['type'] == 'history_page'
+    assert [m['message_id'] for m in page['messages']] == [m.id for m in messages[1:4]]
+    assert page['has_more']
+    await communicator.disconnect()
@@ -0,0 +1,182 @@
+"""
+Tests for the write-behind chat persistence pipeline (chat/pipeline.py):
+id reservation, batched message + notification writes, idempotent retries,
+and the consumer's broadcast-before-persist path.
+"""
+import asyncio
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.db import DatabaseError
+
+from chat.consumers import ChatConsumer
+from chat.models import ChatMessage, ChatNotification, UserPresence
+from chat.pipeline import MessagePipeline, message_pipeline, reserve_message_ids
+from chat.routing import websocket_urlpatterns
+from users.models import User
+
+
+@pytest.fixture
+def members(room):
+    users = [
+        User.objects.create_user(email=f'member{i}@example.com', username=f'member{i}', password='x-not-real')
+        for i in range(3)
+    ]
+    for user in users:
+        UserPresence.objects.create(user=user, room=room)
+    return users
+
+
+def test_reserved_ids_are_never_reused(room, members):
+    ids = reserve_message_ids(5)
+    assert ids == list(range(ids[0], ids[0] + 5))
+
+    message = ChatMessage.objects.create(room=room, user=members[0], content='inline')
+    assert message.id > ids[-1]
+
+
+@pytest.mark.asyncio
+async def test_batch_writes_messages_and_notifications(room, members):
+    pipeline = MessagePipeline(interval=60)
+    sender = members[0]
+    for n in range(3):
+        message = await pipeline.build(room=room, user=sender, content=f'hello {n}')
+        await pipeline.submit(message)
+
+    assert await sync_to_async(ChatMessage.objects.count)() == 0
+    await pipeline.drain()
+
+    assert await sync_to_async(ChatMessage.objects.count)() == 3
+    # Two other members, three messages.
+    assert await sync_to_async(ChatNotification.objects.count)() == 6
+
+
+@pytest.mark.asyncio
+async def test_flushes_after_interval(room, members):
+    pipeline = MessagePipeline(interval=0.01)
+    message = await pipeline.build(room=room, user=members[0], content='soon')
+    await pipeline.submit(message)
+
+    for _ in range(100):
+        if await sync_to_async(ChatMessage.objects.filter(id=message.id).exists)():
+            break
+        await asyncio.sleep(0.01)
+    else:
+        pytest.fail("message was never flushed")
+    await pipeline.drain()
+
+
+@pytest.mark.asyncio
+async def test_resubmitted_message_is_written_once(room, members):
+    pipeline = MessagePipeline(interval=60)
+    message = await pipeline.build(room=room, user=members[0], content='twice')
+    await pipeline.submit(message)
+    await pipeline.flush()
+    await pipeline.submit(message)
+    await pipeline.drain()
+
+    assert await sync_to_async(ChatMessage.objects.filter(id=message.id).count)() == 1
+
+
+@pytest.mark.asyncio
+async def test_pending_messages_visible_before_flush(room, members):
+    pipeline = MessagePipeline(interval=60)
+    message = await pipeline.build(room=room, user=members[0], content='buffered')
+    await pipeline.submit(message)
+
+    assert pipeline.pending_for_room(room.id) == [message]
+    await pipeline.drain()
+    assert pipeline.pending_for_room(room.id) == []
+
+
+@pytest.mark.asyncio
+async def test_consumer_broadcasts_before_persisting(room, members):
+    communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f'/ws/chat/{room.slug}/')
+    communicator.scope['user'] = members[0]
+    connected, _ = await communicator.connect()
+    assert connected
+    await communicator.receive_json_from()  # presence
+    await communicator.receive_json_from()  # history
+
+    await communicator.send_json_to({'type': 'message', 'content': 'hi all'})
+    event = await communicator.receive_json_from()
+    assert event['type'] == 'message'
+    assert event['content'] == 'hi all'
+
+    await message_pipeline.drain()
+    saved = await sync_to_async(ChatMessage.objects.get)(id=event['message_id'])
+    assert saved.content == 'hi all'
+    await communicator.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_retry_backoff_does_not_hold_the_db_thread(room, members, monkeypatch):
+    pipeline = MessagePipeline(interval=60, retries=2)
+    message = await pipeline.build(room=room, user=members[0], content='retried')
+    await pipeline.submit(message)
+
+    write_batch = pipeline._write_batch
+    failures = [DatabaseError("deadlock")]
+
+    def flaky(batch):
+        if failures:
+            raise failures.pop()
+        write_batch(batch)
+
+    monkeypatch.setattr(pipeline, '_write_batch', flaky)
+    monkeypatch.setattr(MessagePipeline, '_backoff', staticmethod(lambda attempt: 0.5))
+
+    flush = asyncio.ensure_future(pipeline.flush())
+    await asyncio.sleep(0.05)
+    # The flush is backing off; other ORM calls on the DB thread still run.
+    count = await asyncio.wait_for(database_sync_to_async(ChatMessage.objects.count)(), 0.3)
+    assert count == 0
+
+    await flush
+    assert await sync_to_async(ChatMessage.objects.filter(id=message.id).exists)()
+
+
+@pytest.mark.asyncio
+async def test_history_merges_buffered_messages_in_time_order(room, members, monkeypatch):
+    # This worker's message is still buffered; another worker's later one
+    # (from a higher id block) is already saved.
+    saved = await sync_to_async(ChatMessage.objects.create)(room=room, user=members[1], content='second', id=500)
+    buffered = ChatMessage(
+        id=400, room=room, user=members[0], content='first',
+        timestamp=saved.timestamp - timedelta(seconds=1),
+    )
+    monkeypatch.setattr(message_pipeline, 'pending_for_room', lambda room_id: [buffered])
+    consumer = ChatConsumer()
+    consumer.room = room
+
+    history, _ = await consumer.get_chat_history(limit=1)
+    assert [m['content'] for m in history] == ['second']
+    history, _ = await consumer.get_chat_history(limit=10)
+    assert [m['content'] for m in history] == ['first', 'second']
+
+
+@pytest.mark.asyncio
+async def test_history_cursor_reaches_rows_pushed_out_by_buffered_ones(room, members, monkeypatch):
+    saved = await sync_to_async(lambda: [
+        ChatMessage.objects.create(room=room, user=members[1], content=f'saved {n}') for n in range(5)
+    ])()
+    later = saved[-1].timestamp + timedelta(seconds=1)
+    buffered = [
+        ChatMessage(id=10_000 + n, room=room, user=members[0], content=f'buffered {n}', timestamp=later + timedelta(seconds=n))
+        for n in range(2)
+    ]
+    monkeypatch.setattr(message_pipeline, 'pending_for_room', lambda room_id: buffered)
+    consumer = ChatConsumer()
+    consumer.room = room
+
+    latest, page = await consumer.get_chat_history(limit=5)
+    assert [m['content'] for m in latest] == ['saved 2', 'saved 3', 'saved 4', 'buffered 0', 'buffered 1']
+    assert page.has_more
+
+    older, page = await consumer.get_chat_history(limit=5, before=page.before)
+    assert [m['content'] for m in older] == ['saved 0', 'saved 1']
+    assert not page.has_more
@@ -0,0 +1,91 @@
+"""
+Tests for the chat presence service (chat/presence.py): multi-connection
+users, TTL expiry, checkpointing to UserPresence and the consumer wiring.
+"""
+import time
+
+import pytest
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+
+from chat.models import UserPresence
+from chat.presence import InMemoryPresenceBackend, PresenceService, presence
+from chat.routing import websocket_urlpatterns
+from users.models import User
+
+
+@pytest.fixture
+def user(transactional_db):
+    return User.objects.create_user(email='here@example.com', username='here')
+
+
+@pytest.fixture
+def service():
+    return PresenceService(backend=InMemoryPresenceBackend())
+
+
+def test_user_stays_online_until_last_connection_closes(service, room, user):
+    assert service.connect(user, room, 'tab-1')
+    assert not service.connect(user, room, 'tab-2')
+
+    assert not service.disconnect(user, room, 'tab-1')
+    assert [row['username'] for row in service.online_users(room)] == ['here']
+
+    assert service.disconnect(user, room, 'tab-2')
+    assert service.online_users(room) == []
+
+
+def test_entries_expire_without_heartbeats(service, room, user, settings):
+    settings.CHAT_PRESENCE_TTL = 0.05
+    service.connect(user, room, 'tab')
+    assert service.online_counts([room]) == {room.id: 1}
+
+    time.sleep(0.1)
+    assert service.online_counts([room]) == {room.id: 0}
+    # A heartbeat after expiry counts as coming back online.
+    assert service.heartbeat(user, room, 'tab')
+
+
+def test_connect_creates_membership_once(service, room, user, django_assert_num_queries):
+    service.connect(user, room, 'tab-1')
+    assert UserPresence.objects.filter(user=user, room=room).count() == 1
+
+    with django_assert_num_queries(0):
+        service.disconnect(user, room, 'tab-1')
+        service.connect(user, room, 'tab-2')
+
+
+def test_checkpoint_writes_live_state(service, room, user):
+    other = User.objects.create_user(email='gone@example.com', username='gone')
+    service.connect(user, room, 'a')
+    service.connect(other, room, 'b')
+    service.disconnect(other, room, 'b')
+
+    assert service.checkpoint() == 1
+
+    room.refresh_from_db()
+    assert room.online_count == 1
+    online = dict(UserPresence.objects.filter(room=room).values_list('user__username', 'is_online'))
+    assert online == {'here': True, 'gone': False}
+
+
+def test_checkpoint_clears_rooms_nobody_touched(service, room, user):
+    UserPresence.objects.create(user=user, room=room, is_online=True)
+
+    service.checkpoint()
+
+    assert not UserPresence.objects.get(user=user, room=room).is_online
+
+
+@pytest.mark.asyncio
+async def test_consumer_registers_and_drops_presence(room, user):
+    communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f'/ws/chat/{room.slug}/')
+    communicator.scope['user'] = user
+    connected, _ = await communicator.connect()
+    assert connected
+    frames = {frame['type']: frame for frame in [await communicator.receive_json_from() for _ in range(2)]}
+    assert frames['presence']['is_online']
+    assert [u['username'] for u in frames['history']['online_users']] == ['here']
+
+    await communicator.disconnect()
+    assert presence.online_users(room) == []
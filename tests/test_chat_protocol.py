@@ -0,0 +1,107 @@
+"""
+Tests for the ChatConsumer wire protocol (chat/protocol.py): encode-once
+broadcasts and the negotiated compact / msgpack formats.
+"""
+import json
+
+import msgpack
+import pytest
+from asgiref.sync import sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+
+from chat import protocol
+from chat.routing import websocket_urlpatterns
+from users.models import User
+
+
+@pytest.fixture(autouse=True)
+def commit_before_broadcast(settings):
+    settings.CHAT_WRITE_BEHIND = False
+
+
+async def join(room, username, subprotocols=None):
+    user = await sync_to_async(User.objects.create_user)(email=f'{username}@example.com', username=username)
+    communicator = WebsocketCommunicator(
+        URLRouter(websocket_urlpatterns), f'/ws/chat/{room.slug}/', subprotocols=subprotocols,
+    )
+    communicator.scope['user'] = user
+    connected, subprotocol = await communicator.connect()
+    assert connected
+    return communicator, subprotocol
+
+
+async def drain(communicator):
+    while not await communicator.receive_nothing(timeout=0.05):
+        await communicator.receive_from()
+
+
+def test_compact_encoding_uses_schema_order():
+    payload = {'type': 'presence', 'user_id': 7, 'username': 'ada', 'is_online': True, 'timestamp': 'now'}
+    expected = [protocol.TYPE_CODES['presence'], 7, 'ada', True, 'now']
+
+    assert json.loads(protocol.encode(payload, protocol.COMPACT)) == expected
+    assert msgpack.unpackb(protocol.encode(payload, protocol.MSGPACK)) == expected
+    assert json.loads(protocol.encode(payload)) == payload
+
+
+def test_negotiation_falls_back_to_json():
+    assert protocol.negotiate(['chat.msgpack.v1']) == (protocol.MSGPACK, 'chat.msgpack.v1')
+    assert protocol.negotiate(['something-else']) == (protocol.JSON, None)
+    assert protocol.negotiate(None) == (protocol.JSON, None)
+
+
+@pytest.mark.asyncio
+async def test_broadcast_is_encoded_once_per_format(room, monkeypatch):
+    members = [await join(room, f'reader{n}') for n in range(3)]
+    sender, _ = members[0]
+    for communicator, _ in members:
+        await drain(communicator)
+
+    calls = []
+    real_encode = protocol.encode
+
+    def counting_encode(payload, wire_format=protocol.JSON):
+        calls.append(wire_format)
+        return real_encode(payload, wire_format)
+
+    monkeypatch.setattr(protocol, 'encode', counting_encode)
+
+    await sender.send_json_to({'type': 'message', 'content': 'once'})
+    for communicator, _ in members:
+        event = await communicator.receive_json_from()
+        assert event['content'] == 'once'
+
+    assert sorted(calls) == sorted(protocol.available_formats())
+    for communicator, _ in members:
+        await communicator.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_compact_client_gets_schema_and_arrays(room):
+    communicator, subprotocol = await join(room, 'compact', ['chat.compact.v1'])
+    assert subprotocol == 'chat.compact.v1'
+
+    schema = await communicator.receive_json_from()
+    assert schema['type'] == 'schema'
+    await drain(communicator)
+
+    await communicator.send_json_to({'type': 'message', 'content': 'tight'})
+    frame = await communicator.receive_json_from()
+    code, fields = protocol.TYPE_CODES['message'], protocol.SCHEMAS['message']
+    assert frame[0] == code
+    assert dict(zip(fields, frame[1:]))['content'] == 'tight'
+    await communicator.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_msgpack_client_round_trip(room):
+    communicator, subprotocol = await join(room, 'packed', ['chat.msgpack.v1'])
+    assert subprotocol == 'chat.msgpack.v1'
+    await drain(communicator)
+
+    await communicator.send_to(bytes_data=msgpack.packb({'type': 'message', 'content': 'binary'}))
+    frame = msgpack.unpackb(await communicator.receive_from())
+    assert frame[0] == protocol.TYPE_CODES['message']
+    assert 'binary' in frame
+    await communicator.disconnect()
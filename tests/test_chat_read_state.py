@@ -0,0 +1,143 @@
+"""
+Tests for per-(user, room) read watermarks (chat/counters.py) and their
+coalesced broadcast from ChatConsumer.
+"""
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+
+from chat.counters import (
+    advance_read_watermark, mark_notifications_read, mark_room_read, total_unread, unread_notifications,
+)
+from chat.models import ChatMessage, ChatNotification, ChatUnreadCounter, UserPresence
+from chat.notifications import create_notifications
+from chat.routing import websocket_urlpatterns
+from django.utils import timezone
+from users.models import User
+
+
+@pytest.fixture
+def sender(room):
+    return User.objects.create_user(email='sender@example.com', username='sender')
+
+
+@pytest.fixture
+def reader(room):
+    user = User.objects.create_user(email='reader@example.com', username='reader')
+    UserPresence.objects.create(user=user, room=room)
+    return user
+
+
+@pytest.fixture
+def messages(room, sender, reader):
+    return [ChatMessage.objects.create(room=room, user=sender, content=f'msg {n}') for n in range(5)]
+
+
+def read_up_to(reader, room, message):
+    return advance_read_watermark(reader.id, room.id, message.timestamp, message.id)
+
+
+def test_watermark_recomputes_unread_in_one_statement(room, reader, messages, django_assert_num_queries):
+    assert total_unread(reader) == 5
+
+    with django_assert_num_queries(1):
+        assert read_up_to(reader, room, messages[2])
+
+    assert total_unread(reader) == 2
+    assert sorted(n.message_id for n in unread_notifications(reader)) == [m.id for m in messages[3:]]
+
+
+def test_watermark_never_moves_backwards(room, reader, messages):
+    read_up_to(reader, room, messages[3])
+
+    assert not read_up_to(reader, room, messages[1])
+    counter = ChatUnreadCounter.objects.get(user=reader, room=room)
+    assert counter.last_read_message_id == messages[3].id
+    assert counter.count == 1
+
+
+def test_new_messages_after_watermark_are_unread(room, sender, reader, messages):
+    read_up_to(reader, room, messages[-1])
+    ChatMessage.objects.create(room=room, user=sender, content='fresh')
+
+    assert total_unread(reader) == 1
+
+
+def test_watermark_follows_time_not_id_across_id_blocks(room, sender, reader):
+    # Two workers with their own id blocks: worker B's message is written
+    # first, then worker A's, with a lower id, a moment later.
+    now = timezone.now()
+    first = ChatMessage.objects.create(id=1001, room=room, user=sender, content='block B', timestamp=now)
+    later = ChatMessage.objects.create(id=2, room=room, user=sender, content='block A', timestamp=now + timedelta(seconds=1))
+
+    assert read_up_to(reader, room, first)
+
+    assert total_unread(reader) == 1
+    assert [n.message_id for n in unread_notifications(reader)] == [later.id]
+    assert not read_up_to(reader, room, ChatMessage(id=1500, timestamp=now - timedelta(seconds=1)))
+
+
+def test_late_flushed_messages_below_watermark_stay_read(room, sender, reader):
+    now = timezone.now()
+    seen = ChatMessage.objects.create(id=10, room=room, user=sender, content='seen', timestamp=now)
+    read_up_to(reader, room, seen)
+
+    # Written after the reader moved on, but sent before what they read.
+    straggler = ChatMessage(id=1010, room=room, user=sender, content='late', timestamp=now - timedelta(seconds=1))
+    ChatMessage.objects.bulk_create([straggler])
+    create_notifications([straggler])
+
+    assert total_unread(reader) == 0
+    assert list(unread_notifications(reader)) == []
+
+
+def test_mark_room_read_moves_watermark_to_latest(room, reader, messages):
+    mark_room_read(reader, room)
+
+    counter = ChatUnreadCounter.objects.get(user=reader, room=room)
+    assert counter.last_read_message_id == messages[-1].id
+    assert counter.count == 0
+
+
+def test_marking_notifications_below_watermark_read_keeps_the_count(room, reader, messages):
+    read_up_to(reader, room, messages[2])
+    notifications = {n.message_id: n.id for n in ChatNotification.objects.filter(user=reader)}
+
+    mark_notifications_read(reader, [notifications[messages[0].id], notifications[messages[1].id]])
+    assert total_unread(reader) == 2
+
+    mark_notifications_read(reader, [notifications[messages[2].id], notifications[messages[3].id]])
+    assert total_unread(reader) == 1
+    assert [n.message_id for n in unread_notifications(reader)] == [messages[4].id]
+
+
+@pytest.mark.asyncio
+async def test_read_frames_are_coalesced(room, reader, messages, settings):
+    settings.CHAT_READ_RECEIPT_TICK = 0.05
+    sender = await sync_to_async(User.objects.get)(username='sender')
+    communicators = []
+    for user in (sender, reader):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f'/ws/chat/{room.slug}/')
+        communicator.scope['user'] = user
+        assert (await communicator.connect())[0]
+        while not await communicator.receive_nothing(timeout=0.05):
+            await communicator.receive_from()
+        communicators.append(communicator)
+    watcher, reading = communicators
+
+    for message in messages:
+        await reading.send_json_to({'type': 'read', 'message_id': message.id})
+
+    frames = []
+    while not await watcher.receive_nothing(timeout=0.2):
+        frames.append(await watcher.receive_json_from())
+    reads = [frame for frame in frames if frame['type'] == 'read']
+    assert len(reads) == 1
+    assert reads[0]['watermarks'] == [[reader.id, 'reader', messages[-1].id]]
+    assert await sync_to_async(total_unread)(reader) == 0
+
+    for communicator in communicators:
+        await communicator.disconnect()
@@ -0,0 +1,89 @@
+"""
+Tests for the shared chat serialization layer (chat/serializers.py).
+
+Each history call site must cost a fixed number of queries per page no
+matter how many messages (or distinct authors) the page holds, so the
+query counts below are pinned for pages of 5 and 40 messages. Online
+lists come from the presence service and cost no queries at all.
+"""
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+
+from chat import views
+from chat.consumers import ChatConsumer
+from chat.models import ChatMessage
+from chat.presence import presence
+from chat.serializers import message_row, message_values, serialize_message
+from users.models import User
+
+
+def fill_room(room, count):
+    """`count` messages from `count` different authors, all online."""
+    authors = []
+    for n in range(count):
+        user = User.objects.create_user(email=f'serial{n}@example.com', username=f'serial{n}')
+        presence.connect(user, room, f'conn-{n}')
+        ChatMessage.objects.create(room=room, user=user, content=f'msg {n}')
+        authors.append(user)
+    return authors
+
+
+def test_row_and_instance_serialize_identically(room):
+    author, = fill_room(room, 1)
+    message = room.messages.get()
+
+    from_values = serialize_message(message_values(room.messages.all()).get())
+    assert from_values == serialize_message(message_row(message))
+    assert from_values['username'] == author.username
+
+
+@pytest.mark.parametrize('size', [5, 40])
+def test_api_messages_query_count(room, size, django_assert_num_queries):
+    authors = fill_room(room, size)
+    request = RequestFactory().get(f'/chat/api/messages/{room.slug}/', {'limit': 50})
+    request.user = authors[0]
+
+    # Room lookup, page of messages with authors.
+    with django_assert_num_queries(2):
+        response = views.api_messages(request, room.slug)
+    assert len(json.loads(response.content)['messages']) == size
+
+
+@pytest.mark.parametrize('size', [5, 40])
+def test_room_participants_query_count(room, size, django_assert_num_queries):
+    authors = fill_room(room, size)
+    request = RequestFactory().get(f'/chat/{room.slug}/participants/')
+    request.user = authors[0]
+
+    # Room lookup; online users come from the presence service.
+    with django_assert_num_queries(1):
+        response = views.room_participants(request, room.slug)
+    assert len(json.loads(response.content)['online_users']) == size
+
+
+@pytest.mark.parametrize('size', [5, 40])
+def test_consumer_history_query_count(room, size, django_assert_num_queries):
+    fill_room(room, size)
+    consumer = ChatConsumer()
+    consumer.room = room
+
+    # History page; online users come from the presence service.
+    with django_assert_num_queries(1):
+        history, _ = async_to_sync(consumer.get_chat_history)()
+        online = async_to_sync(consumer.get_online_users)()
+    assert len(history) == size
+    assert len(online) == size
+
+
+@pytest.mark.parametrize('size', [5, 40])
+def test_message_list_component_query_count(room, size, django_assert_num_queries):
+    from routes.chat import chat_message_list, online_users_list
+
+    fill_room(room, size)
+
+    with django_assert_num_queries(1):
+        chat_message_list(room)
+        online_users_list(room)
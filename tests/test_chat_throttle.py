@@ -0,0 +1,105 @@
+"""
+Tests for typing coalescing and inbound rate limiting (chat/throttle.py).
+"""
+import asyncio
+
+import pytest
+from asgiref.sync import sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+
+from chat.routing import websocket_urlpatterns
+from chat.throttle import FrameRateLimiter, TokenBucket
+from users.models import User
+
+
+@pytest.fixture(autouse=True)
+def fast_ticks(settings):
+    settings.CHAT_TYPING_TICK = 0.05
+    settings.CHAT_TYPING_DEBOUNCE = 0.2
+    settings.CHAT_TYPING_EXPIRY = 0.3
+
+
+async def join(room, username):
+    user = await sync_to_async(User.objects.create_user)(email=f'{username}@example.com', username=username)
+    communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f'/ws/chat/{room.slug}/')
+    communicator.scope['user'] = user
+    connected, _ = await communicator.connect()
+    assert connected
+    while not await communicator.receive_nothing(timeout=0.05):
+        await communicator.receive_from()
+    return communicator
+
+
+async def typing_frames(communicator, wait=0.3):
+    frames = []
+    while not await communicator.receive_nothing(timeout=wait):
+        frame = await communicator.receive_json_from()
+        if frame['type'] == 'typing':
+            frames.append(frame)
+    return frames
+
+
+def test_token_bucket_allows_burst_then_throttles():
+    bucket = TokenBucket(rate=1, burst=3)
+    assert [bucket.allow() for _ in range(4)] == [True, True, True, False]
+
+
+def test_unknown_frame_types_share_default_bucket():
+    limiter = FrameRateLimiter({'message': (1, 1), '*': (1, 2)})
+    assert limiter.allow('message')
+    assert not limiter.allow('message')
+    assert limiter.allow('bogus') and limiter.allow('other')
+    assert not limiter.allow('bogus')
+
+
+@pytest.mark.asyncio
+async def test_keystroke_bursts_become_few_snapshots(room):
+    watcher = await join(room, 'watcher')
+    typists = [await join(room, f'typist{n}') for n in range(3)]
+
+    for _ in range(10):
+        for typist in typists:
+            await typist.send_json_to({'type': 'typing', 'is_typing': True})
+
+    frames = await typing_frames(watcher, wait=0.5)
+    # 30 frames in; a handful of snapshots out (everyone typing, then the
+    # expiry once they go quiet).
+    assert 2 <= len(frames) <= 4
+    fullest = max(frames, key=lambda frame: len(frame['users']))
+    assert sorted(name for _, name in fullest['users']) == ['typist0', 'typist1', 'typist2']
+    assert frames[-1]['users'] == []
+
+    for communicator in [watcher, *typists]:
+        await communicator.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_silent_typist_expires(room):
+    watcher = await join(room, 'watcher')
+    typist = await join(room, 'typist')
+
+    await typist.send_json_to({'type': 'typing', 'is_typing': True})
+    frames = await typing_frames(watcher, wait=0.6)
+
+    assert frames[0]['users'] == [[frames[0]['users'][0][0], 'typist']]
+    assert frames[-1]['users'] == []
+    await watcher.disconnect()
+    await typist.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_message_flood_is_rate_limited(room, settings):
+    settings.CHAT_RATE_LIMITS = {'message': (0.01, 2), '*': (5, 20)}
+    settings.CHAT_WRITE_BEHIND = False
+    sender = await join(room, 'flooder')
+
+    for n in range(4):
+        await sender.send_json_to({'type': 'message', 'content': f'spam {n}'})
+
+    frames = []
+    while not await sender.receive_nothing(timeout=0.2):
+        frames.append(await sender.receive_json_from())
+    assert [f['content'] for f in frames if f['type'] == 'message'] == ['spam 0', 'spam 1']
+    assert sum(f['type'] == 'error' for f in frames) == 2
+    await sender.disconnect()
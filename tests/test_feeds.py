@@ -0,0 +1,152 @@
+"""
+Tests for the blog's RSS/Atom/JSON feeds (users/feeds.py): document
+contents, conditional GET with ETag / Last-Modified, and cache
+invalidation when posts change.
+"""
+import json
+from xml.etree import ElementTree
+
+import pytest
+from django.utils.http import http_date
+from starlette.testclient import TestClient
+
+import main
+from app import app
+from users import feeds
+from users.models import BlogPost, Tag, User
+from utils.conditional import is_not_modified
+
+client = TestClient(app)
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+
+
+@pytest.fixture
+def blog(transactional_db, settings):
+    settings.SITE_URL = 'https://blog.example'
+    ada = User.objects.create_user(email='ada@example.com', username='ada', first_name='Ada', last_name='L')
+    bob = User.objects.create_user(email='bob@example.com', username='bob')
+    python = Tag.objects.create(name='python')
+    first = BlogPost.objects.create(author=ada, title='First', content='**bold** move', is_published=True)
+    second = BlogPost.objects.create(author=bob, title='Second', content='hello', is_published=True)
+    first.tags.add(python)
+    BlogPost.objects.create(author=ada, title='Secret draft', content='x')
+    return {'ada': ada, 'bob': bob, 'python': python, 'first': first, 'second': second}
+
+
+def rss_titles(text):
+    return [item.findtext('title') for item in ElementTree.fromstring(text).iter('item')]
+
+
+def test_rss_feed_lists_published_posts_newest_first(blog):
+    response = client.get('/blog/feed.xml')
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('application/rss+xml')
+    assert rss_titles(response.text) == ['Second', 'First']
+    assert '&lt;strong&gt;bold&lt;/strong&gt;' in response.text  # rendered markdown, escaped
+    assert 'https://blog.example/blog/ada/first' in response.text
+
+
+def test_atom_and_json_formats(blog):
+    atom = client.get('/blog/feed.atom')
+    entries = ElementTree.fromstring(atom.text).iter(f'{ATOM_NS}entry')
+    assert [entry.findtext(f'{ATOM_NS}title') for entry in entries] == ['Second', 'First']
+
+    document = client.get('/blog/feed.json').json()
+    assert document['version'] == 'https://jsonfeed.org/version/1.1'
+    assert [item['title'] for item in document['items']] == ['Second', 'First']
+    assert document['items'][1]['authors'][0]['name'] == 'Ada L'
+    assert document['items'][1]['tags'] == ['python']
+
+
+def test_tag_and_author_feeds(blog):
+    assert rss_titles(client.get('/blog/tag/python/feed.xml').text) == ['First']
+    assert rss_titles(client.get('/blog/author/bob/feed.xml').text) == ['Second']
+    assert client.get('/blog/tag/nope/feed.xml').status_code == 404
+    assert client.get('/blog/author/nobody/feed.xml').status_code == 404
+    assert client.get('/blog/feed.html').status_code == 404
+
+
+def test_validators_and_304(blog):
+    response = client.get('/blog/feed.xml')
+    etag = response.headers['etag']
+    second = BlogPost.objects.get(pk=blog['second'].pk)
+
+    assert response.headers['last-modified'] == http_date(second.updated_at.timestamp())
+    assert 'max-age=300' in response.headers['cache-control']
+
+    not_modified = client.get('/blog/feed.xml', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b''
+    assert not_modified.headers['etag'] == etag
+
+    since = client.get('/blog/feed.xml', headers={'If-Modified-Since': response.headers['last-modified']})
+    assert since.status_code == 304
+
+
+def test_cached_feed_answers_without_queries(blog, django_assert_num_queries):
+    feeds.get_feed('xml')
+    with django_assert_num_queries(0):
+        feeds.get_feed('xml')
+
+
+def test_host_header_does_not_reach_urls_or_cache_key(blog, monkeypatch):
+    builds = []
+    build_feed = feeds.build_feed
+    monkeypatch.setattr(feeds, 'build_feed', lambda *args: builds.append(args) or build_feed(*args))
+    expected = client.get('/blog/feed.xml').text
+
+    forged = client.get('/blog/feed.xml', headers={'Host': 'attacker.example'})
+
+    assert len(builds) == 1
+    assert forged.text == expected
+    assert 'attacker.example' not in forged.text
+
+
+def test_publishing_changes_the_feed(blog):
+    etag = client.get('/blog/feed.xml').headers['etag']
+    draft = BlogPost.objects.get(title='Secret draft')
+    draft.is_published = True
+    draft.save()
+
+    response = client.get('/blog/feed.xml', headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert rss_titles(response.text)[0] == 'Secret draft'
+    assert response.headers['etag'] != etag
+
+
+def test_tag_and_delete_changes_invalidate(blog):
+    assert rss_titles(client.get('/blog/tag/python/feed.xml').text) == ['First']
+    blog['python'].posts.add(blog['second'])
+    assert rss_titles(client.get('/blog/tag/python/feed.xml').text) == ['Second', 'First']
+    blog['second'].delete()
+    assert rss_titles(client.get('/blog/tag/python/feed.xml').text) == ['First']
+
+
+def test_login_does_not_invalidate_feeds(blog):
+    version = feeds._version()
+    blog['ada'].save(update_fields=['last_login'])
+    assert feeds._version() == version
+    blog['ada'].first_name = 'Augusta'
+    blog['ada'].save()
+    assert feeds._version() != version
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", "abc"', True),
+    ('*', True),
+    ('"xyz"', False),
+])
+def test_if_none_match_comparison(header, expected):
+    assert is_not_modified({'if-none-match': header}, '"abc"') is expected
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    last_modified = 'Wed, 21 Oct 2015 07:28:00 GMT'
+    headers = {'if-none-match': '"old"', 'if-modified-since': last_modified}
+    assert not is_not_modified(headers, '"new"', last_modified)
+    assert is_not_modified({'if-modified-since': last_modified}, '"new"', last_modified)
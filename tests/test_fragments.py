@@ -0,0 +1,88 @@
+"""
+Tests for pre-rendered static fragments (utils/fragments.py) and the pages
+that use them.
+"""
+import re
+
+import pytest
+from fasthtml.common import H1, Div, P, Script, Style, to_xml
+from starlette.testclient import TestClient
+
+import main
+from app import app
+from utils import fragments
+from utils.fragments import Static
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_fragments():
+    fragments.clear()
+    yield
+    fragments.clear()
+
+
+def tree():
+    return Div(P("constant"), Style(".a > .b { color: red; }"), Script("if (a < b) {}"))
+
+
+def squash(html):
+    return re.sub(r'\s+', ' ', re.sub(r'>\s+<', '><', html)).strip()
+
+
+def test_fragment_renders_like_the_tree_it_replaces():
+    spliced = to_xml(Div(H1("dynamic"), Static(lambda: tree())))
+
+    assert squash(spliced) == squash(to_xml(Div(H1("dynamic"), tree())))
+
+
+_builds = []
+
+
+def _page():
+    return Static(lambda: _builds.append(1) or Div("x"))
+
+
+def test_fragment_is_built_once_per_call_site():
+    _builds.clear()
+
+    first, second = _page(), _page()
+
+    assert first is second
+    assert _builds == [1]
+
+
+def test_fragments_that_close_over_locals_are_rejected():
+    name = "per-request"
+
+    with pytest.raises(TypeError, match="name"):
+        Static(lambda: Div(name))
+
+
+def test_tuples_render_as_siblings():
+    html = str(Static(lambda: (Div("a"), P("b"))))
+
+    assert html.index("<div>a</div>") < html.index("<p>b</p>")
+
+
+@pytest.mark.parametrize('path, text', [
+    ('/', 'Humans (mostly) Not Required'),
+    ('/about', 'Post-Human Coding Collective'),
+    ('/features', 'Platform Features'),
+    ('/community', 'Member Spotlight'),
+])
+def test_pages_keep_their_static_content(path, text):
+    first = client.get(path).text
+    fragments.clear()
+    second = client.get(path).text
+
+    assert text in first
+    assert first == second
+
+
+def test_about_page_keeps_its_technology_cards():
+    html = client.get('/about').text
+
+    assert html.count('class="technology-card"') == 3
+    assert 'animation-delay: 400ms' in html
@@ -6,6 +6,8 @@ from bs4 import BeautifulSoup
 import app
 import main
 from app import app as app_instance
+from routes.header import SiteHeader, _header_html
+from utils.assets import asset_url
 
 # Create test client AFTER importing main to ensure routes are registered
 client = TestClient(app_instance)
@@ -67,15 +69,49 @@ def test_mobile_menu_javascript():
     
     html_content = response.text
     
+    # The script is an external, hashed asset
+    script_url = asset_url("js/site-header.js")
+    assert f'src="{script_url}"' in html_content
+    script = client.get(script_url).text
+    
     # Test for the toggleMobileMenu function
-    assert "function toggleMobileMenu()" in html_content
-    assert "getElementById('mobileMenu')" in html_content or 'getElementById("mobileMenu")' in html_content
+    assert "function toggleMobileMenu()" in script
+    assert "getElementById('mobileMenu')" in script or 'getElementById("mobileMenu")' in script
     
     # Test for the click handler
     assert 'onclick="toggleMobileMenu()"' in html_content
     
     # Test for event listeners
-    assert "window.addEventListener" in html_content
+    assert "window.addEventListener" in script
+
+def test_header_styles_are_external():
+    html_content = client.get("/").text
+
+    assert f'href="{asset_url("css/site-header.css")}"' in html_content
+    assert ".siteHeader" not in html_content
+    assert ".siteHeader" in client.get(asset_url("css/site-header.css")).text
+
+def test_header_variants_are_rendered_once():
+    _header_html.cache_clear()
+
+    SiteHeader("/blog")
+    SiteHeader("/blog/")
+    SiteHeader({"path": "/blog", "auth": "ada"})
+
+    info = _header_html.cache_info()
+    assert (info.hits, info.misses) == (2, 1)
+
+def test_header_assets_load_in_head():
+    soup = BeautifulSoup(client.get("/").content, 'html.parser')
+
+    assert soup.head.find('link', href=asset_url("css/site-header.css")) is not None
+    assert soup.head.find('script', src=asset_url("js/site-header.js")) is not None
+    assert soup.find('header', class_='siteHeader').find(['link', 'script']) is None
+
+def test_unknown_path_has_no_active_link():
+    soup = BeautifulSoup(str(SiteHeader("/blog/some-post")), 'html.parser')
+
+    assert soup.find('a', class_="active") is None
 
 def test_different_paths():
     """Test that the header handles different paths correctly."""
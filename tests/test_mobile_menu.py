@@ -6,6 +6,7 @@ from bs4 import BeautifulSoup
 import app
 import main
 from app import app as app_instance
+from utils.assets import asset_url
 
 # Create test client
 client = TestClient(app_instance)
@@ -37,7 +38,8 @@ def test_mobile_menu_js_functions():
     response = client.get("/")
     assert response.status_code == 200
     
-    html_content = response.text
+    # The functions live in the header's external script
+    html_content = client.get(asset_url("js/site-header.js")).text
     
     # Check toggleMobileMenu function exists
     assert "function toggleMobileMenu()" in html_content
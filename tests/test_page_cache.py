@@ -0,0 +1,142 @@
+"""
+Tests for the rendered-page cache in front of the public FastHTML pages
+(page_cache.py): ETag / 304, Cache-Control per variant, cookie hygiene,
+bypasses and purge().
+"""
+import json
+from base64 import b64encode
+
+import itsdangerous
+import pytest
+from django.core.cache import cache
+from starlette.testclient import TestClient
+
+import app as app_module
+import main
+import page_cache
+from app import app
+from users.models import User
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def logged_in(transactional_db):
+    client = TestClient(app)
+    User.objects.create_user(email='cached@example.com', username='cached', password='SecurePass123!')
+    client.post('/login', data={'email': 'cached@example.com', 'password': 'SecurePass123!'})
+    return client
+
+
+def cached_page(path, variant=page_cache.ANONYMOUS):
+    return cache.get(page_cache.cache_key(path, variant))
+
+
+@pytest.mark.parametrize('path', page_cache.CACHED_PATHS)
+def test_public_pages_are_cached_with_validators(client, path):
+    response = client.get(path)
+
+    assert response.status_code == 200
+    assert response.headers['etag'] == cached_page(path)['etag']
+    assert response.headers['cache-control'] == 'public, max-age=60'
+    assert response.headers['vary'] == 'HX-Request, HX-History-Restore-Request, Cookie'
+
+
+def test_hit_serves_the_stored_body_without_running_the_route(client, monkeypatch):
+    first = client.get('/about')
+    monkeypatch.setattr(page_cache.PageCache, '_render', None)  # a miss would now raise
+
+    second = client.get('/about')
+
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.headers['etag'] == first.headers['etag']
+    assert int(second.headers['content-length']) == len(first.content)
+
+
+def test_matching_if_none_match_gets_304(client):
+    etag = client.get('/features').headers['etag']
+
+    response = client.get('/features', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.content == b''
+    assert response.headers['etag'] == etag
+    assert client.get('/features', headers={'If-None-Match': '"stale"'}).status_code == 200
+
+
+def test_cached_pages_leave_the_session_alone(client):
+    response = client.get('/community')
+
+    assert 'set-cookie' not in response.headers
+    assert response.headers['cache-control'] == 'public, max-age=60'
+
+
+def test_session_cookies_are_never_stored_or_shared(client):
+    config = app_module._session_config
+    signer = itsdangerous.TimestampSigner(str(config['secret_key']))
+    session = signer.sign(b64encode(json.dumps({'path': '/blog'}).encode())).decode()
+    client.cookies.set(config.get('session_cookie', 'session_'), session)
+
+    response = client.get('/community')
+
+    assert 'set-cookie' in response.headers  # the visitor's own session update
+    assert response.headers['cache-control'] == 'private, no-cache'
+    assert all(name.lower() != b'set-cookie' for name, _ in cached_page('/community')['headers'])
+
+
+def test_authenticated_visitors_get_their_own_private_variant(client, logged_in):
+    client.get('/')
+    response = logged_in.get('/')
+
+    assert response.headers['cache-control'] == 'private, no-cache'
+    assert cached_page('/', page_cache.AUTHENTICATED) is not None
+    assert cached_page('/', page_cache.ANONYMOUS) is not None
+
+
+def test_tampered_session_cookie_reads_as_anonymous(client):
+    client.cookies.set('session_', 'forged.value.here')
+
+    client.get('/about')
+
+    assert cached_page('/about') is not None
+
+
+def test_query_strings_and_pending_toasts_bypass_the_cache(client, monkeypatch):
+    client.get('/about?ref=newsletter')
+    assert cached_page('/about') is None
+
+    monkeypatch.setattr(app_module._pages, 'read_session', lambda scope: {'toasts': [('Saved', 'info', False)]})
+    response = client.get('/about')
+    assert 'etag' not in response.headers
+    assert cached_page('/about') is None
+
+
+def test_htmx_requests_are_cached_apart_from_full_pages(client):
+    full = client.get('/features')
+    partial = client.get('/features', headers={'HX-Request': 'true'})
+
+    assert partial.headers['etag'] != full.headers['etag']
+    assert cached_page('/features')['body'] == full.content
+
+
+def test_uncached_paths_pass_through(client):
+    response = client.get('/login')
+
+    assert response.status_code == 200
+    assert 'etag' not in response.headers
+
+
+def test_purge(client):
+    client.get('/')
+    client.get('/about')
+
+    page_cache.purge('/about')
+    assert cached_page('/about') is None
+    assert cached_page('/') is not None
+
+    page_cache.purge()
+    assert cached_page('/') is None
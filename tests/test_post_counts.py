@@ -0,0 +1,89 @@
+"""
+Tests for the published-post counters behind the blog sidebars
+(users/post_counts.py + the receivers in users/signals.py).
+"""
+import pytest
+
+from users.models import BlogPost, Tag, User
+
+
+@pytest.fixture
+def author(transactional_db):
+    return User.objects.create_user(email='counts@example.com', username='counts')
+
+
+@pytest.fixture
+def tags(transactional_db):
+    return [Tag.objects.create(name=name) for name in ('python', 'django', 'htmx')]
+
+
+def counts(*objs):
+    return [type(obj).objects.get(pk=obj.pk).published_post_count for obj in objs]
+
+
+def test_publish_unpublish_and_delete(author, tags):
+    python, django, _ = tags
+    post = BlogPost.objects.create(author=author, title='Draft', content='x')
+    post.tags.set([python, django])
+    assert counts(author, python, django) == [0, 0, 0]
+
+    post.is_published = True
+    post.save()
+    assert counts(author, python, django) == [1, 1, 1]
+
+    post.is_published = False
+    post.save()
+    assert counts(author, python, django) == [0, 0, 0]
+
+    post.is_published = True
+    post.save()
+    post.delete()
+    assert counts(author, python, django) == [0, 0, 0]
+
+
+def test_tag_changes_on_a_published_post(author, tags):
+    python, django, htmx = tags
+    post = BlogPost.objects.create(author=author, title='Live', content='x', is_published=True)
+    assert counts(author) == [1]
+
+    post.tags.set([python, django])
+    assert counts(python, django, htmx) == [1, 1, 0]
+
+    post.tags.set([django, htmx])
+    assert counts(python, django, htmx) == [0, 1, 1]
+
+    post.tags.clear()
+    assert counts(python, django, htmx) == [0, 0, 0]
+
+    htmx.posts.add(post)
+    assert counts(htmx) == [1]
+    htmx.posts.clear()
+    assert counts(htmx) == [0]
+
+
+def test_queryset_delete_recounts(author, tags):
+    python = tags[0]
+    for n in range(3):
+        BlogPost.objects.create(author=author, title=f'P{n}', content='x', is_published=True).tags.add(python)
+    assert counts(author, python) == [3, 3]
+
+    BlogPost.objects.filter(title__in=['P0', 'P1']).delete()
+    assert counts(author, python) == [1, 1]
+
+
+def test_sidebars_read_counters_in_one_query_each(author, tags, django_assert_num_queries):
+    from fasthtml.common import to_xml
+
+    from routes.blog import popular_authors_sidebar, trending_topics_sidebar
+
+    for n, tag in enumerate(tags):
+        for i in range(n + 1):
+            BlogPost.objects.create(author=author, title=f'{tag.name}{i}', content='x', is_published=True).tags.add(tag)
+
+    with django_assert_num_queries(2):
+        topics = trending_topics_sidebar()
+        authors = popular_authors_sidebar()
+
+    html = to_xml(topics) + to_xml(authors)
+    assert html.index('htmx') < html.index('django') < html.index('python')
+    assert '6 posts' in html
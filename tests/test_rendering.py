@@ -0,0 +1,142 @@
+"""
+Tests for the shared markdown rendering service (utils/rendering.py):
+the LRU and cache layers, invalidation, and off-loop rendering of large
+documents.
+"""
+import asyncio
+import threading
+
+import pytest
+from django.core.cache import cache
+
+from utils import rendering
+
+CODE_POST = "# Title\n\n```python\nprint('hi')\n```\n"
+
+
+@pytest.fixture(autouse=True)
+def _fresh_memo():
+    rendering.clear_memo()
+    yield
+    rendering.clear_memo()
+
+
+@pytest.fixture
+def render_calls(monkeypatch):
+    calls = []
+    real = rendering.render_markdown
+
+    def counting_render(content):
+        calls.append(content)
+        return real(content)
+
+    monkeypatch.setattr(rendering, "render_markdown", counting_render)
+    return calls
+
+
+def test_render_renders_each_body_once(render_calls):
+    first = rendering.render(CODE_POST)
+    second = rendering.render(CODE_POST)
+
+    assert first == second
+    assert "<pre>" in first
+    assert render_calls == [CODE_POST]
+
+
+def test_lru_miss_falls_back_to_shared_cache(render_calls):
+    rendering.render(CODE_POST)
+    rendering.clear_memo()  # as if another worker served the next view
+
+    rendering.render(CODE_POST)
+    assert render_calls == [CODE_POST]
+
+
+def test_cache_key_tracks_content_and_sanitizer_version(monkeypatch):
+    key = rendering.cache_key("body")
+    assert rendering.cache_key("body ") != key
+
+    monkeypatch.setattr(rendering, "SANITIZER_VERSION", "changed")
+    assert rendering.cache_key("body") != key
+
+
+def test_invalidate_drops_both_layers(render_calls):
+    rendering.render("**cached**")
+    rendering.invalidate("**cached**")
+
+    assert cache.get(rendering.cache_key("**cached**")) is None
+    rendering.render("**cached**")
+    assert len(render_calls) == 2
+
+
+def test_lru_evicts_least_recently_used():
+    lru = rendering._LRU(2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")
+    lru.set("c", 3)
+
+    assert lru.get("b") is None
+    assert (lru.get("a"), lru.get("c")) == (1, 3)
+
+
+@pytest.mark.asyncio
+async def test_arender_small_documents_inline(settings, render_calls):
+    settings.MARKDOWN_OFFLOAD_BYTES = 1024
+
+    html = await rendering.arender("**small**")
+    assert html == "<p><strong>small</strong></p>"
+    assert render_calls == ["**small**"]
+
+
+@pytest.mark.asyncio
+async def test_arender_threshold_counts_bytes_not_characters(settings, monkeypatch):
+    settings.MARKDOWN_OFFLOAD_BYTES = 1024
+    settings.MARKDOWN_RENDER_WORKERS = 0
+    threads = []
+    real = rendering.render_markdown
+
+    def recording_render(content):
+        threads.append(threading.current_thread())
+        return real(content)
+
+    monkeypatch.setattr(rendering, "render_markdown", recording_render)
+    text = "ü" * 600  # 600 characters, 1200 bytes
+
+    await rendering.arender(text)
+    assert threads and threads[0] is not threading.current_thread()
+
+
+@pytest.mark.asyncio
+async def test_arender_large_documents_off_the_event_loop(settings):
+    settings.MARKDOWN_OFFLOAD_BYTES = 1024
+    settings.MARKDOWN_RENDER_WORKERS = 0  # thread fallback; same contract as the pool
+    large = CODE_POST * 200
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    task = asyncio.ensure_future(ticker())
+    html = await rendering.arender(large)
+    task.cancel()
+
+    assert html == rendering.render_markdown(large)
+    assert ticks > 1  # the loop kept running while the document rendered
+    assert await rendering.arender(large) == html
+
+
+@pytest.mark.asyncio
+async def test_arender_uses_process_pool(settings):
+    settings.MARKDOWN_OFFLOAD_BYTES = 1024
+    settings.MARKDOWN_RENDER_WORKERS = 1
+    large = "<script>alert(1)</script>\n\n" + CODE_POST * 100
+    try:
+        html = await rendering.arender(large)
+    finally:
+        rendering._reset_pool()
+
+    assert "<script" not in html
+    assert html == rendering.render_markdown(large)
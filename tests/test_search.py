@@ -0,0 +1,158 @@
+"""
+Tests for the full-text search subsystem (search/): incremental indexing
+on save/delete, ranking, and the search endpoints for posts, profiles and
+rooms. The suite runs on SQLite, so this exercises the FTS5 backend.
+"""
+import json
+
+import pytest
+from django.test import RequestFactory
+from starlette.testclient import TestClient
+
+import main
+from api.profiles.views import user_profile_list
+from app import app
+from chat import views as chat_views
+from chat.models import ChatRoom
+from search import index
+from search.backends import ScanBackend, SQLiteFTSBackend
+from users.models import BlogPost, Tag, User
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _empty_index(transactional_db):
+    """The index table isn't a model, so the per-test flush leaves it alone."""
+    for source in index.SOURCES.values():
+        index.backend().clear(source)
+
+
+@pytest.fixture
+def author(transactional_db):
+    return User.objects.create_user(email='search@example.com', username='searcher')
+
+
+def post_ids(query):
+    return index.search_ids('post', query)
+
+
+def test_sqlite_uses_fts5_backend():
+    assert isinstance(index.backend(), SQLiteFTSBackend)
+
+
+def test_posts_indexed_on_publish_and_removed_on_unpublish_and_delete(author):
+    post = BlogPost.objects.create(author=author, title='Async Django', content='Event loops explained')
+    assert post_ids('django') == []
+
+    post.is_published = True
+    post.save()
+    assert post_ids('django') == [post.pk]
+    assert post_ids('loops') == [post.pk]  # porter stemming: "loops" ~ "loop"
+
+    post.is_published = False
+    post.save()
+    assert post_ids('django') == []
+
+    post.is_published = True
+    post.save()
+    post.delete()
+    assert post_ids('django') == []
+
+
+def test_title_matches_rank_above_body_matches(author):
+    body_hit = BlogPost.objects.create(author=author, title='Weekly notes', content='a bit about htmx', is_published=True)
+    title_hit = BlogPost.objects.create(author=author, title='HTMX in practice', content='notes', is_published=True)
+
+    assert post_ids('htmx') == [title_hit.pk, body_hit.pk]
+
+
+def test_tags_are_searchable_from_either_side(author):
+    post = BlogPost.objects.create(author=author, title='Untitled', content='x', is_published=True)
+    rust = Tag.objects.create(name='rustlang')
+
+    post.tags.add(rust)
+    assert post_ids('rustlang') == [post.pk]
+    post.tags.clear()
+    assert post_ids('rustlang') == []
+    rust.posts.add(post)
+    assert post_ids('rustlang') == [post.pk]
+
+
+def test_query_syntax_is_not_interpreted(author):
+    post = BlogPost.objects.create(author=author, title='Quotes "and" OR operators', content='x', is_published=True)
+
+    assert post_ids('quotes OR "') == [post.pk]
+    assert post_ids('NEAR(') == []
+    assert post_ids('***') == []
+    assert post_ids('quo') == [post.pk]  # last term matches as a prefix
+
+
+def test_private_profiles_are_not_indexed(author):
+    author.first_name, author.bio = 'Grace', 'compilers and cobol'
+    author.save()
+    assert index.search_ids('profile', 'cobol') == [author.pk]
+
+    author.is_public = False
+    author.save()
+    assert index.search_ids('profile', 'cobol') == []
+
+
+def test_unrelated_update_fields_skip_reindexing(author, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        author.save(update_fields=['last_login'])
+
+
+def test_blog_search_page(author):
+    BlogPost.objects.create(author=author, title='Postgres tuning', content='vacuum', is_published=True)
+    BlogPost.objects.create(author=author, title='Draft about postgres', content='x')
+
+    response = client.get('/blog/search', params={'q': 'postgres'})
+
+    assert response.status_code == 200
+    assert response.text.count('class="post-card"') == 1
+    assert 'Postgres tuning' in response.text
+
+
+def test_profile_api_search_is_ranked(author):
+    ada = User.objects.create_user(email='ada@example.com', username='ada', first_name='Ada', bio='')
+    User.objects.create_user(email='bob@example.com', username='bob', bio='Working through ada lovelace notes')
+    request = RequestFactory().get('/api/profiles/', {'search': 'ada'})
+    request.user = author
+
+    response = user_profile_list(request)
+    response.render()
+
+    usernames = [row['username'] for row in json.loads(response.content)]
+    assert usernames == ['ada', 'bob']
+    assert ada.pk == index.search_ids('profile', 'ada')[0]
+
+
+def test_room_search_respects_visibility(author, monkeypatch):
+    public = ChatRoom.objects.create(name='Python help', slug='python-help', type='public', topics='python,django')
+    hidden = ChatRoom.objects.create(name='Python secrets', slug='python-secrets', type='private')
+    ChatRoom.objects.create(name='Closed python', slug='closed-python', type='public', is_active=False)
+    captured = {}
+    monkeypatch.setattr(chat_views, 'render', lambda request, template, context: captured.update(context))
+    request = RequestFactory().get('/chat/rooms/', {'q': 'python'})
+    request.user = author
+
+    chat_views.chat_rooms(request)
+
+    assert list(captured['public_rooms']) == [public]
+    assert captured['private_rooms'] == []
+    assert hidden.pk in index.search_ids('room', 'python')
+
+
+def test_visible_matches_survive_many_hidden_ones(author):
+    visible = ChatRoom.objects.create(name='Python beginners', slug='python-beginners', type='public')
+    ChatRoom.objects.bulk_create([
+        ChatRoom(name=f'Python {n}', slug=f'python-{n}', type='private')
+        for n in range(index.MAX_CANDIDATES + 10)
+    ])
+    index.rebuild()
+
+    assert visible.pk not in index.search_ids('room', 'python', index.MAX_CANDIDATES)
+    public = ChatRoom.objects.filter(type='public')
+    assert index.ranked(public, 'room', 'python') == [visible]
+    assert ScanBackend().search(index.SOURCES['room'], 'python', 5, within=public) == [visible.pk]
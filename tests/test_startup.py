@@ -0,0 +1,140 @@
+"""
+Tests for the cold-start helpers (startup.py): the fingerprinted migration
+check, lazy route loading and the phase timing report.
+"""
+import logging
+
+import pytest
+from django.core.cache import cache
+from starlette.testclient import TestClient
+
+import app as app_module
+import main
+import startup
+
+
+def test_migrations_on_disk_are_found_by_file_name():
+    on_disk = startup.migrations_on_disk()
+
+    assert ('users', '0007_blogpost_word_count') in on_disk
+    assert ('search', '0001_search_index') in on_disk
+    assert not any(name.startswith('__') for _, name in on_disk)
+
+
+def test_applied_graph_is_remembered(django_assert_num_queries):
+    assert startup.migrations_applied()
+
+    with django_assert_num_queries(0):
+        assert startup.migrations_applied()
+
+
+def test_unrecorded_migration_fails_the_fast_check(monkeypatch):
+    on_disk = startup.migrations_on_disk() | {('users', '9999_not_applied')}
+    monkeypatch.setattr(startup, 'migrations_on_disk', lambda: on_disk)
+
+    assert not startup.migrations_applied()
+
+
+def test_fingerprint_tracks_the_graph():
+    from django.db import connection
+
+    on_disk = startup.migrations_on_disk()
+    fingerprint = startup.migration_fingerprint(on_disk, connection)
+
+    assert startup.migration_fingerprint(set(on_disk), connection) == fingerprint
+    assert startup.migration_fingerprint(on_disk | {('users', '9999_new')}, connection) != fingerprint
+
+
+def test_fast_startup_skips_the_full_migrate_check(monkeypatch):
+    calls = []
+    monkeypatch.setenv('FAST_STARTUP', '1')
+    monkeypatch.setattr(app_module, 'call_command', lambda *args, **kwargs: calls.append(args))
+
+    app_module.check_migrations()
+    assert calls == []
+
+    monkeypatch.setattr(startup, 'migrations_applied', lambda: False)
+    app_module.check_migrations()
+    assert calls == [('migrate', '--check')]
+
+
+def test_full_check_remembers_the_graph_in_fast_mode(monkeypatch):
+    monkeypatch.setenv('FAST_STARTUP', '1')
+    monkeypatch.setattr(startup, 'migrations_applied', lambda: False)
+
+    app_module.check_migrations()
+
+    from django.db import connection
+    fingerprint = startup.migration_fingerprint(startup.migrations_on_disk(), connection)
+    assert cache.get('startup:migrations:' + fingerprint) is True
+
+
+def test_lazy_loader_imports_a_module_on_first_hit_only():
+    loader = startup.RouteLoader()
+    loader.configure({'about': 'routes.about', 'blog': 'routes.blog'}, lazy=True)
+
+    loader.load_for('/about')
+    loader.load_for('/about/team')
+    loader.load_for('/unknown')
+
+    assert loader.loaded == {'routes.about'}
+
+
+def test_eager_loader_ignores_requests():
+    loader = startup.RouteLoader()
+    loader.configure({'about': 'routes.about'})
+
+    loader.load_for('/about')
+    assert loader.loaded == set()
+
+    loader.load_all()
+    assert loader.loaded == {'routes.about'}
+
+
+def test_static_files_are_served_without_shadowing_routes():
+    client = TestClient(app_module.app)
+
+    assert not any(getattr(route, 'path', None) == app_module._STATIC_ROUTE for route in app_module._fastapp.routes)
+
+    assert client.get('/css/style.css').status_code == 200
+    assert client.get('/img/logo.png').status_code == 200
+    assert client.get('/blog/feed.xml').headers['content-type'].startswith('application/rss+xml')
+
+
+def test_report_lists_phases_in_order():
+    with startup.phase('test-phase'):
+        pass
+
+    breakdown = startup.timings()
+
+    assert list(breakdown)[-2:] == ['test-phase', 'total']
+    assert 'app' in breakdown and 'routes' in breakdown
+    assert startup.report().startswith('Startup ')
+
+
+def test_report_is_logged_under_fast_startup(monkeypatch, caplog):
+    logger = logging.getLogger('startup')
+    # settings.LOGGING gives 'startup' its own handler and stops propagation.
+    assert logger.handlers and logger.isEnabledFor(logging.INFO)
+    logger.addHandler(caplog.handler)
+    try:
+        monkeypatch.setenv('FAST_STARTUP', '1')
+        startup.log_report()
+        monkeypatch.delenv('FAST_STARTUP')
+        startup.log_report()
+    finally:
+        logger.removeHandler(caplog.handler)
+
+    reports = [record for record in caplog.records if record.name == 'startup']
+    assert len(reports) == 1
+    assert reports[0].levelno == logging.INFO
+    assert reports[0].getMessage().startswith('Startup ')
+
+
+def test_dynamic_requests_do_not_touch_the_disk(monkeypatch):
+    def no_stat(path):
+        raise AssertionError(f"looked up {path} on disk")
+
+    monkeypatch.setattr(app_module._static, 'lookup_path', no_stat)
+
+    assert TestClient(app_module.app).get('/about').status_code == 200
@@ -0,0 +1,163 @@
+"""
+Tests for streamed pages (utils/streaming.py): /dashboard, /blog and
+/profile/{username} send the head and SiteHeader first and their
+DB-backed sections as they resolve.
+"""
+import asyncio
+
+import pytest
+from bs4 import BeautifulSoup
+from starlette.testclient import TestClient
+
+import main
+import routes.blog
+from app import app
+from users.models import BlogPost, User
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def author(transactional_db):
+    user = User.objects.create_user(
+        email='streamer@example.com', username='streamer', password='SecurePass123!',
+        portfolio_content='## Things I built',
+    )
+    BlogPost.objects.create(author=user, title="Streamed Post", content="Body.", is_published=True)
+    return user
+
+
+@pytest.fixture
+def logged_in(author):
+    client = TestClient(app)
+    # Not following the redirect: the dashboard visit should be the test's.
+    client.post('/login', data={'email': 'streamer@example.com', 'password': 'SecurePass123!'}, follow_redirects=False)
+    return client
+
+
+async def first_chunk_and_rest(path):
+    """GET `path` from the ASGI app by hand: (start message, first body message, app task, queue of the rest)."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'root_path': '', 'query_string': b'', 'headers': [(b'host', b'testserver')],
+        'server': ('testserver', 80), 'client': ('testclient', 50000),
+    }
+    messages = asyncio.Queue()
+
+    async def receive():
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        await messages.put(message)
+
+    task = asyncio.ensure_future(app(scope, receive, send))
+    start = await messages.get()
+    first = await messages.get()
+    return start, first, task, messages
+
+
+@pytest.mark.asyncio
+async def test_header_is_sent_before_slow_sections(author, monkeypatch):
+    released = asyncio.Event()
+
+    async def slow_sidebar():
+        await released.wait()
+        return "SLOW SIDEBAR"
+
+    monkeypatch.setattr(routes.blog, 'popular_authors_sidebar', slow_sidebar)
+
+    start, first, task, messages = await first_chunk_and_rest('/blog')
+    html = first['body'].decode()
+
+    assert start['status'] == 200
+    assert not any(name == b'content-length' for name, _ in start['headers'])
+    assert first['more_body'] is True
+    assert '<head>' in html and 'rel="stylesheet"' in html
+    assert 'class="siteHeader"' in html
+    assert 'SLOW SIDEBAR' not in html
+
+    released.set()
+    await asyncio.wait_for(task, 5)
+    rest = []
+    while not messages.empty():
+        rest.append((await messages.get()).get('body', b''))
+    assert b'SLOW SIDEBAR' in b''.join(rest)
+
+
+def test_streamed_blog_renders_every_section(client, author):
+    response = client.get('/blog')
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/html')
+    assert 'Streamed Post' in response.text
+    assert 'Trending Topics' in response.text
+    assert 'Popular Authors' in response.text
+    assert response.text.rstrip().endswith('</html>')
+    assert '<title>Blog | DeadDevelopers</title>' in response.text
+    assert '<!--stream:' not in response.text
+
+
+def test_invalid_cursor_still_redirects(client):
+    response = client.get('/blog?cursor=not-a-cursor', follow_redirects=False)
+
+    assert response.status_code == 303
+    assert response.headers['location'] == '/blog'
+
+
+def test_failing_section_is_replaced_by_a_notice(client, monkeypatch):
+    def broken():
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(routes.blog, 'trending_topics_sidebar', broken)
+
+    response = client.get('/blog')
+
+    assert response.status_code == 200
+    assert 'stream-error' in response.text
+    assert 'Latest Posts' in response.text
+    assert response.text.rstrip().endswith('</html>')
+
+
+def test_htmx_requests_get_a_streamed_fragment(client, author):
+    response = client.get('/blog', headers={'HX-Request': 'true'})
+
+    assert '<html' not in response.text
+    assert 'Streamed Post' in response.text
+
+
+def test_dashboard_streams_sections_and_login_toast(logged_in):
+    response = logged_in.get('/dashboard')
+
+    assert response.status_code == 200
+    assert 'Welcome back' in response.text
+    assert 'projects-grid' in response.text
+    assert 'activity-card' in response.text
+    assert 'Welcome back' not in logged_in.get('/dashboard').text
+
+
+def test_profile_streams_portfolio_and_posts(client, author):
+    response = client.get('/profile/streamer')
+
+    assert response.status_code == 200
+    assert 'Things I built' in response.text
+    assert 'Streamed Post' in response.text
+    assert response.text.index('profile-header') < response.text.index('Things I built')
+
+
+def test_streamed_head_matches_a_buffered_page(client, author):
+    def head(path):
+        return BeautifulSoup(client.get(path).text, 'html.parser').head
+
+    def shared(head):
+        """Everything but the per-page title and canonical URL."""
+        return [str(tag) for tag in head.find_all(True, recursive=False)
+                if tag.name != 'title' and 'canonical' not in tag.get('rel', [])]
+
+    streamed, buffered = head('/blog'), head('/about')
+
+    assert shared(streamed) and shared(streamed) == shared(buffered)
+    assert streamed.find('link', rel='canonical')['href'].endswith('/blog')
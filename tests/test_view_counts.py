@@ -0,0 +1,109 @@
+"""
+Tests for buffered blog view counts (users/view_counts.py): views cost no
+queries when recorded and are written with one UPDATE per flush.
+"""
+import pytest
+from django.db import DatabaseError
+
+from users import view_counts
+from users.models import BlogPost, User
+from users.view_counts import InMemoryViewBuffer, ViewCounter
+
+
+@pytest.fixture
+def counter():
+    return ViewCounter(buffer=InMemoryViewBuffer())
+
+
+@pytest.fixture
+def posts(transactional_db):
+    author = User.objects.create_user(email='views@example.com', username='views')
+    return [
+        BlogPost.objects.create(author=author, title=f'Post {n}', content='body', is_published=True)
+        for n in range(3)
+    ]
+
+
+def test_record_is_query_free_and_shows_in_total(counter, posts, django_assert_num_queries):
+    post = posts[0]
+    with django_assert_num_queries(0):
+        for _ in range(5):
+            counter.record(post.pk)
+
+    assert counter.total(post) == 5
+    post.refresh_from_db()
+    assert post.view_count == 0
+
+
+def test_flush_writes_every_post_in_one_update(counter, posts, django_assert_num_queries):
+    for n, post in enumerate(posts, start=1):
+        for _ in range(n):
+            counter.record(post.pk)
+
+    with django_assert_num_queries(1):
+        assert counter.flush() == 3
+
+    assert [p.view_count for p in BlogPost.objects.order_by('title')] == [1, 2, 3]
+    assert counter.pending(posts[0].pk) == 0
+    assert counter.flush() == 0
+
+
+def test_flush_adds_to_persisted_count(counter, posts):
+    post = posts[0]
+    post.increment_views()
+    counter.record(post.pk)
+    counter.flush()
+
+    post.refresh_from_db()
+    assert post.view_count == 2
+    assert counter.total(post) == 2
+
+
+def test_dedup_ignores_repeat_views_from_a_session(counter, posts, settings):
+    settings.BLOG_VIEW_DEDUP_SECONDS = 60
+    post = posts[0]
+
+    assert counter.record(post.pk, viewer='session-a')
+    assert not counter.record(post.pk, viewer='session-a')
+    assert counter.record(post.pk, viewer='session-b')
+    assert counter.record(post.pk)  # no session: always counted
+    assert counter.pending(post.pk) == 3
+
+
+def test_failed_flush_keeps_counts_for_next_interval(counter, posts, monkeypatch):
+    post = posts[0]
+    counter.record(post.pk)
+
+    def broken_filter(*args, **kwargs):
+        raise DatabaseError("down")
+
+    monkeypatch.setattr(view_counts.BlogPost.objects, 'filter', broken_filter)
+    with pytest.raises(DatabaseError):
+        counter.flush()
+    monkeypatch.undo()
+
+    assert counter.pending(post.pk) == 1
+    counter.flush()
+    post.refresh_from_db()
+    assert post.view_count == 1
+
+
+@pytest.mark.parametrize('dedup_seconds, has_viewer', [(0, False), (60, True)])
+def test_post_page_only_tags_viewers_when_deduplicating(posts, settings, monkeypatch, dedup_seconds, has_viewer):
+    from starlette.testclient import TestClient
+
+    import main  # noqa: F401  (registers the routes)
+    from app import app
+
+    settings.BLOG_VIEW_DEDUP_SECONDS = dedup_seconds
+    viewers = []
+    monkeypatch.setattr(view_counts.view_counter, 'record', lambda post_id, viewer=None: viewers.append(viewer))
+    User.objects.create_user(email='reader@example.com', username='reader', password='SecurePass123!')
+    client = TestClient(app)
+    client.post('/login', data={'email': 'reader@example.com', 'password': 'SecurePass123!'})
+
+    response = client.get(posts[0].get_absolute_url(), follow_redirects=False)
+
+    assert response.status_code == 200
+    assert len(viewers) == 1
+    assert (viewers[0] is not None) == has_viewer
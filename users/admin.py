@@ -40,9 +40,9 @@ class ProjectAdmin(admin.ModelAdmin):
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
-    list_display = ('name', 'slug')
+    list_display = ('name', 'slug', 'published_post_count')
     search_fields = ('name',)
-    readonly_fields = ('slug',)
+    readonly_fields = ('slug', 'published_post_count')
 
 
 @admin.register(BlogPost)
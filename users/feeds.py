@@ -0,0 +1,176 @@
+"""
+RSS, Atom and JSON Feed documents for the blog.
+
+Aggregators poll these instead of scraping /blog, so serving them must be
+cheap:
+
+- A built document is cached whole (body plus its ETag and Last-Modified)
+  under the current feed version. The signal receivers in users/signals.py
+  call `invalidate()` whenever a post, its tags or its author's name
+  change, which starts a new version; until then every request, and every
+  304, is answered from the cache without touching the database.
+- Last-Modified is the newest `updated_at` of the posts in the document;
+  the ETag is a hash of the body.
+- Absolute URLs are built from settings.SITE_URL, not the request's Host
+  header, so a document has one cache entry however clients address it.
+
+Feeds cover the whole blog, one tag, or one author: see `feed_path()`.
+"""
+import json
+import uuid
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import feedgenerator
+
+from utils import rendering
+from utils.conditional import etag_for, last_modified_header
+
+from .models import BlogPost, Tag, User
+
+FEED_SIZE = 20
+CACHE_TTL = 60 * 60 * 24
+VERSION_KEY = 'blog:feeds:version'
+
+RSS, ATOM, JSON_FEED = 'xml', 'atom', 'json'
+CONTENT_TYPES = {
+    RSS: 'application/rss+xml; charset=utf-8',
+    ATOM: 'application/atom+xml; charset=utf-8',
+    JSON_FEED: 'application/feed+json; charset=utf-8',
+}
+
+
+@dataclass(frozen=True)
+class FeedDocument:
+    body: str
+    content_type: str
+    etag: str
+    last_modified: str | None
+
+
+def feed_path(fmt: str, tag_slug: str = "", username: str = "") -> str:
+    if tag_slug:
+        return f"/blog/tag/{tag_slug}/feed.{fmt}"
+    if username:
+        return f"/blog/author/{username}/feed.{fmt}"
+    return f"/blog/feed.{fmt}"
+
+
+def cache_control() -> str:
+    return f"public, max-age={getattr(settings, 'BLOG_FEED_MAX_AGE', 300)}"
+
+
+def invalidate():
+    """Orphan every cached feed document; the next request rebuilds it."""
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def _version():
+    # A random token rather than a counter: if the key is evicted, the new
+    # version can't collide with documents cached under an old one.
+    return cache.get_or_set(VERSION_KEY, lambda: uuid.uuid4().hex, None)
+
+
+def get_feed(fmt: str, tag_slug: str = "", username: str = "") -> FeedDocument | None:
+    """The feed document, from the cache when current. None for an unknown tag or author."""
+    key = f"blog:feed:{_version()}:{feed_path(fmt, tag_slug, username)}"
+    document = cache.get(key)
+    if document is None:
+        document = build_feed(fmt, tag_slug, username)
+        if document is not None:
+            cache.set(key, document, CACHE_TTL)
+    return document
+
+
+def build_feed(fmt: str, tag_slug: str = "", username: str = "") -> FeedDocument | None:
+    """Query the newest FEED_SIZE posts in scope and serialize them as `fmt`."""
+    base_url = settings.SITE_URL.rstrip('/')
+    posts = BlogPost.objects.filter(is_published=True, published_at__isnull=False)
+    if tag_slug:
+        tag = Tag.objects.filter(slug=tag_slug).first()
+        if tag is None:
+            return None
+        posts = posts.filter(tags=tag)
+        meta = {
+            'title': f"#{tag.name} | DeadDevelopers Blog",
+            'link': f"{base_url}/blog/tag/{tag.slug}",
+            'description': f"Posts tagged #{tag.name}",
+        }
+    elif username:
+        author = User.objects.filter(username=username, is_active=True).first()
+        if author is None:
+            return None
+        posts = posts.filter(author=author)
+        meta = {
+            'title': f"{author.get_display_name()} | DeadDevelopers Blog",
+            'link': base_url + author.get_absolute_url(),
+            'description': f"Posts by {author.get_display_name()}",
+        }
+    else:
+        meta = {
+            'title': "DeadDevelopers Blog",
+            'link': f"{base_url}/blog",
+            'description': "Latest posts from the DeadDevelopers community",
+        }
+    meta['feed_url'] = base_url + feed_path(fmt, tag_slug, username)
+
+    posts = list(
+        posts.select_related('author').prefetch_related('tags').order_by('-published_at', '-id')[:FEED_SIZE]
+    )
+    if fmt == JSON_FEED:
+        body = _json_feed(meta, posts, base_url)
+    else:
+        body = _syndication_feed(feedgenerator.Atom1Feed if fmt == ATOM else feedgenerator.Rss201rev2Feed,
+                                 meta, posts, base_url)
+    newest = max((post.updated_at for post in posts), default=None)
+    return FeedDocument(body, CONTENT_TYPES[fmt], etag_for(body), last_modified_header(newest))
+
+
+def _syndication_feed(feed_class, meta, posts, base_url):
+    feed = feed_class(language='en', **meta)
+    for post in posts:
+        url = base_url + post.get_absolute_url()
+        feed.add_item(
+            title=post.title,
+            link=url,
+            description=rendering.render(post.content),
+            unique_id=url,
+            unique_id_is_permalink=True,
+            pubdate=post.published_at,
+            updateddate=post.updated_at,
+            author_name=post.author.get_display_name(),
+            author_link=base_url + post.author.get_absolute_url(),
+            categories=[tag.name for tag in post.tags.all()],
+        )
+    return feed.writeString('utf-8')
+
+
+def _json_feed(meta, posts, base_url):
+    """JSON Feed 1.1 (https://www.jsonfeed.org/version/1.1/)."""
+    items = []
+    for post in posts:
+        url = base_url + post.get_absolute_url()
+        items.append({
+            'id': url,
+            'url': url,
+            'title': post.title,
+            'summary': post.excerpt,
+            'content_html': rendering.render(post.content),
+            'date_published': post.published_at.isoformat(),
+            'date_modified': post.updated_at.isoformat(),
+            'authors': [{
+                'name': post.author.get_display_name(),
+                'url': base_url + post.author.get_absolute_url(),
+            }],
+            'tags': [tag.name for tag in post.tags.all()],
+        })
+    return json.dumps({
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': meta['title'],
+        'home_page_url': meta['link'],
+        'feed_url': meta['feed_url'],
+        'description': meta['description'],
+        'language': 'en',
+        'items': items,
+    })
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:52
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_counts(apps, schema_editor):
+    """Seed the new counters from the existing posts."""
+    Tag = apps.get_model('users', 'Tag')
+    User = apps.get_model('users', 'User')
+    for model, relation in ((Tag, 'posts'), (User, 'blog_posts')):
+        counted = (
+            model.objects
+            .annotate(total=Count(relation, filter=Q(**{f'{relation}__is_published': True})))
+            .filter(total__gt=0)
+        )
+        for pk, total in counted.values_list('pk', 'total'):
+            model.objects.filter(pk=pk).update(published_post_count=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0005_tag_blogpost'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='published_post_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='published posts'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='published_post_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='published posts'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['-published_post_count'], name='users_tag_post_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-published_post_count'], name='users_user_post_count_idx'),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
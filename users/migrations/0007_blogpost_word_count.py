@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:55
+
+from django.db import migrations, models
+
+
+def backfill_word_counts(apps, schema_editor):
+    BlogPost = apps.get_model('users', 'BlogPost')
+    posts = []
+    for post in BlogPost.objects.only('pk', 'content').iterator(chunk_size=500):
+        post.word_count = len(post.content.split())
+        posts.append(post)
+    BlogPost.objects.bulk_update(posts, ['word_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_published_post_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='word count'),
+        ),
+        migrations.RunPython(backfill_word_counts, migrations.RunPython.noop),
+    ]
@@ -71,6 +71,8 @@ class User(AbstractUser):
     # Metrics
     challenge_count = models.IntegerField(default=0)
     completed_projects = models.IntegerField(default=0)
+    # Maintained by users/post_counts.py; ranks the "Popular Authors" sidebar.
+    published_post_count = models.PositiveIntegerField(_('published posts'), default=0)
     
     # Portfolio & Profile Fields (Phase 1)
     portfolio_content = models.TextField(
@@ -119,6 +121,9 @@ class User(AbstractUser):
     class Meta:
         verbose_name = _('user')
         verbose_name_plural = _('users')
+        indexes = [
+            models.Index(fields=['-published_post_count'], name='users_user_post_count_idx'),
+        ]
     
     def __str__(self):
         return self.email
@@ -209,9 +214,14 @@ class Tag(models.Model):
 
     name = models.CharField(_('name'), max_length=40, unique=True)
     slug = models.SlugField(_('slug'), max_length=50, unique=True, blank=True)
+    # Maintained by users/post_counts.py; ranks the "Trending Topics" sidebar.
+    published_post_count = models.PositiveIntegerField(_('published posts'), default=0)
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['-published_post_count'], name='users_tag_post_count_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -255,6 +265,9 @@ class BlogPost(models.Model):
     created_at = models.DateTimeField(_('created at'), default=timezone.now)
     updated_at = models.DateTimeField(_('updated at'), auto_now=True)
     view_count = models.PositiveIntegerField(_('view count'), default=0)
+    # Derived from content on save, so feeds can show a read time without
+    # loading the body.
+    word_count = models.PositiveIntegerField(_('word count'), default=0, editable=False)
 
     class Meta:
         verbose_name = _('blog post')
@@ -278,11 +291,21 @@ class BlogPost(models.Model):
         # Auto-derive excerpt from content if author didn't supply one.
         if not self.excerpt and self.content:
             self.excerpt = self.content.strip().split('\n', 1)[0][:400]
+        self.word_count = len(self.content.split()) if self.content else 0
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'content' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'word_count'}
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
         return f"/blog/{self.author.username}/{self.slug}"
 
+    @property
+    def read_minutes(self):
+        """Rough read-time estimate at 200 wpm. Floor of 1 min."""
+        return max(1, round(self.word_count / 200))
+
     def increment_views(self):
-        # Atomic to avoid lost updates under concurrent reads
+        # Atomic to avoid lost updates under concurrent reads. Page views
+        # go through users.view_counts instead, which batches these.
         type(self).objects.filter(pk=self.pk).update(view_count=models.F('view_count') + 1)
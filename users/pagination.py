@@ -0,0 +1,38 @@
+"""
+Keyset (cursor) pagination for blog feeds.
+
+Feeds are ordered newest first by (published_at, id), which is unique even
+when two posts share a timestamp. A page is one range scan on the
+`-published_at` index: `published_at <= boundary` bounds the scan, and the
+id tiebreak only applies to rows at the boundary timestamp. Paging deep
+costs the same as the first page — no OFFSET.
+
+Cursors are opaque to clients (utils/cursors.py, shared with chat
+history): they encode the last post's (published_at, id).
+"""
+from django.db.models import Q
+
+from utils.cursors import InvalidCursor, decode_cursor, encode_cursor
+
+FEED_PAGE_SIZE = 20
+
+
+def feed_page(queryset, cursor=None, limit=FEED_PAGE_SIZE):
+    """
+    One page of `queryset` (published posts), newest first.
+
+    Returns (posts, cursor for the next page or None on the last page).
+    Raises InvalidCursor for a malformed `cursor`.
+    """
+    queryset = queryset.filter(published_at__isnull=False).order_by('-published_at', '-id')
+    if cursor:
+        published_at, post_id = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(published_at__lt=published_at) | Q(published_at=published_at, id__lt=post_id),
+            published_at__lte=published_at,
+        )
+    posts = list(queryset[:limit + 1])
+    if len(posts) <= limit:
+        return posts, None
+    posts = posts[:limit]
+    return posts, encode_cursor(posts[-1], 'published_at')
@@ -0,0 +1,58 @@
+"""
+Published-post counters behind the blog leaderboards.
+
+Tag.published_post_count and User.published_post_count let the "Trending
+Topics" and "Popular Authors" sidebars read the top N rows off an index
+instead of aggregating over every post on each /blog render.
+
+The counters are recounted (not incremented) for just the tags and authors
+a write touched, so they stay exact however a post changes: publish,
+unpublish, delete, or tags added / removed / cleared from either side of
+the relation. The signal receivers in users/signals.py call these.
+"""
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import BlogPost, Tag, User
+
+
+def _published_count(queryset, group_field):
+    """Subquery: published posts in `queryset` grouped by `group_field` = OuterRef('pk')."""
+    return Coalesce(
+        Subquery(
+            queryset
+            .filter(**{group_field: OuterRef('pk')})
+            .values(group_field)
+            .annotate(total=Count('*'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def refresh_tag_counts(tag_ids):
+    """Recount published posts for `tag_ids` in one UPDATE."""
+    if not tag_ids:
+        return
+    through = BlogPost.tags.through.objects.filter(blogpost__is_published=True)
+    Tag.objects.filter(pk__in=tag_ids).update(
+        published_post_count=_published_count(through, 'tag_id'),
+    )
+
+
+def refresh_author_counts(user_ids):
+    """Recount published posts for `user_ids` in one UPDATE."""
+    if not user_ids:
+        return
+    User.objects.filter(pk__in=user_ids).update(
+        published_post_count=_published_count(BlogPost.objects.filter(is_published=True), 'author_id'),
+    )
+
+
+def refresh_post(post, tag_ids=None):
+    """Recount the author and tags of `post` (or `tag_ids`, if given)."""
+    refresh_author_counts([post.author_id])
+    if tag_ids is None:
+        tag_ids = list(post.tags.values_list('pk', flat=True))
+    refresh_tag_counts(tag_ids)
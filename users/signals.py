@@ -0,0 +1,75 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import feeds, post_counts
+from .models import BlogPost, Tag, User
+
+# User fields that appear in feed documents (as the author's name).
+_FEED_USER_FIELDS = {'username', 'first_name', 'last_name', 'is_active'}
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_identity(sender, instance, **kwargs):
+    """
+    Drop AuthBridge's cross-request user cache whenever a User row changes,
+    so profile edits (name, avatar, is_public, ...) show up immediately.
+    """
+    # Imported lazily: auth_bridge pulls in FastHTML, which the Django-only
+    # entry points (manage.py, wsgi) shouldn't pay for at app-load time.
+    from auth_bridge import AuthBridge
+    AuthBridge.invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=BlogPost)
+def recount_after_post_save(sender, instance, created, update_fields=None, **kwargs):
+    """A save may (un)publish the post; a new post has no tags yet."""
+    if update_fields is not None and 'is_published' not in update_fields:
+        return
+    post_counts.refresh_post(instance, tag_ids=[] if created else None)
+
+
+@receiver(pre_delete, sender=BlogPost)
+def remember_tags_before_delete(sender, instance, **kwargs):
+    # The tag links are gone by post_delete; note which tags to recount.
+    instance._counted_tag_ids = list(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=BlogPost)
+def recount_after_post_delete(sender, instance, **kwargs):
+    post_counts.refresh_post(instance, tag_ids=getattr(instance, '_counted_tag_ids', []))
+
+
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def recount_after_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep tag counters right when tags are added, removed or cleared (from either side)."""
+    if action == 'pre_clear':
+        if not reverse:
+            instance._cleared_tag_ids = list(instance.tags.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # `instance` is a Tag; the posts it gained or lost don't change author counts.
+        post_counts.refresh_tag_counts([instance.pk])
+    elif action == 'post_clear':
+        post_counts.refresh_tag_counts(getattr(instance, '_cleared_tag_ids', []))
+    else:
+        post_counts.refresh_tag_counts(pk_set)
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def invalidate_feeds(sender, **kwargs):
+    """Any post or tag write may change a feed document; start a new feed version."""
+    feeds.invalidate()
+
+
+@receiver(post_save, sender=User)
+def invalidate_feeds_on_rename(sender, instance, update_fields=None, **kwargs):
+    # Most User saves (last_login, profile fields) don't show up in feeds.
+    if update_fields is None or _FEED_USER_FIELDS & set(update_fields):
+        feeds.invalidate()
@@ -0,0 +1,193 @@
+"""
+Buffered blog post view counts.
+
+Every non-owner view of a post used to run
+`UPDATE ... SET view_count = view_count + 1` on the post's row, so a viral
+post turned into a row-lock hotspot. Views are now accumulated in a
+buffer and written periodically:
+
+- `record()` adds one pending view to the buffer. With BLOG_VIEW_DEDUP_SECONDS
+  set, repeat views from the same session within that window are ignored.
+- Every BLOG_VIEW_FLUSH_INTERVAL seconds `flush()` moves all pending
+  counts into BlogPost.view_count with a single UPDATE (a CASE over the
+  post ids), however many posts were viewed.
+- `total()` is what pages show: the persisted count plus what's pending.
+
+Backends: `InMemoryViewBuffer` (per process; tests, local development and
+the fallback when there is no shared cache) and `RedisViewBuffer` (one
+hash of counters in the cache's Redis server, shared by every worker).
+BLOG_VIEW_BUFFER picks one by dotted path.
+
+Pending views survive a graceful exit (an atexit hook flushes them) but
+not a hard kill; a lost interval only undercounts views.
+"""
+import asyncio
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils.module_loading import import_string
+
+from .models import BlogPost
+
+logger = logging.getLogger(__name__)
+
+_SEEN_CACHE_PREFIX = 'blog:viewed:'
+
+
+class InMemoryViewBuffer:
+    """Process-local pending counts. Only shared within one worker process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def add(self, post_id, count=1):
+        with self._lock:
+            self._counts[post_id] = self._counts.get(post_id, 0) + count
+
+    def pending(self, post_id):
+        with self._lock:
+            return self._counts.get(post_id, 0)
+
+    def take(self):
+        """Remove and return every pending count as {post_id: views}."""
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        return counts
+
+    def clear(self):
+        self.take()
+
+
+class RedisViewBuffer:
+    """Pending counts in one Redis hash, shared by every worker."""
+
+    key = 'blog:views:pending'
+
+    def __init__(self, alias='default'):
+        from django_redis import get_redis_connection
+
+        self.redis = get_redis_connection(alias)
+
+    def add(self, post_id, count=1):
+        self.redis.hincrby(self.key, post_id, count)
+
+    def pending(self, post_id):
+        return int(self.redis.hget(self.key, post_id) or 0)
+
+    def take(self):
+        # MULTI/EXEC: no increment can land between the read and the delete.
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hgetall(self.key)
+        pipe.delete(self.key)
+        counts, _ = pipe.execute()
+        return {int(post_id): int(views) for post_id, views in counts.items()}
+
+
+def default_buffer_path():
+    if getattr(settings, 'BLOG_VIEW_BUFFER', None):
+        return settings.BLOG_VIEW_BUFFER
+    if 'redis' in settings.CACHES['default']['BACKEND'].lower():
+        return 'users.view_counts.RedisViewBuffer'
+    return 'users.view_counts.InMemoryViewBuffer'
+
+
+class ViewCounter:
+    """Buffers post views and flushes them to BlogPost.view_count in bulk."""
+
+    def __init__(self, buffer=None):
+        self._buffer = buffer
+        self._flush_lock = threading.Lock()
+        self._loop = None
+        self._flusher = None
+        self._atexit_registered = False
+
+    @property
+    def buffer(self):
+        if self._buffer is None:
+            self._buffer = import_string(default_buffer_path())()
+        return self._buffer
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'BLOG_VIEW_FLUSH_INTERVAL', 10)
+
+    @property
+    def dedup_seconds(self):
+        return getattr(settings, 'BLOG_VIEW_DEDUP_SECONDS', 0)
+
+    def record(self, post_id, viewer=None):
+        """
+        Count one view of `post_id`. Returns False if it was a repeat.
+
+        `viewer` identifies the session for deduplication; views without
+        one are always counted.
+        """
+        if viewer and self.dedup_seconds:
+            if not cache.add(f'{_SEEN_CACHE_PREFIX}{post_id}:{viewer}', True, self.dedup_seconds):
+                return False
+        self.buffer.add(post_id)
+        return True
+
+    def pending(self, post_id):
+        """Views of `post_id` recorded but not yet flushed."""
+        return self.buffer.pending(post_id)
+
+    def total(self, post):
+        """The view count to display: persisted plus pending."""
+        return post.view_count + self.pending(post.pk)
+
+    def flush(self):
+        """Write all pending views with one UPDATE. Returns the number of posts updated."""
+        with self._flush_lock:
+            counts = self.buffer.take()
+            if not counts:
+                return 0
+            try:
+                BlogPost.objects.filter(pk__in=counts).update(
+                    view_count=F('view_count') + Case(
+                        *[When(pk=post_id, then=Value(views)) for post_id, views in counts.items()],
+                        default=Value(0),
+                        output_field=IntegerField(),
+                    ),
+                )
+            except Exception:
+                # Put the counts back so the next interval retries them.
+                for post_id, views in counts.items():
+                    self.buffer.add(post_id, views)
+                raise
+            return len(counts)
+
+    def start_flusher(self):
+        """Run flush() every flush_interval on the running loop (idempotent)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._flusher is not None and not self._flusher.done():
+            return
+        self._loop = loop
+        self._flusher = loop.create_task(self._run_flushes())
+        if not self._atexit_registered:
+            atexit.register(self._flush_at_exit)
+            self._atexit_registered = True
+
+    async def _run_flushes(self):
+        from asgiref.sync import sync_to_async
+
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await sync_to_async(self.flush)()
+            except Exception:
+                logger.exception("Blog view count flush failed")
+
+    def _flush_at_exit(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Blog view count flush at exit failed")
+
+
+view_counter = ViewCounter()
@@ -0,0 +1,196 @@
+"""
+Content-hashed, precompressed CSS and JS.
+
+`build()` copies every file under static/css and static/js to
+ASSETS_BUILD_DIR under a name containing a hash of its content
+(css/style.css -> css/style.3f2a9c1d0b.css). It writes a gzip and, with
+the optional brotli package installed, a brotli variant next to each copy,
+and records the mapping in manifest.json. Outputs are content-addressed,
+so a build only writes what's new. Old outputs are kept, because pages
+still cached elsewhere (page_cache.py, browsers) may reference them.
+
+`asset_url()` resolves a source path to its /assets/ URL for templates
+and the `hdrs` tuple. `AssetFiles` serves those URLs with
+`Cache-Control: immutable`, choosing br, gzip or identity from
+Accept-Encoding. A changed file gets a new URL, so nothing is ever
+stale.
+
+Run `python -m utils.assets` at deploy time. app.py also calls
+`prepare()` at startup, which builds whatever is missing. On a read-only
+filesystem with nothing prebuilt, URLs fall back to the plain /css/...
+paths served by the static route.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import posixpath
+from pathlib import Path
+
+from django.conf import settings
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, PlainTextResponse, Response
+
+from utils.conditional import is_not_modified
+
+try:
+    import brotli
+except ImportError:  # gzip variants only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+ASSET_DIRS = ('css', 'js')
+URL_PREFIX = '/assets/'
+HASH_LENGTH = 10
+MANIFEST_NAME = 'manifest.json'
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Preference order when the client accepts several.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_manifest = None
+
+
+def source_dir() -> Path:
+    return Path(settings.BASE_DIR) / 'static'
+
+
+def build_dir() -> Path:
+    return Path(getattr(settings, 'ASSETS_BUILD_DIR', None) or source_dir() / 'build')
+
+
+def hashed_name(path: str, data: bytes) -> str:
+    root, ext = posixpath.splitext(path)
+    return f"{root}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def _write_atomic(target: Path, data: bytes):
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, target)
+
+
+def _write_variants(target: Path, data: bytes):
+    """Write `target` and its compressed variants, skipping any that already exist."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    variants = [(target.with_name(target.name + '.gz'), lambda: gzip.compress(data, 9, mtime=0))]
+    if brotli is not None:
+        variants.append((target.with_name(target.name + '.br'), lambda: brotli.compress(data, quality=11)))
+    for path, compress in variants:
+        if not path.exists():
+            _write_atomic(path, compress())
+    if not target.exists():
+        _write_atomic(target, data)
+
+
+def build(source: Path = None, output: Path = None) -> dict:
+    """Fingerprint and compress every asset; returns (and writes) the manifest."""
+    source, output = source or source_dir(), output or build_dir()
+    manifest = {}
+    for directory in ASSET_DIRS:
+        for path in sorted((source / directory).rglob('*')):
+            if not path.is_file() or path.name.startswith('.'):
+                continue
+            relative = path.relative_to(source).as_posix()
+            data = path.read_bytes()
+            manifest[relative] = hashed_name(relative, data)
+            _write_variants(output / manifest[relative], data)
+    if read_manifest(output) != manifest:
+        _write_atomic(output / MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode())
+    return manifest
+
+
+def read_manifest(output: Path = None) -> dict | None:
+    try:
+        return json.loads(((output or build_dir()) / MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def prepare():
+    """Startup step: build missing outputs and load the manifest."""
+    global _manifest
+    try:
+        _manifest = build()
+    except OSError:
+        logger.warning("Could not build static assets; serving what's prebuilt", exc_info=True)
+        _manifest = read_manifest() or {}
+
+
+def manifest() -> dict:
+    global _manifest
+    if _manifest is None:
+        _manifest = read_manifest() or {}
+    return _manifest
+
+
+def asset_url(path: str) -> str:
+    """URL for static file `path` ('css/style.css'): hashed when built, plain otherwise."""
+    path = path.lstrip('/')
+    hashed = manifest().get(path)
+    return URL_PREFIX + hashed if hashed else '/' + path
+
+
+def _accepted(accept_encoding: str) -> set:
+    """Codings the client accepts (q > 0) from an Accept-Encoding header."""
+    accepted = set()
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class AssetFiles:
+    """ASGI app serving built assets under URL_PREFIX with content negotiation."""
+
+    async def __call__(self, scope, receive, send):
+        if scope['method'] not in ('GET', 'HEAD'):
+            await PlainTextResponse("Method Not Allowed", status_code=405)(scope, receive, send)
+            return
+        name = scope['path'][len(URL_PREFIX):]
+        # Only names the manifest handed out: no traversal, no stray files.
+        if name not in set(manifest().values()):
+            await PlainTextResponse("Not Found", status_code=404)(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        path, encoding = build_dir() / name, None
+        accepted = _accepted(request_headers.get('accept-encoding', ''))
+        for coding, suffix in ENCODINGS:
+            variant = path.with_name(path.name + suffix)
+            if (coding in accepted or '*' in accepted) and variant.exists():
+                path, encoding = variant, coding
+                break
+
+        digest = posixpath.splitext(name)[0].rsplit('.', 1)[-1]
+        headers = {
+            'Cache-Control': CACHE_CONTROL,
+            'Vary': 'Accept-Encoding',
+            'ETag': f'"{digest}-{encoding}"' if encoding else f'"{digest}"',
+        }
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        if is_not_modified(request_headers, headers['ETag']):
+            await Response(status_code=304, headers=headers)(scope, receive, send)
+            return
+        media_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        await FileResponse(path, media_type=media_type, headers=headers)(scope, receive, send)
+
+
+if __name__ == '__main__':
+    import django
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_config.settings')
+    django.setup()
+    built = build()
+    print(f"Built {len(built)} assets into {build_dir()} (brotli: {'yes' if brotli else 'not installed'})")
@@ -0,0 +1,46 @@
+"""
+Conditional GET helpers (RFC 9110 §13): validators for a response body and
+the check for whether a request's cached copy is still current.
+"""
+import hashlib
+from datetime import datetime
+
+from django.utils.http import http_date, parse_http_date_safe
+
+
+def etag_for(body) -> str:
+    """Strong ETag for a response body (str or bytes)."""
+    if isinstance(body, str):
+        body = body.encode()
+    return '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+
+
+def last_modified_header(moment: datetime | None) -> str | None:
+    """HTTP-date for a Last-Modified header, or None if there's no timestamp."""
+    return http_date(moment.timestamp()) if moment else None
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison: W/"x" and "x" are the same representation for GET.
+    if if_none_match.strip() == '*':
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(','))
+    return any(tag.removeprefix('W/') == etag.removeprefix('W/') for tag in tags)
+
+
+def is_not_modified(headers, etag: str | None, last_modified: str | None = None) -> bool:
+    """
+    Whether a GET with these request `headers` may be answered with 304.
+
+    If-None-Match wins when present; If-Modified-Since is only consulted
+    without it, as the RFC requires.
+    """
+    if_none_match = headers.get('if-none-match')
+    if if_none_match is not None:
+        return bool(etag) and _etag_matches(if_none_match, etag)
+    if_modified_since = headers.get('if-modified-since')
+    if if_modified_since and last_modified:
+        since = parse_http_date_safe(if_modified_since)
+        modified = parse_http_date_safe(last_modified)
+        return since is not None and modified is not None and modified <= since
+    return False
@@ -0,0 +1,34 @@
+"""
+Opaque keyset cursors, shared by chat history (chat/pagination.py) and blog
+feeds (users/pagination.py).
+
+A cursor is an urlsafe-base64 encoding of a row's (ordering timestamp, id):
+the timestamp orders the rows and the id breaks ties between rows that
+share one.
+"""
+import base64
+from datetime import datetime
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor that wasn't produced by encode_cursor."""
+
+
+def encode_cursor(row, field):
+    """Opaque cursor pointing at `row` (an instance or a values() row), ordered by `field`."""
+    if isinstance(row, dict):
+        timestamp, pk = row[field], row['id']
+    else:
+        timestamp, pk = getattr(row, field), row.pk
+    raw = f"{timestamp.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return the (timestamp, id) encoded in `cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, pk = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(pk)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from exc
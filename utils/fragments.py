@@ -0,0 +1,53 @@
+"""
+Pre-rendered constant parts of FT pages.
+
+Most of a marketing page (hero, feature cards, footer, inline <style> and
+<script> blocks) is the same on every request, yet handlers rebuild and
+re-serialize the whole tree each time. `Static` renders such a subtree
+once and splices the resulting HTML into later pages as raw markup:
+
+    Titled("About",
+        SiteHeader(session),              # dynamic, rendered per request
+        Static(lambda: Div(...)),         # built and serialized once
+    )
+
+The lambda is only called the first time its code runs; afterwards
+`Static` is a dict lookup keyed by the lambda's code object, so each
+Static(...) call site is one fragment. Fragments must not depend on the
+request: a lambda that closes over local variables is rejected, and
+anything else it reads (module globals, asset_url(), ...) is frozen at
+first render. Use them only for markup that is truly constant for the
+life of the process.
+"""
+import threading
+
+from fasthtml.common import NotStr, fh_cfg, to_xml
+
+_rendered = {}
+_lock = threading.Lock()
+
+
+def render(content) -> str:
+    """Serialize an FT (or tuple of FTs) the way FastHTML serializes pages."""
+    return to_xml(content, indent=fh_cfg.indent)
+
+
+def Static(build):
+    """Raw HTML of `build()`, rendered on first use and reused by this call site."""
+    if build.__closure__:
+        names = ', '.join(build.__code__.co_freevars)
+        raise TypeError(f"Static fragments can't depend on local variables ({names})")
+    key = build.__code__
+    html = _rendered.get(key)
+    if html is None:
+        with _lock:
+            html = _rendered.get(key)
+            if html is None:
+                html = _rendered[key] = NotStr(render(build()))
+    return html
+
+
+def clear():
+    """Forget every rendered fragment (tests, or after swapping the asset manifest)."""
+    with _lock:
+        _rendered.clear()
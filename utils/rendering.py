@@ -0,0 +1,235 @@
+"""
+Markdown rendering for user-written content (blog posts, portfolios).
+
+One sanitizer policy for every caller: markdown (with the `extra` and
+`codehilite` extensions) followed by bleach. markdown.markdown() does NOT
+strip raw HTML, so without bleach untrusted content could inject <script>
+or event handlers.
+
+Rendering is cached in two layers, both keyed by a hash of the content
+plus SANITIZER_VERSION:
+
+- a small in-process LRU, so hot posts cost a dict lookup;
+- the Django cache, shared between workers.
+
+Keys change whenever the content does, so an edit never serves stale HTML;
+`invalidate()` only frees the entry for the outgoing body.
+
+`arender()` is the async entry point. Small documents render inline; those
+of MARKDOWN_OFFLOAD_BYTES (UTF-8) or more go to a pool of MARKDOWN_RENDER_WORKERS
+processes, so a 200 KB post full of code blocks doesn't hold the GIL and
+stall every other request on the worker. Where processes can't be started, or the pool
+is disabled with MARKDOWN_RENDER_WORKERS=0, it falls back to a thread.
+"""
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bleach
+import markdown
+from django.conf import settings
+from django.core.cache import cache
+
+try:
+    import pygments
+except ImportError:  # codehilite renders unhighlighted blocks without it
+    pygments = None
+
+logger = logging.getLogger(__name__)
+
+# Anything else (script, iframe, on* handlers, etc.) is stripped.
+ALLOWED_TAGS = [
+    "p", "br", "strong", "em", "code", "pre", "blockquote",
+    "ul", "ol", "li", "a", "h1", "h2", "h3", "h4", "h5", "h6",
+    "img", "hr", "table", "thead", "tbody", "tr", "th", "td",
+    "div", "span",
+]
+ALLOWED_ATTRS = {
+    "*": ["class"],
+    "a": ["href", "title", "rel"],
+    "img": ["src", "alt", "title"],
+    "code": ["class"],
+}
+ALLOWED_PROTOCOLS = ["http", "https", "mailto"]
+MARKDOWN_EXTENSIONS = ['extra', 'codehilite']
+
+CACHE_TTL = 60 * 60 * 24 * 7
+LRU_SIZE = 256
+
+
+def _sanitizer_version() -> str:
+    """Fingerprint of everything that shapes rendered HTML besides the content."""
+    config = repr((
+        MARKDOWN_EXTENSIONS,
+        ALLOWED_TAGS,
+        sorted(ALLOWED_ATTRS.items()),
+        ALLOWED_PROTOCOLS,
+        markdown.__version__,
+        bleach.__version__,
+        pygments.__version__ if pygments else None,
+    ))
+    return hashlib.sha256(config.encode()).hexdigest()[:12]
+
+
+# Part of every cache key: changing the policy, the extensions or a
+# library version orphans all previously cached HTML.
+SANITIZER_VERSION = _sanitizer_version()
+
+
+def render_markdown(content: str) -> str:
+    """Markdown → sanitized HTML, uncached. Returns empty string on empty input."""
+    if not content:
+        return ""
+    rendered = markdown.markdown(content, extensions=MARKDOWN_EXTENSIONS)
+    return bleach.clean(
+        rendered,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRS,
+        protocols=ALLOWED_PROTOCOLS,
+        strip=True,
+    )
+
+
+def cache_key(content: str) -> str:
+    digest = hashlib.sha256(content.encode()).hexdigest()
+    return f"markdown:html:{SANITIZER_VERSION}:{digest}"
+
+
+class _LRU:
+    """Thread-safe, size-bounded mapping that evicts the least recently used key."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_lru = _LRU(LRU_SIZE)
+
+
+def render(content: str) -> str:
+    """Sanitized HTML for `content`, from the LRU or the cache when possible."""
+    if not content:
+        return ""
+    key = cache_key(content)
+    html = _lru.get(key)
+    if html is None:
+        html = cache.get(key)
+        if html is None:
+            html = render_markdown(content)
+            cache.set(key, html, CACHE_TTL)
+        _lru.set(key, html)
+    return html
+
+
+async def arender(content: str) -> str:
+    """render() for async handlers; large documents render off the event loop."""
+    if not content:
+        return ""
+    key = cache_key(content)
+    html = _lru.get(key)
+    if html is None:
+        html = await cache.aget(key)
+        if html is None:
+            html = await _render_offloaded(content)
+            await cache.aset(key, html, CACHE_TTL)
+        _lru.set(key, html)
+    return html
+
+
+def invalidate(content: str):
+    """Drop the cached HTML for `content` (a body that was edited or deleted)."""
+    if not content:
+        return
+    key = cache_key(content)
+    _lru.pop(key)
+    cache.delete(key)
+
+
+def clear_memo():
+    """Empty this process's LRU (the shared cache is left alone)."""
+    _lru.clear()
+
+
+# ---------- Process pool ----------
+
+_pool = None
+_pool_unavailable = False
+_pool_lock = threading.Lock()
+
+
+def _offload_threshold():
+    return getattr(settings, 'MARKDOWN_OFFLOAD_BYTES', 4 * 1024)
+
+
+def _executor():
+    """The shared render pool, started on first use; None when unavailable."""
+    global _pool, _pool_unavailable
+    workers = getattr(settings, 'MARKDOWN_RENDER_WORKERS', 2)
+    if workers <= 0 or _pool_unavailable:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            try:
+                # spawn, not fork: the parent runs an event loop and threads.
+                _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            except (OSError, NotImplementedError):
+                # e.g. serverless runtimes without /dev/shm for semaphores
+                logger.warning("Markdown render pool unavailable; rendering in threads", exc_info=True)
+                _pool_unavailable = True
+                return None
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _is_small(content):
+    """Under the offload threshold in UTF-8 bytes (characters never outnumber bytes)."""
+    threshold = _offload_threshold()
+    return len(content) < threshold and len(content.encode()) < threshold
+
+
+async def _render_offloaded(content):
+    if _is_small(content):
+        return render_markdown(content)
+    pool = _executor()
+    if pool is not None:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, render_markdown, content)
+        except BrokenProcessPool:
+            logger.warning("Markdown render pool died; restarting it on next use", exc_info=True)
+            _reset_pool()
+    return await asyncio.to_thread(render_markdown, content)
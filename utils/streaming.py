@@ -0,0 +1,131 @@
+"""
+Streamed (chunked) HTML for pages with slow, DB-backed sections.
+
+A handler normally builds the whole FT tree, every query included, before
+FastHTML sends a byte. `stream_page()` instead takes a page whose slow
+parts are wrapped in `Later(fn, *args)`:
+
+    return stream_page(req, Titled("Dashboard",
+        SiteHeader(session),
+        Section(H2("Recent Activity"), Later(recent_activity, user)),
+    ))
+
+The document is rendered once with a placeholder for each Later. The
+first chunk holds everything up to the first placeholder: <head> (so the
+browser starts fetching CSS and JS) and SiteHeader. Meanwhile every Later
+starts at once; sync functions run via sync_to_async, as the ORM requires
+in async code. Each Later is then emitted in document order as it
+resolves, followed by the markup after it.
+
+Headers (and so the session cookie) go out with the first chunk. Anything
+that can redirect or write to the session belongs in the handler, before
+stream_page(). Toasts waiting in the session are rendered into the first
+chunk, as FastHTML would render them into a normal page. A section that
+raises is logged and replaced with a short notice: the status line has
+already been sent, so the page can't become a 500.
+"""
+import asyncio
+import inspect
+import logging
+import re
+import secrets
+
+from asgiref.sync import sync_to_async
+from fasthtml.common import FT, Link, NotStr, P, Title, flat_tuple, is_full_page, respond
+from fasthtml.toaster import render_toasts, sk as TOASTS_KEY
+from starlette.responses import StreamingResponse
+
+from utils.fragments import render
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPE = 'text/html; charset=utf-8'
+HEADERS = {
+    # What FastHTML sends with every page: HTMX requests get a fragment.
+    'Vary': 'HX-Request, HX-History-Restore-Request',
+    # Stops nginx-style proxies from buffering the stream back into one response.
+    'X-Accel-Buffering': 'no',
+}
+# Top-level tags FastHTML moves into <head>.
+HEAD_TAGS = ('title', 'meta', 'link', 'style', 'base')
+
+
+class Later:
+    """A section of a streamed page whose content is `fn(*args, **kwargs)`."""
+
+    def __init__(self, fn, *args, **kwargs):
+        self.fn, self.args, self.kwargs = fn, args, kwargs
+        self.marker = None
+
+    def __ft__(self):
+        if self.marker is None:
+            raise RuntimeError("Later() sections only render inside stream_page()")
+        return NotStr(self.marker)
+
+    async def resolve(self):
+        """The section's content, or a notice if building it failed."""
+        try:
+            if inspect.iscoroutinefunction(self.fn):
+                return await self.fn(*self.args, **self.kwargs)
+            return await sync_to_async(self.fn)(*self.args, **self.kwargs)
+        except Exception:
+            logger.exception("Streamed section %s failed", getattr(self.fn, '__qualname__', self.fn))
+            return P("This section couldn't be loaded. Try refreshing the page.", cls="stream-error")
+
+
+def _laters(node):
+    """Every Later in `node`, in document order."""
+    if isinstance(node, Later):
+        yield node
+    elif isinstance(node, FT):
+        for child in node.children:
+            yield from _laters(child)
+    elif isinstance(node, (tuple, list)):
+        for child in node:
+            yield from _laters(child)
+
+
+def _document(req, content):
+    """
+    The HTML FastHTML would send for `content`: the whole document, with
+    the app's headers, default title and canonical link, or `content`
+    alone for HTMX requests.
+    """
+    if is_full_page(req, content):
+        return render(content)
+    heads = [item for item in content if getattr(item, 'tag', '') in HEAD_TAGS]
+    body = [item for item in content if getattr(item, 'tag', '') not in HEAD_TAGS]
+    if not any(getattr(item, 'tag', '') == 'title' for item in heads):
+        heads.append(Title(req.app.title))
+    if req.app.canonical:
+        url = str(getattr(req, 'canonical', req.url)).replace('http://', 'https://', 1)
+        heads.append(Link(rel='canonical', href=url))
+    return render(respond(req, heads, tuple(body)))
+
+
+def stream_page(req, *content, status_code=200) -> StreamingResponse:
+    """Respond with `content` (what a handler would return) as a chunked page."""
+    content = flat_tuple(content)
+    session = req.scope.get('session', {})
+    if TOASTS_KEY in session:
+        session['toast_duration'] = req.app.state.toast_duration
+        content = (*content, render_toasts(session))
+
+    laters = list(_laters(content))
+    token = secrets.token_hex(8)
+    for index, later in enumerate(laters):
+        later.marker = f'<!--stream:{token}:{index}-->'
+    pieces = re.split(f'<!--stream:{token}:\\d+-->', _document(req, content))
+    return StreamingResponse(_chunks(pieces, laters), status_code=status_code, media_type=MEDIA_TYPE, headers=HEADERS)
+
+
+async def _chunks(pieces, laters):
+    tasks = [asyncio.ensure_future(later.resolve()) for later in laters]
+    try:
+        yield pieces[0]
+        for task, piece in zip(tasks, pieces[1:]):
+            yield render(await task) + piece
+    finally:
+        # Client went away mid-page: don't keep querying for it.
+        for task in tasks:
+            task.cancel()